@@ -5,6 +5,17 @@
 # the REST API address
 base_address = "http://localhost:60000"
 
+# REST API addresses of the ETAP instances used for parameter sweeps,
+# each instance should have its own copy of the project open
+sweep_addresses = [base_address]
+
+# local address of the warm worker daemon (etap_worker.py / etap_job.py)
+worker_address = ("localhost", 60100)
+# the worker and its clients share a secret key, read from this environment variable,
+# or else from this file (untracked, create it with: python -c "import secrets; print(secrets.token_hex(32))" > .worker_authkey)
+worker_authkey_env = "ETAP_WORKER_AUTHKEY"
+worker_authkey_file = ".worker_authkey"
+
 
 
 # the project name
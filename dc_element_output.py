@@ -1,24 +1,62 @@
-import etap.api
+import hashlib
 import json
+import os
+import time
 import pandas as pd
 import xml.etree.ElementTree as ET
-from configuration.configuration import base_address
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from configuration.configuration import base_address, elementTypes, revision_name, config_name
+from src.datahub_client import connect
+from src.element_dtypes import coerce_frame
+from src.element_extract import build_element_frame, extract_columns, frame_from_columns
+from src.element_schema import get_schema
 from src.export_data import export_report
+from src.incremental_export import (ExportManifest, GUID_COLUMN, content_digest, element_digest, element_key,
+                                    merge_component, output_settings, unique_key)
+from src.output_backends import DEFAULT_OUTPUT_PATHS, remove_tables, save_tables, table_path
+from src.pde_source import read_pde_columns
+from src.response_cache import CachedETAPClient, ResponseCache
+from src.xml_stream import iter_element_attribs
 
 
 class ETAPExporter:
     """ETAP 项目数据导出工具"""
 
-    def __init__(self, base_address):
-        """初始化ETAP连接并验证"""
-        self._connect_etap(base_address)
-        self._verify_connection()
+    def __init__(self, base_address=None, streaming=False, output_format="excel", output_path=None, typed=False,
+                 cache_dir=None, pde_file=None):
+        """初始化ETAP连接并验证
+
+        streaming=True 时以增量方式解析元件数据，逐个元素处理并及时释放已解析节点，
+        适用于大型项目的导出。
+        output_format 可选 'excel'、'parquet'、'feather'、'csv.gz'；output_path 为空时使用
+        各格式的默认路径（parameters.xlsx 或 parameters/ 目录）。
+        typed=True 时按 element_schema.ATTRIBUTE_DTYPES 将各列转换为数值、布尔和分类类型，
+        解析失败的值记录在 self.dtype_report 中。
+        cache_dir 不为空时在该目录启用 projectdata 响应的磁盘缓存，项目文件保存后自动失效。
+        pde_file 不为空时为离线模式：不连接ETAP，直接流式读取 PDE 文件（如 Feeder.xml）中的元件数据。
+        """
+        self.pde_file = pde_file
+        self.etap = None
+        if pde_file is None:
+            self._connect_etap(base_address)
+            self._verify_connection()
+            if cache_dir:
+                self.etap = CachedETAPClient(self.etap, ResponseCache(cache_dir), revision_name, config_name)
         self.path_result = None
+        self.streaming = streaming
+        self.output_format = output_format
+        self.output_path = output_path
+        self.typed = typed
+        self.dtype_report = None
+        # PV曲线按原始内容缓存：UserDefPoints -> CurveID，CurveID -> 曲线点
+        self._pv_curves = {}
+        self._pv_curve_points = {}
 
     def _connect_etap(self, address):
         """建立ETAP连接"""
         print("Initializing ETAP connection...")
-        self.etap = etap.api.connect(address)
+        self.etap = connect(address)
 
     def _verify_connection(self):
         """验证连接状态"""
@@ -41,43 +79,352 @@ class ETAPExporter:
         kwargs.update({'output_report': "SC", 'study_case': "SC-A"})
         return self.etap.studies.runSC(studyType="IEC Transient Fault Current", **kwargs)
 
-    def export_project_data(self):
-        """主数据导出流程"""
-        # 创建一个字典来存储成功处理的数据框
-        processed_data = {}
+    def export_project_data(self, concurrent=False, max_workers=4):
+        """主数据导出流程
+
+        concurrent=True 时使用有界线程池同时请求所有元件类型，哪个响应先返回就先解析哪个；
+        max_workers 控制同时进行的 getallelementdata 请求数。
+        """
+        processed_data = self._export_components(self._dc_components(), concurrent, max_workers)
+
+        # 只保存成功处理的数据
+        if processed_data:
+            self._save_output(processed_data)
+        else:
+            print("No data was successfully processed.")
+
+    def _dc_components(self):
+        """定义要处理的元件、对应的ETAP元件类型及处理方法"""
+        return {
+            "INVERTER": ("INVERTER", self._process_inverters),
+            "DCLUMPLOAD": ("DCLUMPLOAD", self._process_dc_loads),
+            "BATTERY": ("BATTERY", self._process_batteries),
+            "DCCABLE": ("CABLE", self._process_dc_cables),
+            "DCBUS": ("DCBUS", self._process_dc_buses),
+            "DCIMPEDANCE": ("DCIMPEDANCE", self._process_dc_impedances)
+        }
+
+    def export_incremental(self, state_dir="export_state", element_types=None, concurrent=False, max_workers=4):
+        """增量导出：只重新提取新增、修改的元件，并合并到上一次的导出结果中
+
+        元件以 OtiGUID 标识，state_dir 中保存各元件的内容哈希及上一次的数据表。
+        某类元件的响应摘要与上次一致时直接复用上次的数据表；全部未变、输出设置（格式、路径、typed）与上次写出时相同
+        且各元件的输出文件都存在时不重写输出，设置改变时重写全部元件，输出文件缺失的元件单独重写。
+        元件已全部删除或元件类型不再导出时，删除按元件单独成文件的输出，并记录在清单的 removed 中；
+        重复的元件标识加上出现序号区分，并记录在清单中。
+        element_types 为空时导出直流系统元件（同 export_project_data），否则按列定义注册表导出指定类型。
+        """
+        if self.pde_file is not None:
+            print("Incremental export needs a live DataHub, use export_project_data/export_all_elements offline.")
+            return
+
+        if element_types is None:
+            components = self._dc_components()
+        else:
+            components = {element_type: (element_type, None) for element_type in element_types}
+
+        manifest = ExportManifest(state_dir)
+        self.timings = {}
+        start = time.perf_counter()
+        if concurrent:
+            fetched = self._fetch_concurrently(components, max_workers)
+        else:
+            fetched = self._fetch_serially(components)
+
+        tables = {}
+        changed_components = set()
+        for component_name, response in fetched:
+            component_type = components[component_name][0]
+            process_start = time.perf_counter()
+            previous = manifest.load_table(component_name)
+            try:
+                if response is None:
+                    # 获取失败时保留上一次的结果
+                    if previous is not None:
+                        tables[component_name] = previous
+                    continue
+                digest = content_digest(response)
+                if digest == manifest.digest(component_name) and previous is not None:
+                    tables[component_name] = previous
+                    continue
+
+                table, hashes, duplicates = self._delta_component(
+                    component_name, component_type, response, manifest.element_hashes(component_name), previous)
+                manifest.update(component_name, digest, hashes, table, duplicates)
+                tables[component_name] = table
+                changed_components.add(component_name)
+            except Exception as e:
+                print(f"Error processing {component_name}: {str(e)}, keeping previous export...")
+                if previous is not None:
+                    tables[component_name] = previous
+            finally:
+                self.timings[component_name]["process"] = time.perf_counter() - process_start
+
+        # 不再导出的元件类型，以及元件已全部删除的类型，其输出文件已过期
+        stale = set(manifest.components) - set(components)
+        for component_name in stale:
+            manifest.remove(component_name)
+        stale.update(name for name in changed_components if tables[name].empty)
+        if "INVERTER" in stale:
+            manifest.remove("INVERTER_PV_CURVES")
+            stale.add("INVERTER_PV_CURVES")
+        elif "INVERTER" in changed_components:
+            curves = self._attach_pv_curves(tables, manifest.load_table("INVERTER_PV_CURVES"))
+            if curves is not None:
+                manifest.save_table("INVERTER_PV_CURVES", curves)
+                changed_components.add("INVERTER_PV_CURVES")
+        elif "INVERTER" in tables:
+            curves = manifest.load_table("INVERTER_PV_CURVES")
+            if curves is not None:
+                tables["INVERTER_PV_CURVES"] = curves
+        self._print_timing_report(time.perf_counter() - start)
+
+        output_path = self.output_path or DEFAULT_OUTPUT_PATHS.get(self.output_format)
+        manifest.removed = {}
+        if stale and self.output_format != "excel" and output_path:
+            for component_name in sorted(stale):
+                removed = remove_tables([component_name], output_path, self.output_format)
+                if removed:
+                    print(f"{component_name}: removed stale output {', '.join(removed)}")
+                    manifest.removed[component_name] = removed
+        # 输出格式、路径或类型设置与上一次写出时不同，上一次的输出不可复用，需要重写全部元件
+        settings = output_settings(self.output_format, output_path, self.typed)
+        rewrite_all = manifest.output != settings
+        # 输出文件被删除的元件即使内容未变也需要重写
+        missing = {component_name for component_name, table in tables.items()
+                   if not table.empty and not os.path.exists(table_path(component_name, output_path,
+                                                                        self.output_format))}
+        manifest.save()
+        # Excel 工作簿整体重写，元件类型不再导出时也需要重写以去掉对应的工作表
+        outdated = rewrite_all or changed_components or missing or manifest.removed \
+            or (self.output_format == "excel" and stale)
+        if not outdated:
+            print("No changes since the last export, output is up to date.")
+            return
+
+        output = {}
+        dtype_reports = []
+        for component_name, table in tables.items():
+            if table.empty:
+                continue
+            # 按元件单独成文件的格式只需重写发生变化或输出文件缺失的元件
+            if self.output_format != "excel" and not rewrite_all \
+                    and component_name not in changed_components and component_name not in missing:
+                continue
+            df = table.drop(columns=GUID_COLUMN, errors="ignore")
+            if self.typed:
+                df, report = coerce_frame(df, components.get(component_name, (component_name,))[0])
+                dtype_reports.append(report)
+            output[component_name] = df
+        if self.typed:
+            self._collect_dtype_report(dtype_reports)
+
+        if output:
+            if self._save_output(output):
+                manifest.output = settings
+                manifest.save()
+        elif not manifest.removed:
+            print("No data was successfully processed.")
 
-        # 定义要处理的元件及其对应的处理方法
+    def _delta_component(self, component_name, component_type, response, old_hashes, previous):
+        """对比元件哈希，只提取新增/修改的元件并与上一次的数据表合并"""
+        hashes = {}
+        order = []
+        changed_records = []
+        changed_keys = []
+        seen = {}
+        duplicates = []
+        for attrs in self._iter_component_attribs(component_type, response):
+            key, duplicate = unique_key(element_key(attrs), seen)
+            if duplicate:
+                duplicates.append(element_key(attrs))
+            digest = element_digest(attrs)
+            hashes[key] = digest
+            order.append(key)
+            if previous is None or old_hashes.get(key) != digest:
+                changed_records.append(attrs)
+                changed_keys.append(key)
+
+        changed = self._build_records_df(component_type, changed_records)
+        if changed_records and changed.empty:
+            raise ValueError(f"failed to build {component_type} rows")
+        if not changed.empty:
+            changed.insert(0, GUID_COLUMN, changed_keys)
+
+        added = sum(1 for key in changed_keys if key not in old_hashes)
+        removed = len(set(old_hashes) - set(hashes))
+        print(f"{component_name}: {added} added, {len(changed_keys) - added} changed, "
+              f"{removed} removed, {len(order) - len(changed_keys)} unchanged")
+        if duplicates:
+            print(f"{component_name}: {len(duplicates)} elements share an identifier with an earlier element "
+                  f"({', '.join(sorted(set(map(str, duplicates)))[:10])}), numbered as key#2, key#3, ...")
+        return merge_component(previous, changed, order), hashes, duplicates
+
+    def _component_schema(self, component_type):
+        """元件类型的提取列定义，逆变器额外提取PV曲线原始数据"""
+        if component_type == "INVERTER":
+            return {**get_schema("INVERTER"), "UserDefPoints": "UserDefPoints"}
+        return get_schema(component_type)
+
+    def _build_columns_df(self, component_type, columns):
+        """由已提取的列数组构建DataFrame"""
+        if component_type == "INVERTER":
+            return self._inverter_df_from_columns(columns)
+        return frame_from_columns(columns)
+
+    def _build_records_df(self, component_type, records):
+        """由元件属性字典构建DataFrame"""
+        if component_type == "INVERTER":
+            return self._build_inverter_df(records)
+        return build_element_frame(records, component_type)
+
+    def export_all_elements(self, element_types=None, concurrent=False, max_workers=4):
+        """按列定义注册表导出全部元件类型
+
+        element_types 默认为 configuration.elementTypes；每种类型的列由 element_schema 描述，
+        统一使用列式提取引擎处理。
+        """
         components = {
-            "INVERTER": self._process_inverters,
-            "DCLUMPLOAD": self._process_dc_loads,
-            "BATTERY": self._process_batteries,
-            "DCCABLE": self._process_dc_cables,
-            "DCBUS": self._process_dc_buses,
-            "DCIMPEDANCE": self._process_dc_impedances
+            element_type: (element_type, partial(self._process_schema_elements, element_type))
+            for element_type in (element_types or elementTypes)
         }
+        processed_data = self._export_components(components, concurrent, max_workers)
+
+        if processed_data:
+            self._save_output(processed_data)
+        else:
+            print("No data was successfully processed.")
+
+    def _export_components(self, components, concurrent, max_workers):
+        """请求并处理各元件数据，返回成功处理的数据框"""
+        # 创建一个字典来存储成功处理的数据框
+        processed_data = {}
+
+        self.timings = {}
+        dtype_reports = []
+        start = time.perf_counter()
+        if self.pde_file is not None:
+            fetched = self._read_pde_components(components)
+            components = {
+                component_name: (component_type, partial(self._build_columns_df, component_type))
+                for component_name, (component_type, _) in components.items()
+            }
+        elif concurrent:
+            fetched = self._fetch_concurrently(components, max_workers)
+        else:
+            fetched = self._fetch_serially(components)
 
         # 遍历处理每个元件
-        for component_name, process_func in components.items():
+        for component_name, response in fetched:
+            component_type, process_func = components[component_name]
+            process_start = time.perf_counter()
             try:
-                df = process_func()
+                if response is None:
+                    print(f"No data found for {component_name}, skipping...")
+                    continue
+                df = process_func(response)
                 if df is not None and not df.empty:
+                    if self.typed:
+                        df, report = coerce_frame(df, component_type)
+                        dtype_reports.append(report)
                     processed_data[component_name] = df
                 else:
                     print(f"No data found for {component_name}, skipping...")
             except Exception as e:
                 print(f"Error processing {component_name}: {str(e)}, skipping...")
                 continue
-
-        # 只保存成功处理的数据
-        if processed_data:
-            self._save_to_excel(processed_data)
+            finally:
+                self.timings[component_name]["process"] = time.perf_counter() - process_start
+
+        self._print_timing_report(time.perf_counter() - start)
+        if self.typed:
+            self._collect_dtype_report(dtype_reports)
+        self._attach_pv_curves(processed_data)
+        return processed_data
+
+    def _collect_dtype_report(self, reports):
+        """汇总类型转换中解析失败的值"""
+        reports = [report for report in reports if not report.empty]
+        self.dtype_report = pd.concat(reports, ignore_index=True) if reports else pd.DataFrame(
+            columns=["Element", "Column", "IID", "Value"])
+        if self.dtype_report.empty:
+            print("All typed columns parsed successfully.")
         else:
-            print("No data was successfully processed.")
+            print(f"{len(self.dtype_report)} values failed to parse:")
+            print(self.dtype_report.groupby(["Element", "Column"]).size().to_string())
+
+    def _timed_fetch(self, component_type):
+        """获取元件数据并记录请求耗时"""
+        fetch_start = time.perf_counter()
+        response = self._fetch_component_data(component_type)
+        return response, time.perf_counter() - fetch_start
+
+    def _fetch_serially(self, components):
+        """逐个请求元件数据"""
+        for component_name, (component_type, _) in components.items():
+            response, elapsed = self._timed_fetch(component_type)
+            self.timings[component_name] = {"fetch": elapsed, "process": 0.0}
+            yield component_name, response
+
+    def _fetch_concurrently(self, components, max_workers):
+        """并发请求所有元件数据，按响应返回的先后顺序产出"""
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._timed_fetch, component_type): component_name
+                for component_name, (component_type, _) in components.items()
+            }
+            for future in as_completed(futures):
+                component_name = futures[future]
+                try:
+                    response, elapsed = future.result()
+                except Exception as e:
+                    print(f"Error getting {component_name} data: {str(e)}")
+                    response, elapsed = None, 0.0
+                self.timings[component_name] = {"fetch": elapsed, "process": 0.0}
+                yield component_name, response
+
+    def _read_pde_components(self, components):
+        """单次遍历PDE文件，产出各元件的列数组"""
+        schemas = {}
+        for component_type, _ in components.values():
+            schemas[component_type] = self._component_schema(component_type)
+        read_start = time.perf_counter()
+        columns = read_pde_columns(self.pde_file, schemas)
+        self.timings["PDE read"] = {"fetch": time.perf_counter() - read_start, "process": 0.0}
+        for component_name, (component_type, _) in components.items():
+            self.timings[component_name] = {"fetch": 0.0, "process": 0.0}
+            yield component_name, columns[component_type]
+
+    def _print_timing_report(self, wall_time):
+        """打印各元件的请求/解析耗时，并与串行执行的总耗时对比"""
+        print("Timing breakdown (s):")
+        print(f"{'Component':<14}{'Fetch':>10}{'Process':>10}")
+        for component_name, timing in self.timings.items():
+            print(f"{component_name:<14}{timing['fetch']:>10.3f}{timing['process']:>10.3f}")
+        serial_time = sum(t["fetch"] + t["process"] for t in self.timings.values())
+        print(f"Serial sum: {serial_time:.3f}s, wall time: {wall_time:.3f}s, "
+              f"speedup: {serial_time / wall_time if wall_time > 0 else 1.0:.2f}x")
+
+    def _fetch_component_data(self, component_type):
+        """从ETAP获取元件数据的原始XML响应"""
+        try:
+            response = self.etap.projectdata.getallelementdata(component_type)
+            if not response:
+                print(f"No {component_type} data found.")
+                return None
+            return response
+        except Exception as e:
+            print(f"Error getting {component_type} data: {str(e)}")
+            return None
 
-    def _process_component_data(self, component_type):
+    def _process_component_data(self, component_type, response=None):
         """通用的元件数据处理函数"""
         try:
-            root = ET.fromstring(self.etap.projectdata.getallelementdata(component_type))
+            if response is None:
+                response = self._fetch_component_data(component_type)
+            if response is None:
+                return None
+            root = ET.fromstring(response)
             if root is None:
                 print(f"No {component_type} data found.")
                 return None
@@ -86,20 +433,33 @@ class ETAPExporter:
             print(f"Error getting {component_type} data: {str(e)}")
             return None
 
-    def _process_inverters(self):
+    def _iter_component_attribs(self, component_type, response=None):
+        """逐个产出元件的属性字典
+
+        流式模式下增量解析响应，不构建完整的DOM；否则沿用 ET.fromstring + findall。
+        response 为已获取的原始响应，为空时向ETAP重新请求。
+        """
+        if self.streaming:
+            if response is None:
+                response = self._fetch_component_data(component_type)
+            if response is None:
+                return iter(())
+            return iter_element_attribs(response, component_type)
+
+        root = self._process_component_data(component_type, response)
+        if root is None:
+            return iter(())
+        return [element.attrib for element in root.findall(component_type)]
+
+    def _process_inverters(self, response=None):
         """处理逆变器数据"""
         print("Processing inverter data...")
         try:
-            root = self._process_component_data("INVERTER")
-            if root is None:
-                return pd.DataFrame()
-
-            inverters = root.findall("INVERTER")
-            if not inverters:
+            inverters = self._iter_component_attribs("INVERTER", response)
+            df = self._build_inverter_df(inverters)
+            if df.empty:
                 print("No inverter elements found.")
-                return pd.DataFrame()
-
-            return self._build_inverter_df(inverters)
+            return df
         except Exception as e:
             print(f"Error in processing inverters: {str(e)}")
             return pd.DataFrame()
@@ -107,215 +467,163 @@ class ETAPExporter:
     def _build_inverter_df(self, inverters):
         """构建逆变器DataFrame"""
         try:
-            # 基础属性提取
-            base_attributes = {
-                'IID': 'ID',
-                'InService': 'InService',
-                'STATE': 'InServiceState',
-                'Felement': 'BusID',
-                'Telement': 'CZNetwork',
-                'ACkV': 'KV',
-                'DCV': 'DcV',
-                'KVA': 'KVA',
-                'DCKW': 'DckW',
-                'DCEff': 'DcPercentEFF',
-                'ACkW': 'GenCat0ACkW',
-                'ACkVar': 'GenCat0kVar',
-                'Vref': 'Vref',
-                'Smax': 'KVAMax',
-                'Pmax': 'KWMax',
-                'Qmax': 'KvarMax'
-            }
-
-            data = {col: [] for col in ['ID'] + list(base_attributes.keys())}
-            pv_data = {f"{t}_{v}{i}": []
-                       for t in ['generate', 'charge']
-                       for v in ['V', 'P']
-                       for i in range(1, 4)}
-
-            for idx, inv in enumerate(inverters, 1):
-                data['ID'].append(idx)
-                for df_col, attr in base_attributes.items():
-                    data[df_col].append(inv.attrib.get(attr))
-
-                # PV曲线处理
-                self._process_pv_curves(inv, pv_data)
-
-            return pd.DataFrame({**data, **pv_data})
+            # 基础属性与PV曲线原始数据在同一次遍历中提取
+            return self._inverter_df_from_columns(extract_columns(inverters, self._component_schema("INVERTER")))
         except Exception as e:
             print(f"Error in building inverter DataFrame: {str(e)}")
             return pd.DataFrame()
 
-    def _process_pv_curves(self, inv, data_dict):
-        """处理PV曲线数据"""
+    def _inverter_df_from_columns(self, data):
+        """由逆变器列数组构建DataFrame"""
+        user_points = data.pop("UserDefPoints")
+        if not user_points:
+            return pd.DataFrame()
+
+        # 相同的曲线只解析一次，逆变器通过 CurveID 引用 PV 曲线表
+        curve_ids = [self._pv_curve_id(points) for points in user_points]
+        return pd.DataFrame({'ID': range(1, len(user_points) + 1), **data, 'CurveID': curve_ids})
+
+    def _pv_curve_id(self, user_points):
+        """返回PV曲线的 CurveID，首次遇到的曲线内容才会解析"""
+        if not user_points:
+            return None
+        curve_id = self._pv_curves.get(user_points, False)
+        if curve_id is False:
+            curve_id = self._process_pv_curves(user_points)
+            self._pv_curves[user_points] = curve_id
+        return curve_id
+
+    def _process_pv_curves(self, user_points):
+        """处理PV曲线数据，返回以内容哈希生成的 CurveID，没有PV曲线点时返回 None"""
         try:
-            if user_points := inv.attrib.get("UserDefPoints"):
-                points = ET.fromstring(user_points).findall(".//UserDefPVPoint")
-                for i, point in enumerate(points[:3], 1):  # 只取前3个点
-                    data_dict[f'generate_V{i}'].append(point.attrib.get("percentVGenerating"))
-                    data_dict[f'generate_P{i}'].append(point.attrib.get("percentPGenerating"))
-                    data_dict[f'charge_V{i}'].append(point.attrib.get("percentVCharging"))
-                    data_dict[f'charge_P{i}'].append(point.attrib.get("percentPCharging"))
-            else:
-                for key in data_dict:
-                    data_dict[key].append(None)
+            points = ET.fromstring(user_points).findall(".//UserDefPVPoint")
+            if not points:
+                return None
+            curve_id = hashlib.blake2b(user_points.encode("utf-8"), digest_size=8).hexdigest()
+            self._pv_curve_points[curve_id] = [
+                tuple(pd.to_numeric(point.get(attr), errors="coerce")
+                      for attr in ("percentVGenerating", "percentPGenerating",
+                                   "percentVCharging", "percentPCharging"))
+                for point in points
+            ]
+            return curve_id
         except Exception as e:
             print(f"Error in processing PV curves: {str(e)}")
-            for key in data_dict:
-                data_dict[key].append(None)
+            return None
 
-    def _process_dc_loads(self):
+    def _build_pv_curve_df(self, curve_ids, previous=None):
+        """构建PV曲线表，每条曲线只保存一次
+
+        参数 previous 为上一次导出的曲线表，本次未解析的曲线从中取出。
+        """
+        columns = ["CurveID", "PointIdx", "generate_V", "generate_P", "charge_V", "charge_P"]
+        frames = []
+        rows = []
+        for curve_id in curve_ids:
+            if curve_id in self._pv_curve_points:
+                rows.extend((curve_id, idx, *point)
+                            for idx, point in enumerate(self._pv_curve_points[curve_id], 1))
+            elif previous is not None:
+                frames.append(previous[previous["CurveID"] == curve_id])
+        frames.append(pd.DataFrame(rows, columns=columns))
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    def _attach_pv_curves(self, processed_data, previous=None):
+        """将逆变器引用到的PV曲线表加入导出数据"""
+        inverters = processed_data.get("INVERTER")
+        if inverters is None or "CurveID" not in inverters.columns:
+            return None
+        curve_ids = inverters["CurveID"].dropna().unique()
+        curves = self._build_pv_curve_df(curve_ids, previous)
+        if not curves.empty:
+            processed_data["INVERTER_PV_CURVES"] = curves
+        return curves
+
+    def _process_dc_loads(self, response=None):
         """处理直流负载数据"""
         print("Processing DC load data...")
         try:
-            root = self._process_component_data("DCLUMPLOAD")
-            if root is None:
-                return pd.DataFrame()
-
-            loads = root.findall("DCLUMPLOAD")
-            if not loads:
+            df = build_element_frame(self._iter_component_attribs("DCLUMPLOAD", response), "DCLUMPLOAD")
+            if df.empty:
                 print("No DC load elements found.")
-                return pd.DataFrame()
-
-            return pd.DataFrame([
-                {
-                    "ID": idx,
-                    "IID": ld.attrib.get("ID"),
-                    "InService": ld.attrib.get("InService"),
-                    "STATE": ld.attrib.get("InServiceState"),
-                    "BUS_I": ld.attrib.get("Bus"),
-                    "RatedV": ld.attrib.get("DCV"),
-                    "RatedKW": ld.attrib.get("KW"),
-                    "Percent_P": ld.attrib.get("MTLoadPercent"),
-                    "Percent_Z": ld.attrib.get("StaticLoadPercent"),
-                }
-                for idx, ld in enumerate(loads, 1)
-            ])
+            return df
         except Exception as e:
             print(f"Error in processing DC loads: {str(e)}")
             return pd.DataFrame()
 
-    def _process_batteries(self):
+    def _process_batteries(self, response=None):
         """处理电池储能系统数据"""
         print("Processing battery data...")
         try:
-            root = self._process_component_data("BATTERY")
-            if root is None:
-                return pd.DataFrame()
-
-            batteries = root.findall("BATTERY")
-            if not batteries:
+            df = build_element_frame(self._iter_component_attribs("BATTERY", response), "BATTERY")
+            if df.empty:
                 print("No battery elements found.")
-                return pd.DataFrame()
-
-            return pd.DataFrame([
-                {
-                    "ID": idx,
-                    "IID": bat.attrib.get("ID"),
-                    "InService": bat.attrib.get("InService"),
-                    "STATE": bat.attrib.get("InServiceState"),
-                    "BusID": bat.attrib.get("Bus"),
-                    "Cells": bat.attrib.get("NrOfCells"),
-                    "Packs": bat.attrib.get("NoOfPacks"),
-                    "Strings": bat.attrib.get("NrOfStrings"),
-                }
-                for idx, bat in enumerate(batteries, 1)
-            ])
+            return df
         except Exception as e:
             print(f"Error in processing batteries: {str(e)}")
             return pd.DataFrame()
 
-    def _process_dc_cables(self):
+    def _process_dc_cables(self, response=None):
         """处理直流电缆数据"""
         print("Processing DC cable data...")
         try:
-            root = self._process_component_data("CABLE")
-            if root is None:
-                return pd.DataFrame()
-
-            cables = root.findall("CABLE")
-            if not cables:
+            df = build_element_frame(self._iter_component_attribs("CABLE", response), "CABLE")
+            if df.empty:
                 print("No DC cable elements found.")
-                return pd.DataFrame()
-
-            return pd.DataFrame([
-                {
-                    "ID": idx,
-                    "IID": cable.attrib.get("ID"),
-                    "InService": cable.attrib.get("InService"),
-                    "STATE": cable.attrib.get("InServiceState"),
-                    "FromBus": cable.attrib.get("FromBus"),
-                    "ToBus": cable.attrib.get("ToBus"),
-                    "LENGTH": cable.attrib.get("LengthValue"),
-                    "LENGTH_Unit": cable.attrib.get("ImpedanceUnits"),
-                    "OhmsPerLengthValue": cable.attrib.get("OhmsPerLengthValue"),
-                    "OhmsPerLengthUnit": cable.attrib.get("OhmsPerLengthUnit"),
-                    "RPosValue": cable.attrib.get("RPosValue"),
-                    "XPosValue": cable.attrib.get("XPosValue"),
-                }
-                for idx, cable in enumerate(cables, 1)
-            ])
+            return df
         except Exception as e:
             print(f"Error in processing DC cables: {str(e)}")
             return pd.DataFrame()
 
-    def _process_dc_buses(self):
+    def _process_dc_buses(self, response=None):
         """处理直流母线数据"""
         print("Processing DC bus data...")
         try:
-            root = self._process_component_data("DCBUS")
-            if root is None:
-                return pd.DataFrame()
-
-            buses = root.findall("DCBUS")
-            if not buses:
+            df = build_element_frame(self._iter_component_attribs("DCBUS", response), "DCBUS")
+            if df.empty:
                 print("No DC bus elements found.")
-                return pd.DataFrame()
-
-            return pd.DataFrame([
-                {
-                    "ID": idx,
-                    "IID": bus.attrib.get("ID"),
-                    "NominalV": bus.attrib.get("NominalV"),
-                    "InService": bus.attrib.get("InService"),
-                    "STATE": bus.attrib.get("InServiceState"),
-                }
-                for idx, bus in enumerate(buses, 1)
-            ])
+            return df
         except Exception as e:
             print(f"Error in processing DC buses: {str(e)}")
             return pd.DataFrame()
 
-    def _process_dc_impedances(self):
+    def _process_dc_impedances(self, response=None):
         """处理直流阻抗数据"""
         print("Processing DC impedance data...")
         try:
-            root = self._process_component_data("DCIMPEDANCE")
-            if root is None:
-                return pd.DataFrame()
-
-            impedances = root.findall("DCIMPEDANCE")
-            if not impedances:
+            df = build_element_frame(self._iter_component_attribs("DCIMPEDANCE", response), "DCIMPEDANCE")
+            if df.empty:
                 print("No DC impedance elements found.")
-                return pd.DataFrame()
-
-            return pd.DataFrame([
-                {
-                    "ID": idx,
-                    "IID": imp.attrib.get("ID"),
-                    "InService": imp.attrib.get("InService"),
-                    "STATE": imp.attrib.get("InServiceState"),
-                    "FromBus": imp.attrib.get("FromBus"),
-                    "ToBus": imp.attrib.get("ToBus"),
-                    "RValue": imp.attrib.get("RValue"),
-                    "LValue": imp.attrib.get("LValue"),
-                }
-                for idx, imp in enumerate(impedances, 1)
-            ])
+            return df
         except Exception as e:
             print(f"Error in processing DC impedances: {str(e)}")
             return pd.DataFrame()
 
+    def _process_schema_elements(self, element_type, response=None):
+        """按列定义注册表处理任意类型的元件数据"""
+        print(f"Processing {element_type} data...")
+        try:
+            df = self._build_records_df(element_type, self._iter_component_attribs(element_type, response))
+            if df.empty:
+                print(f"No {element_type} elements found.")
+            return df
+        except Exception as e:
+            print(f"Error in processing {element_type}: {str(e)}")
+            return pd.DataFrame()
+
+    def _save_output(self, data_dict):
+        """按配置的输出格式保存数据，返回是否保存成功"""
+        if self.output_format == "excel" and self.output_path is None:
+            return self._save_to_excel(data_dict)
+        try:
+            print(f"Exporting to {self.output_format}...")
+            output_path = save_tables(data_dict, self.output_path, self.output_format)
+            print(f"Export completed successfully: {output_path}")
+            return True
+        except Exception as e:
+            print(f"Error saving to {self.output_format}: {str(e)}")
+            return False
+
     def _save_to_excel(self, data_dict):
         """保存数据到Excel"""
         try:
@@ -324,8 +632,10 @@ class ETAPExporter:
                 for sheet_name, df in data_dict.items():
                     df.to_excel(writer, sheet_name=sheet_name, index=False)
             print("Export completed successfully.")
+            return True
         except Exception as e:
             print(f"Error saving to Excel: {str(e)}")
+            return False
 
 
 if __name__ == "__main__":
@@ -0,0 +1,80 @@
+#Thin client for etap_worker.py: submits one job to the running worker and prints the result
+#Usage
+#python etap_job.py ping
+#python etap_job.py set LUMPEDLOAD Lump1 MVA 40
+#python etap_job.py lf --output result.xlsx
+#python etap_job.py tdlf --bus BUS_1 --load LOAD_1 --output result.xlsx
+#python etap_job.py restore
+#python etap_job.py shutdown
+# only the standard library is imported here, pandas/matplotlib/etap stay loaded in the worker
+
+import argparse
+import sys
+from multiprocessing.connection import Client
+
+from configuration.configuration import worker_address
+from src.worker_auth import load_authkey
+
+
+def submit(job, address=worker_address, authkey=None):
+    """
+    向 etap_worker.py 提交一个任务并等待结果
+
+    参数:
+    job: 任务字典，例如 {"job": "lf", "output": "result.xlsx"}
+    authkey: 认证密钥，为空时与工作进程相同，从环境变量或密钥文件读取
+
+    返回:
+    dict: {"ok": bool, "result": ..., "error": ..., "time": 任务耗时（秒）}
+    """
+    with Client(address, authkey=authkey or load_authkey()) as conn:
+        conn.send(job)
+        return conn.recv()
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Submit a job to the running ETAP worker")
+    sub = parser.add_subparsers(dest="job", required=True)
+    sub.add_parser("ping", help="check the worker and its ETAP session")
+    for name, text in [("lf", "run load flow and export the bus results"),
+                       ("ulf", "run unbalanced load flow and export the bus results"),
+                       ("sc", "run short circuit calculation"),
+                       ("tdlf", "run time domain load flow and export the selected buses/loads")]:
+        study = sub.add_parser(name, help=text)
+        study.add_argument("--study-case", dest="study_case")
+        study.add_argument("--revision", dest="revision_name")
+        study.add_argument("--config", dest="config_name")
+        study.add_argument("--output", help="save the result table to this Excel file")
+        study.add_argument("--max-rows", dest="max_rows", type=int, default=20)
+        if name == "tdlf":
+            study.add_argument("--bus", dest="buses", action="append")
+            study.add_argument("--load", dest="loads", action="append")
+    change = sub.add_parser("set", help="stage a parameter change, written before the next study")
+    for field in ["element_type", "element_name", "field_name", "value"]:
+        change.add_argument(field)
+    sub.add_parser("restore", help="restore all changed parameters to their original values")
+    sub.add_parser("shutdown", help="stop the worker")
+    args = parser.parse_args(argv)
+    return {key: value for key, value in vars(args).items() if value is not None}
+
+
+if __name__ == "__main__":
+    job = parse_args(sys.argv[1:])
+    try:
+        reply = submit(job)
+    except RuntimeError as e:
+        print(str(e))
+        sys.exit(1)
+    except ConnectionRefusedError:
+        print(f"Worker not running on {worker_address[0]}:{worker_address[1]}, start it with: python etap_worker.py")
+        sys.exit(1)
+    if not reply["ok"]:
+        print(f"Job failed: {reply['error']}")
+        sys.exit(1)
+    result = reply["result"]
+    table = result.pop("table", None)
+    for key, value in result.items():
+        print(f"{key}: {value}")
+    if table is not None:
+        print(table)
+    print(f"Done in {reply.get('time', 0)}s.")
@@ -0,0 +1,130 @@
+#This file keeps a verified ETAP session open and runs study/export jobs sent by etap_job.py
+#Usage
+#Step1: open etap project and start datahub
+#Step2: python etap_worker.py (leave it running)
+#Step3: submit jobs with etap_job.py, e.g. python etap_job.py lf --output result.xlsx
+
+import os
+import sys
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener
+
+from configuration.configuration import base_address, revision_name, config_name, study_case, presentation, output_report, get_online_data, online_config_only, what_if_commands, worker_address
+from runtdpf import Main
+from src.datahub_client import disconnect
+from src.export_pfdata import export_pfreport
+from src.worker_auth import load_authkey
+
+
+class Worker():
+    def __init__(self, base_address):
+        self.base_address = base_address
+        self.started = time.time()
+        self.jobs = 0
+        self.main = None
+
+    def session(self):
+        # connect once and reuse the verified session for all later jobs
+        if self.main is None:
+            self.main = Main(self.base_address)
+        return self.main
+
+    def check_session(self):
+        # drop the session if DataHub no longer answers, the next job reconnects
+        if self.main is None:
+            return
+        try:
+            self.main.etap.application.ping()
+        except Exception:
+            print("DataHub not responding, session will be reopened for the next job")
+            self.main = None
+            # connect() would otherwise return the same cached client
+            disconnect(self.base_address)
+
+    def study_options(self, job):
+        return (job.get("revision_name", revision_name), job.get("config_name", config_name),
+                job.get("study_case", study_case), presentation, output_report, get_online_data)
+
+    def table_result(self, df, job):
+        """DataFrame 结果按需保存为文件，只返回文本摘要，客户端无需导入 pandas"""
+        result = {"rows": 0 if df is None else len(df)}
+        if df is None:
+            return result
+        if job.get("output"):
+            df.to_excel(job["output"], index=False)
+            result["output"] = os.path.abspath(job["output"])
+        result["table"] = df.to_string(max_rows=job.get("max_rows", 20))
+        return result
+
+    def handle(self, job):
+        name = job["job"]
+        if name == "ping":
+            main = self.session()
+            return {"pid": os.getpid(), "paths": main.paths, "jobs": self.jobs,
+                    "uptime": round(time.time() - self.started, 1)}
+        main = self.session()
+        if name == "lf":
+            main.run_power_flow(*self.study_options(job))
+            return self.table_result(export_pfreport(main.path_result), job)
+        if name == "ulf":
+            main.run_unbalanced_power_flow(*self.study_options(job))
+            return self.table_result(main.export_report(), job)
+        if name == "sc":
+            main.run_sc_cal(*self.study_options(job))
+            return {"report": main.path_result}
+        if name == "tdlf":
+            main.run_time_domain_load_flow(*self.study_options(job), online_config_only, what_if_commands)
+            result = main.export_output(custom_buses=job.get("buses") or None, custom_loads=job.get("loads") or None)
+            return self.table_result(result, job)
+        if name == "set":
+            main.change_parameters(job["element_type"], job["element_name"], job["field_name"], job["value"])
+            return {"staged": len(main.changes.pending)}
+        if name == "restore":
+            return {"written": main.restore_parameters()}
+        raise ValueError(f"Unknown job: {name}")
+
+    def serve(self, address, authkey):
+        self.session()
+        with Listener(address, authkey=authkey) as listener:
+            print(f"Worker ready on {address[0]}:{address[1]}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except (AuthenticationError, EOFError, OSError) as e:
+                    print(f"Rejected connection: {str(e)}")
+                    continue
+                with conn:
+                    try:
+                        job = conn.recv()
+                    except Exception as e:
+                        print(f"Rejected job: {str(e)}")
+                        continue
+                    if not isinstance(job, dict) or not isinstance(job.get("job"), str):
+                        print(f"Rejected invalid job: {type(job).__name__}")
+                        conn.send({"ok": False, "error": "invalid job, expected a dict with a 'job' name"})
+                        continue
+                    if job["job"] == "shutdown":
+                        conn.send({"ok": True, "result": {"jobs": self.jobs}})
+                        break
+                    start = time.perf_counter()
+                    try:
+                        reply = {"ok": True, "result": self.handle(job)}
+                    except Exception as e:
+                        print(f"Job {job['job']} failed: {str(e)}")
+                        self.check_session()
+                        reply = {"ok": False, "error": str(e)}
+                    self.jobs += 1
+                    reply["time"] = round(time.perf_counter() - start, 3)
+                    print(f"Job {job['job']} finished in {reply['time']}s")
+                    conn.send(reply)
+        print("Worker stopped.")
+
+
+if __name__ == "__main__":
+    try:
+        authkey = load_authkey()
+    except RuntimeError as e:
+        print(f"Worker not started: {str(e)}")
+        sys.exit(1)
+    Worker(base_address).serve(worker_address, authkey)
@@ -1,15 +1,18 @@
-import etap.api
 import json
-import etap
-import pandas as pd
+from functools import partial
 
-from configuration.configuration import base_address, revision_name, config_name, study_case, presentation, output_report, get_online_data
+from configuration.configuration import base_address, sweep_addresses, revision_name, config_name, study_case, presentation, output_report, get_online_data
+from src.datahub_client import connect
+from src.change_set import ChangeSet
 
 from src.export_pfdata import export_pfreport
+from src.sweep import CACHED_COLUMN, find_crossing, run_sweep
+from src.response_cache import find_project_file, project_fingerprint
+from src.result_cache import StudyResultCache
 class Main():
-    def __init__(self,base_address):
+    def __init__(self,base_address, result_cache=None):
         print("Test connection...")
-        e = etap.api.connect(base_address)
+        e = connect(base_address)
         response = e.application.filepaths()
         print(response)
 
@@ -26,15 +29,49 @@ class Main():
         # convert the str to dictionary
         self.paths = paths
         self.etap = e
+        # 参数修改先暂存，运行计算前批量写入，未变化的值不会重复写入
+        self.changes = ChangeSet(e.projectdata)
+        # 场景结果缓存：命中缓存的点不运行计算，暂存的参数修改留到下一次需要运行计算时再写入
+        self.result_cache = result_cache
+        self.overrides = {}
+        self.cached_report = None
+        self._result_key = None
+        if result_cache is not None:
+            self.project_file = find_project_file(paths)
+            self.fingerprint = project_fingerprint(self.project_file)
+            if self.fingerprint is None:
+                print("Project file not found, result cache disabled.")
+                self.result_cache = None
+            else:
+                result_cache.cache.purge_stale(self.project_file, self.fingerprint)
+    def _lookup_result(self, study, revision_name, config_name, study_case):
+        """命中缓存时载入结果并返回 True，否则返回 False"""
+        self.cached_report = None
+        self._result_key = None
+        if self.result_cache is None:
+            return False
+        key = self.result_cache.scenario_key(self.overrides, study, revision_name, config_name, study_case, self.fingerprint)
+        hit = self.result_cache.get(key)
+        if hit is not None:
+            print("Load cached result...")
+            self.cached_report, self.path_result = hit
+            return True
+        self._result_key = key
+        return False
     def run_power_flow(self, revision_name, config_name, study_case, presentation, output_report, get_online_data):
         print("Run power flow...")
-
+        if self._lookup_result("runLF", revision_name, config_name, study_case):
+            return
+        self.changes.commit()
         response = self.etap.studies.runLF(revision_name, config_name, study_case, presentation, output_report, get_online_data)
         print("Save power flow result...")
         paths = json.loads(response)
         self.path_result = paths["ReportPath"]
     def run_unbalanced_power_flow(self, revision_name, config_name, study_case, presentation, output_report, get_online_data):
         print("Run unbalanced power flow...")
+        if self._lookup_result("runULF", revision_name, config_name, study_case):
+            return
+        self.changes.commit()
         response = self.etap.studies.runULF(revision_name, config_name, study_case, presentation, output_report, get_online_data)
         print("Save unbalanced power flow result...")
         paths = json.loads(response)
@@ -44,65 +81,81 @@ class Main():
         output_report = "SC"
         study_case = "SC-A"
         studyType = "IEC Transient Fault Current"
+        # short circuit results are not cached, export_pfreport must not return the previous load flow
+        self.cached_report = None
+        self._result_key = None
+        self.changes.commit()
         response = self.etap.studies.runSC(revision_name, config_name, study_case, presentation, output_report, studyType, get_online_data)
         print("Save short circuit flow result...")
         paths = json.loads(response)
         self.path_result = paths["ReportPath"]
     def export_pfreport(self):
+        if self.cached_report is not None:
+            return self.cached_report.copy()
         result_bus = export_pfreport(self.path_result)
+        if self._result_key is not None:
+            self.result_cache.put(self._result_key, result_bus, self.path_result,
+                                  project=self.project_file, fingerprint=self.fingerprint)
+            self._result_key = None
         return result_bus
     def change_parameters(self, elementType, elementName, fieldName, value):
         print("Change parameters...")
-        self.etap.projectdata.setelementprop(elementType, elementName, fieldName, value)
+        self.overrides[(elementType, elementName, fieldName)] = value
+        self.changes.stage(elementType, elementName, fieldName, value)
+    def apply_parameters(self):
+        return self.changes.commit()
+    def restore_parameters(self):
+        print("Restore parameters...")
+        self.overrides.clear()
+        return self.changes.restore()
+
+def evaluate_point(main, current_value):
+    """修改参数、运行潮流并提取两条母线的结果，作为扫描结果的一行"""
+    current_value_str = str(current_value)
+    #change the parameter:input its element type, name, filed and value
+    # main.change_parameters("XFORM2W", "T2", "AnsiPosXR", current_value_str)
+    main.change_parameters("LUMPEDLOAD", "Lump1", "MVA", current_value_str)
+    # main.change_parameters("STLOAD", "Load4", "KVA", current_value_str)
+    # main.change_parameters("XLINE", "Line2", "Length", current_value_str)
+    #Run the power flow analysis
+    main.run_power_flow(revision_name, config_name, study_case, presentation, output_report, get_online_data)
+    # main.run_unbalanced_power_flow(revision_name, config_name, study_case, presentation, output_report, get_online_data)
+    # export result to excel file
+    result = main.export_pfreport()
+    return {
+        'MVA Value': current_value,
+        'bus_ID1': result.bus_ID.values[0],
+        'bus_ID2': result.bus_ID.values[1],
+        'volt1_mag': result.volt_mag.values[0],
+        'volt2_mag': result.volt_mag.values[1],
+        'volt1_ang': result.volt_ang.values[0],
+        'volt2_ang': result.volt_ang.values[1],
+        # True when the point was loaded from the result cache instead of running ETAP
+        CACHED_COLUMN: main.cached_report is not None,
+    }
 
 if __name__ == "__main__":
-    main = Main(base_address)
-    # obtain the data
-    # Prepare lists to store the results
-    x_array = []
-    bus_ID1_array = []
-    bus_ID2_array = []
-    volt_mag1_array = []
-    volt_mag2_array = []
-    volt_ang1_array = []
-    volt_ang2_array = []
+    # "grid": evaluate every value; "adaptive": search the value at which volt1_mag drops below the limit
+    mode = "grid"
     #Create a loop to test ten cases
     start_value=40
     iterations=10
-    for i in range(iterations):
-        current_value = start_value + (i * 10)
-        current_value_str = str(current_value)
-        #change the parameter:input its element type, name, filed and value
-        # main.change_parameters("XFORM2W", "T2", "AnsiPosXR", current_value_str)
-        main.change_parameters("LUMPEDLOAD", "Lump1", "MVA", current_value_str)
-        # main.change_parameters("STLOAD", "Load4", "KVA", current_value_str)
-        # main.change_parameters("XLINE", "Line2", "Length", current_value_str)
-        #Run the power flow analysis
-        main.run_power_flow(revision_name, config_name, study_case, presentation, output_report, get_online_data)
-        # main.run_unbalanced_power_flow(revision_name, config_name, study_case, presentation, output_report, get_online_data)
-        # export result to excel file
-        result = main.export_pfreport()
-        # print(result.volt_mag.values[0])
-        x_array.append(current_value)  # MVA values
-        bus_ID1_array.append(result.bus_ID.values[0])
-        bus_ID2_array.append(result.bus_ID.values[1])
-        volt_mag1_array.append(result.volt_mag.values[0])
-        volt_mag2_array.append(result.volt_mag.values[1])
-        volt_ang1_array.append(result.volt_ang.values[0])
-        volt_ang2_array.append(result.volt_ang.values[1])
-
-    # Create a DataFrame to store the results
-    df = pd.DataFrame({
-        'MVA Value': x_array,
-        'bus_ID1': bus_ID1_array,
-        'bus_ID2': bus_ID2_array,
-        'volt1_mag': volt_mag1_array,
-        'volt2_mag': volt_mag2_array,
-        'volt1_ang': volt_ang1_array,
-        'volt2_ang': volt_ang2_array,
-    })
+    values = [start_value + (i * 10) for i in range(iterations)]
+    # Scenarios that were already computed are loaded from the result cache instead of rerunning ETAP
+    result_cache = StudyResultCache(".result_cache", max_age=7 * 24 * 3600)
+    if mode == "adaptive":
+        main = Main(base_address, result_cache=result_cache)
+        search = find_crossing(partial(evaluate_point, main), values[0], values[-1], threshold=0.95,
+                               tolerance=1, metric="volt1_mag")
+        main.restore_parameters()
+        df = search["history"]
+    else:
+        # Distribute the cases over all ETAP instances, results keep the order of values
+        # Each instance restores the original parameter values when its part of the sweep is finished
+        df = run_sweep(values, sweep_addresses, partial(Main, result_cache=result_cache), evaluate_point,
+                       finalize=Main.restore_parameters)
 
     # Save the results to an Excel file
     print("Export report to Excel file")
     df.to_excel("result.xlsx", index=False)
-    print("Done.")
\ No newline at end of file
+    print("Done.")
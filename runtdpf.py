@@ -3,19 +3,22 @@
 #Step1: open etap project and start datahub
 #Step2: run this file
 
-import etap.api
 import json
-import etap
 import pandas as pd
 
 from configuration.configuration import base_address, revision_name, config_name, study_case, presentation, output_report, get_online_data,online_config_only,what_if_commands
+from src.datahub_client import connect
+from src.change_set import ChangeSet
 
 from src.export_data import export_report
 from src.export_result import export_time_series_power_flow
+from src.td_cube import export_td_cube
+from src.td_stream import stream_time_series
+from src.result_db import release
 class Main():
     def __init__(self,base_address):
         print("Test connection...")
-        e = etap.api.connect(base_address)
+        e = connect(base_address)
         response = e.application.filepaths()
         print(response)
 
@@ -32,15 +35,19 @@ class Main():
         # convert the str to dictionary
         self.paths = paths
         self.etap = e
+        # 参数修改先暂存，运行计算前批量写入，未变化的值不会重复写入
+        self.changes = ChangeSet(e.projectdata)
     def run_power_flow(self, revision_name, config_name, study_case, presentation, output_report, get_online_data):
         print("Run power flow...")
 
+        self.changes.commit()
         response = self.etap.studies.runLF(revision_name, config_name, study_case, presentation, output_report, get_online_data)
         print("Save power flow result...")
         paths = json.loads(response)
         self.path_result = paths["ReportPath"]
     def run_unbalanced_power_flow(self, revision_name, config_name, study_case, presentation, output_report, get_online_data):
         print("Run unbalanced power flow...")
+        self.changes.commit()
         response = self.etap.studies.runULF(revision_name, config_name, study_case, presentation, output_report, get_online_data)
         print("Save unbalanced power flow result...")
         paths = json.loads(response)
@@ -50,6 +57,7 @@ class Main():
         output_report = "SC"
         study_case = "SC-A"
         studyType = "IEC Transient Fault Current"
+        self.changes.commit()
         response = self.etap.studies.runSC(revision_name, config_name, study_case, presentation, output_report, studyType, get_online_data)
         print("Save short circuit flow result...")
         paths = json.loads(response)
@@ -57,6 +65,10 @@ class Main():
 
     def run_time_domain_load_flow(self, revision_name, config_name, study_case, presentation, output_report, get_online_data,online_config_only, what_if_commands):
         print("Run time domain load flow...")
+        self.changes.commit()
+        # close cached read-only connections so ETAP can rewrite the previous result file
+        if getattr(self, "path_result", None):
+            release(self.path_result)
         response = self.etap.studies.runTDLF(revision_name, config_name, study_case, presentation, output_report, get_online_data, online_config_only, what_if_commands)
         print("Save time domain load flow result...")
         paths = json.loads(response)
@@ -67,11 +79,22 @@ class Main():
         return result_bus
     def change_parameters(self, elementType, elementName, fieldName, value):
         print("Change parameters...")
-        self.etap.projectdata.setelementprop(elementType, elementName, fieldName, value)
+        self.changes.stage(elementType, elementName, fieldName, value)
+    def apply_parameters(self):
+        return self.changes.commit()
+    def restore_parameters(self):
+        print("Restore parameters...")
+        return self.changes.restore()
     def export_output(self,custom_buses = None, custom_loads = None):
 
         result_bus = export_time_series_power_flow(self.path_result,output_file="custom_results.txt",custom_buses=custom_buses,custom_loads=custom_loads)
         return result_bus
+    def export_cube(self, output_dir="td_cube", tables=("bus", "load"), fields=None):
+        # All buses/loads at every time step, memory-mapped on disk
+        return export_td_cube(self.path_result, output_dir, tables=tables, fields=fields)
+    def export_stream(self, output_path="time_series_results.parquet", custom_buses=None, custom_loads=None):
+        # Same table as export_output, written chunk by chunk for long studies
+        return stream_time_series(self.path_result, output_path, custom_buses=custom_buses, custom_loads=custom_loads)
 
     # def run_power_flow(self):
 
@@ -2,18 +2,18 @@
     functions to call the etap software power flow and output the results
 """
 
-import etap.api
 import json
-import etap
 import pandas as pd
 
 from configuration.configuration import base_address, revision_name, config_name, study_case, presentation, output_report, get_online_data
+from src.datahub_client import connect
+from src.change_set import ChangeSet
 
 from src.export_data import export_report
 class Main():
     def __init__(self,base_address):
         print("Test connection...")
-        e = etap.api.connect(base_address)
+        e = connect(base_address)
         response = e.application.filepaths()
         print(response)
 
@@ -30,15 +30,19 @@ class Main():
         # convert the str to dictionary
         self.paths = paths
         self.etap = e
+        # 参数修改先暂存，运行计算前批量写入，未变化的值不会重复写入
+        self.changes = ChangeSet(e.projectdata)
     def run_power_flow(self, revision_name, config_name, study_case, presentation, output_report, get_online_data):
         print("Run power flow...")
 
+        self.changes.commit()
         response = self.etap.studies.runLF(revision_name, config_name, study_case, presentation, output_report, get_online_data)
         print("Save power flow result...")
         paths = json.loads(response)
         self.path_result = paths["ReportPath"]
     def run_unbalanced_power_flow(self, revision_name, config_name, study_case, presentation, output_report, get_online_data):
         print("Run unbalanced power flow...")
+        self.changes.commit()
         response = self.etap.studies.runULF(revision_name, config_name, study_case, presentation, output_report, get_online_data)
         print("Save unbalanced power flow result...")
         paths = json.loads(response)
@@ -48,6 +52,7 @@ class Main():
         output_report = "SC"
         study_case = "SC-A"
         studyType = "IEC Transient Fault Current"
+        self.changes.commit()
         response = self.etap.studies.runSC(revision_name, config_name, study_case, presentation, output_report, studyType, get_online_data)
         print("Save short circuit flow result...")
         paths = json.loads(response)
@@ -57,7 +62,12 @@ class Main():
         return result_bus
     def change_parameters(self, elementType, elementName, fieldName, value):
         print("Change parameters...")
-        self.etap.projectdata.setelementprop(elementType, elementName, fieldName, value)
+        self.changes.stage(elementType, elementName, fieldName, value)
+    def apply_parameters(self):
+        return self.changes.commit()
+    def restore_parameters(self):
+        print("Restore parameters...")
+        return self.changes.restore()
 
     # def run_power_flow(self):
 
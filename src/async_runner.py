@@ -0,0 +1,123 @@
+"""
+   Asyncio runner for ETAP studies across several connected DataHubs
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncStudyRunner:
+    """
+    将会话的 run_power_flow / run_unbalanced_power_flow / run_sc_cal / run_time_domain_load_flow 封装为可等待对象
+
+    - 计算通过会话自身的 Main.run_* 方法运行（写入暂存的参数修改、使用结果缓存、释放上一次结果数据库的连接等），
+      结果路径取自会话的 path_result 属性；命中结果缓存时直接返回会话的 cached_report，不再进行后处理
+    - 每个会话（例如 Main 实例，对应一个已连接的 DataHub）同一时间只运行一个计算，
+      多个计算按空闲会话自动分配到不同的 DataHub
+    - 计算完成后立即释放会话，结果后处理（export_pfreport 等）在单独的线程池中进行，
+      与下一个计算同时运行
+    - 支持超时与取消：等待方超时或被取消后立即返回，但 ETAP 中已开始的计算无法中止，
+      对应的会话要等计算实际结束后才会重新分配
+
+    用法:
+        runner = AsyncStudyRunner([Main(address) for address in sweep_addresses])
+        report_path, result = await runner.run_power_flow(..., postprocess=export_pfreport)
+    """
+
+    def __init__(self, sessions, timeout=None, postprocess_workers=2):
+        """
+        参数:
+        sessions: 会话列表（Main 实例），需提供 run_* 方法，计算完成后 path_result 为结果数据库路径
+        timeout: 默认的计算超时时间（秒），为空时不限时
+        postprocess_workers: 同时进行的结果后处理数量
+        """
+        self.sessions = list(sessions)
+        self.timeout = timeout
+        self._study_executor = ThreadPoolExecutor(max_workers=len(self.sessions), thread_name_prefix="study")
+        self._post_executor = ThreadPoolExecutor(max_workers=postprocess_workers, thread_name_prefix="postprocess")
+        self._idle = None
+
+    def _pool(self):
+        # asyncio.Queue 需在事件循环中创建（Python 3.8 在构造时绑定事件循环）
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for index, session in enumerate(self.sessions):
+                self._idle.put_nowait((index, session))
+        return self._idle
+
+    @staticmethod
+    def _call_study(session, method, args, prepare):
+        if prepare is not None:
+            prepare(session)
+        getattr(session, method)(*args)
+        # 会话在本函数返回后才会重新分配，此时读取的结果不会被下一个计算覆盖
+        cached_report = getattr(session, "cached_report", None)
+        if cached_report is not None:
+            cached_report = cached_report.copy()
+        return session.path_result, cached_report
+
+    async def run_study(self, method, *args, timeout=None, prepare=None, postprocess=None):
+        """
+        在空闲的 DataHub 上运行一个计算
+
+        参数:
+        method: 会话的计算方法名，例如 'run_power_flow'
+        args: 传给该方法的参数
+        timeout: 本次计算的超时时间（秒），为空时使用默认值
+        prepare: prepare(session)，计算前在同一会话上执行，例如修改参数
+        postprocess: postprocess(report_path)，计算完成后在后处理线程池中执行
+
+        返回:
+        (report_path, postprocess 的返回值)，未指定 postprocess 时第二项为 None；
+        命中会话的结果缓存时第二项为缓存的结果表（与 export_pfreport 的返回值相同），不调用 postprocess，
+        report_path 可能为 None
+        """
+        loop = asyncio.get_running_loop()
+        idle = self._pool()
+        index, session = await idle.get()
+        print(f"[DataHub {index}] Run {method}...")
+        future = loop.run_in_executor(self._study_executor, self._call_study, session, method, args, prepare)
+        # 会话在计算实际结束后才放回，超时或取消不会让两个计算同时占用同一个 DataHub
+        future.add_done_callback(lambda _: idle.put_nowait((index, session)))
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            report_path, cached_report = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            raise asyncio.TimeoutError(f"[DataHub {index}] {method} did not finish within {timeout}s")
+        if cached_report is not None:
+            print(f"[DataHub {index}] {method} loaded from result cache")
+            return report_path, cached_report
+        print(f"[DataHub {index}] {method} finished: {report_path}")
+
+        if postprocess is None:
+            return report_path, None
+        result = await loop.run_in_executor(self._post_executor, postprocess, report_path)
+        return report_path, result
+
+    def run_power_flow(self, revision_name, config_name, study_case, presentation, output_report, get_online_data, **options):
+        return self.run_study("run_power_flow", revision_name, config_name, study_case, presentation, output_report,
+                              get_online_data, **options)
+
+    def run_unbalanced_power_flow(self, revision_name, config_name, study_case, presentation, output_report, get_online_data, **options):
+        return self.run_study("run_unbalanced_power_flow", revision_name, config_name, study_case, presentation,
+                              output_report, get_online_data, **options)
+
+    def run_sc_cal(self, revision_name, config_name, study_case, presentation, output_report, get_online_data, **options):
+        return self.run_study("run_sc_cal", revision_name, config_name, study_case, presentation, output_report,
+                              get_online_data, **options)
+
+    def run_time_domain_load_flow(self, revision_name, config_name, study_case, presentation, output_report, get_online_data,
+                                  online_config_only, what_if_commands, **options):
+        return self.run_study("run_time_domain_load_flow", revision_name, config_name, study_case, presentation,
+                              output_report, get_online_data, online_config_only, what_if_commands, **options)
+
+    def close(self):
+        """等待进行中的计算和后处理结束并释放线程池"""
+        self._study_executor.shutdown(wait=True)
+        self._post_executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
@@ -0,0 +1,84 @@
+"""
+   Batched, diff-aware element property writes for ETAP projectdata
+"""
+
+
+class ChangeSet:
+    """
+    setelementprop 的批量写入
+
+    - stage() 只记录修改，同一属性多次修改只保留最后一次
+    - commit() 一次性写入暂存的修改，与已写入（或原始）值相同的修改不会发出请求
+    - 首次修改某个属性前用 getelementprop 记录其原始值，restore() 批量恢复全部原始值
+
+    DataHub 没有批量写入接口，commit() 对每个实际变化的属性调用一次 setelementprop。
+    """
+
+    def __init__(self, projectdata, track_baseline=True):
+        """
+        参数:
+        projectdata: etap.projectdata（或带缓存的 projectdata）
+        track_baseline: 是否在首次修改前读取原始值，关闭后 restore() 不可用，也无法跳过与原始值相同的首次写入
+        """
+        self._projectdata = projectdata
+        self.track_baseline = track_baseline
+        self.shadow = {}
+        self.baseline = {}
+        self.pending = {}
+        self.stats = {"staged": 0, "written": 0, "skipped": 0}
+
+    def stage(self, elementType, elementName, fieldName, value):
+        """暂存一次属性修改"""
+        self.pending[(elementType, elementName, fieldName)] = value
+        self.stats["staged"] += 1
+
+    def _read_baseline(self, key):
+        try:
+            value = self._projectdata.getelementprop(*key)
+        except Exception as e:
+            print(f"Failed to read {'.'.join(key)}, baseline not recorded: {str(e)}")
+            return
+        self.baseline[key] = value
+        self.shadow[key] = value
+
+    def commit(self):
+        """
+        写入全部暂存的修改
+
+        每条修改写入成功（或因值未变化而跳过）后才从暂存中移除；某条写入失败时抛出 RuntimeError，
+        失败的及其后尚未写入的修改保留在暂存中，下一次 commit() 时重试。
+
+        返回:
+        int: 实际调用 setelementprop 的次数
+        """
+        written = 0
+        try:
+            for key, value in list(self.pending.items()):
+                if self.track_baseline and key not in self.baseline:
+                    self._read_baseline(key)
+                if key in self.shadow and str(self.shadow[key]) == str(value):
+                    self.stats["skipped"] += 1
+                    del self.pending[key]
+                    continue
+                try:
+                    self._projectdata.setelementprop(*key, value)
+                except Exception as e:
+                    raise RuntimeError(f"Failed to write {'.'.join(key)} = {value}: {str(e)}") from e
+                self.shadow[key] = value
+                del self.pending[key]
+                written += 1
+        finally:
+            self.stats["written"] += written
+        return written
+
+    def restore(self):
+        """
+        将修改过的属性批量恢复为原始值，尚未写入的暂存修改会被丢弃
+
+        返回:
+        int: 实际调用 setelementprop 的次数
+        """
+        self.pending.clear()
+        for key, value in self.baseline.items():
+            self.stage(*key, value)
+        return self.commit()
@@ -0,0 +1,246 @@
+"""
+   Headless chart rendering: downsampling, figure specs, parallel rendering and render cache
+"""
+
+import hashlib
+import io
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.response_cache import ResponseCache
+
+# 每条曲线最多绘制的点数，超过时降采样（15 英寸宽、300 dpi 的图每个子图约 2000 像素）
+DEFAULT_MAX_POINTS = 2000
+# 绘图参数变化时修改此版本号，使旧的缓存失效
+RENDER_VERSION = 1
+# 中文字体支持及负号显示
+RC_PARAMS = {
+    "font.sans-serif": ["SimHei", "DejaVu Sans", "Arial Unicode MS", "sans-serif"],
+    "axes.unicode_minus": False,
+}
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets 降采样
+
+    参数:
+    x, y: float64 数组（不含 NaN）
+    threshold: 保留的点数
+
+    返回:
+    保留点的下标数组（包含首尾两点）
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    every = (n - 2) / (threshold - 2)
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0] = 0
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # 与上一个选中点、下一个桶的平均点构成的三角形面积最大的点
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    selected[-1] = n - 1
+    return selected
+
+
+def minmax(x, y, threshold):
+    """每个桶保留最小值和最大值所在的点（尖峰不会被平滑掉），返回下标数组"""
+    n = len(y)
+    if threshold >= n or threshold < 4:
+        return np.arange(n)
+    selected = [0, n - 1]
+    for bucket in np.array_split(np.arange(1, n - 1), threshold // 2 - 1):
+        if len(bucket):
+            selected.append(bucket[int(np.argmin(y[bucket]))])
+            selected.append(bucket[int(np.argmax(y[bucket]))])
+    return np.unique(selected)
+
+
+DOWNSAMPLERS = {
+    "lttb": lttb,
+    "minmax": minmax,
+}
+
+
+def _numeric(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[us]").astype(np.int64).astype(np.float64)
+    if x.dtype == object:
+        return np.array([value.timestamp() if hasattr(value, "timestamp") else value for value in x],
+                        dtype=np.float64)
+    return x.astype(np.float64)
+
+
+def downsample(x, y, max_points=DEFAULT_MAX_POINTS, method="lttb"):
+    """
+    对一条曲线降采样，保留 NaN 造成的断点
+
+    参数:
+    x: 横坐标（数值、datetime64 或 datetime 数组）
+    y: 纵坐标，缺失数据为 NaN
+    max_points: 保留的点数上限
+    method: 'lttb' 或 'minmax'
+
+    返回:
+    (x, y)：点数不超过 max_points 时原样返回
+    """
+    y = np.asarray(y, dtype=np.float64)
+    if max_points is None or len(y) <= max_points:
+        return x, y
+    select = DOWNSAMPLERS[method]
+    x_values = _numeric(x)
+    finite = np.isfinite(y)
+    total = int(finite.sum())
+    if total == 0:
+        return x[:0], y[:0]
+
+    # 按连续的有效数据段分别降采样，段与段之间保留一个 NaN 点使曲线断开
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], finite.astype(np.int8), [0]))))
+    indices = []
+    for start, end in zip(edges[::2], edges[1::2]):
+        points = max(2, int(round(max_points * (end - start) / total)))
+        indices.append(start + select(x_values[start:end], y[start:end], points))
+        if end < len(y):
+            indices.append(np.array([end]))
+    index = np.concatenate(indices)
+    return np.asarray(x)[index], y[index]
+
+
+def _draw_axes(ax, spec, max_points, method):
+    from matplotlib.dates import DateFormatter
+
+    for line in spec.get("lines", ()):
+        x, y = downsample(line["x"], line["y"], max_points, method)
+        ax.plot(x, y, *([line["fmt"]] if line.get("fmt") else []),
+                **({"label": line["label"]} if line.get("label") else {}))
+    for line in spec.get("hlines", ()):
+        ax.axhline(**line)
+    for line in spec.get("vlines", ()):
+        ax.axvline(**line)
+    for text in spec.get("texts", ()):
+        ax.text(**text)
+    if "title" in spec:
+        ax.set_title(spec["title"])
+    if "xlabel" in spec:
+        ax.set_xlabel(spec["xlabel"])
+    if "ylabel" in spec:
+        ax.set_ylabel(spec["ylabel"])
+    if spec.get("legend"):
+        ax.legend()
+    if spec.get("grid"):
+        ax.grid(True)
+    if "xrotation" in spec:
+        for label in ax.get_xticklabels():
+            label.set_rotation(spec["xrotation"])
+    if "time_format" in spec:
+        ax.xaxis.set_major_formatter(DateFormatter(spec["time_format"]))
+
+
+def render_figure(spec):
+    """
+    按图表描述绘图，返回 PNG 字节
+
+    只使用 Agg 画布（不导入 pyplot），可在无显示环境和子进程中运行。
+
+    参数:
+    spec: 图表描述 dict：
+          filename、figsize、dpi、max_points（每条曲线的点数上限）、downsample（'lttb'/'minmax'）、
+          axes（子图描述列表：position 为 subplot 参数，lines 为 x/y/fmt/label，
+          hlines/vlines/texts 为 axhline/axvline/text 的参数，以及 title、xlabel、ylabel、
+          legend、grid、xrotation、time_format）
+    """
+    import matplotlib
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    with matplotlib.rc_context(RC_PARAMS):
+        fig = Figure(figsize=spec.get("figsize"))
+        FigureCanvasAgg(fig)
+        for axes in spec["axes"]:
+            ax = fig.add_subplot(*axes.get("position", (1, 1, 1)))
+            _draw_axes(ax, axes, spec.get("max_points", DEFAULT_MAX_POINTS), spec.get("downsample", "lttb"))
+        if spec.get("tight_layout", True):
+            fig.tight_layout()
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=spec.get("dpi", 100))
+    return buffer.getvalue()
+
+
+def figure_key(spec):
+    """图表描述（含全部数据）的内容哈希，数据和绘图参数都不变时哈希不变"""
+    import matplotlib
+
+    content = pickle.dumps((RENDER_VERSION, matplotlib.__version__, RC_PARAMS, spec), protocol=4)
+    return hashlib.sha256(content).hexdigest()
+
+
+def _write(path, data):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def render_figures(specs, max_workers=None, cache_dir=".render_cache"):
+    """
+    并行绘制多张图表
+
+    每张图先按内容哈希查找渲染缓存，命中时直接写出缓存的 PNG；其余图表在进程池中绘制
+    （只有一张需要绘制或 max_workers 为 1 时在当前进程中绘制）。
+
+    参数:
+    specs: 图表描述列表（见 render_figure），filename 为输出路径
+    max_workers: 进程数，默认等于需要绘制的图表数（不超过 CPU 数）
+    cache_dir: 渲染缓存目录，为 None 时不使用缓存
+
+    返回:
+    dict: 输出路径 -> 'cached' 或 'rendered'
+    """
+    cache = ResponseCache(cache_dir) if cache_dir else None
+    try:
+        return _render_all(specs, max_workers, cache)
+    finally:
+        # 命中只更新内存中的访问时间，全部图表处理完后写回一次索引
+        if cache:
+            cache.close()
+
+
+def _render_all(specs, max_workers, cache):
+    status = {}
+    pending = []
+    for spec in specs:
+        key = figure_key(spec) if cache else None
+        data = cache.get_bytes(key) if cache else None
+        if data is not None:
+            _write(spec["filename"], data)
+            status[spec["filename"]] = "cached"
+        else:
+            pending.append((spec, key))
+
+    workers = min(len(pending), max_workers or os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            images = list(executor.map(render_figure, [spec for spec, _ in pending]))
+    else:
+        images = [render_figure(spec) for spec, _ in pending]
+
+    for (spec, key), data in zip(pending, images):
+        _write(spec["filename"], data)
+        if cache:
+            cache.put_bytes(key, data, filename=spec["filename"])
+        status[spec["filename"]] = "rendered"
+    return status
@@ -0,0 +1,255 @@
+"""
+   Shared ETAP DataHub client with per-call timeouts, retries and latency metrics
+"""
+
+import json
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+# 各命名空间调用的默认超时时间（秒），None 表示不限时（潮流等计算可能运行很久）
+DEFAULT_TIMEOUTS = {
+    "application": 30,
+    "projectdata": 300,
+    "studies": None,
+}
+
+# 只读且可安全重试的调用：application 下的全部调用，以及 projectdata 的 get* 调用
+IDEMPOTENT_NAMESPACES = {"application"}
+IDEMPOTENT_PREFIXES = ("get",)
+
+NAMESPACES = ("application", "projectdata", "studies")
+
+_clients = {}
+_connections = {}
+_clients_lock = threading.Lock()
+
+# 当前线程正在进行的 DataHub 调用的超时时间，只由 DataHubClient 挂载到 etap.api 会话上的适配器读取
+_transport = threading.local()
+
+
+@contextmanager
+def _transport_timeout(timeout):
+    """在当前线程中为接下来发出的 DataHub 请求设置超时时间（None 表示不限时）"""
+    previous = getattr(_transport, "timeout", _transport)
+    _transport.timeout = timeout
+    try:
+        yield
+    finally:
+        if previous is _transport:
+            del _transport.timeout
+        else:
+            _transport.timeout = previous
+
+
+def _timeout_adapter(pool_size):
+    """
+    创建 requests 的连接池适配器：保持 keep-alive 连接，请求未指定超时时使用当前 DataHub 调用的超时时间
+
+    参数:
+    pool_size: 连接池中保留的连接数
+
+    返回:
+    requests.adapters.HTTPAdapter，未安装 requests 时返回 None
+    """
+    try:
+        from requests.adapters import HTTPAdapter
+    except ImportError:
+        return None
+
+    class TimeoutAdapter(HTTPAdapter):
+        def send(self, request, stream=False, timeout=None, *args, **kwargs):
+            if timeout is None:
+                timeout = getattr(_transport, "timeout", None)
+            return super().send(request, stream, timeout, *args, **kwargs)
+
+    return TimeoutAdapter(pool_connections=1, pool_maxsize=pool_size)
+
+
+def _find_sessions(etap_client):
+    """查找 etap.api 客户端及其各命名空间用于发送请求的 requests.Session"""
+    try:
+        from requests import Session
+    except ImportError:
+        return []
+    sessions = []
+    for target in (etap_client, *(getattr(etap_client, name, None) for name in NAMESPACES)):
+        for value in list(getattr(target, "__dict__", {}).values()):
+            if isinstance(value, Session) and all(value is not session for session in sessions):
+                sessions.append(value)
+    return sessions
+
+
+def _is_timeout(error):
+    """判断异常是否由套接字超时引起（包括 urllib 的 URLError 和 requests 的 Timeout 包装）"""
+    for item in (error, getattr(error, "reason", None), error.__cause__, error.__context__):
+        if isinstance(item, (socket.timeout, TimeoutError)) or "Timeout" in type(item).__name__:
+            return True
+    return False
+
+
+class _Namespace:
+    """将 etap.application / projectdata / studies 的调用转交给 DataHubClient"""
+
+    def __init__(self, client, name, target):
+        self._client = client
+        self._name = name
+        self._target = target
+
+    def __getattr__(self, method):
+        func = getattr(self._target, method)
+        if not callable(func):
+            return func
+
+        def call(*args, **kwargs):
+            return self._client.call(self._name, method, func, *args, **kwargs)
+
+        return call
+
+
+class DataHubClient:
+    """
+    etap.api 客户端的包装
+
+    - 同一地址、同一组参数在进程内只建立一次连接，反复 connect() 复用同一个已连接的客户端
+    - etap.api 客户端通过 requests.Session 发送请求时，在该会话上挂载 keep-alive 连接池，
+      每次调用有超时限制（作用于 HTTP 连接和响应读取），超时抛出 TimeoutError，不会因 DataHub 无响应而一直挂起；
+      连接池和超时只作用于该会话，进程中其他 HTTP 请求不受影响
+    - 只读调用失败或超时后按指数退避重试
+    - 记录每种调用的次数、耗时、错误和重试次数
+    """
+
+    def __init__(self, etap_client, timeouts=None, retries=3, backoff=0.5, pool_size=4):
+        """
+        参数:
+        etap_client: etap.api.connect() 返回的客户端
+        timeouts: 命名空间 -> 超时时间（秒），覆盖 DEFAULT_TIMEOUTS
+        retries: 只读调用的最大重试次数
+        backoff: 第一次重试前的等待时间（秒），之后每次翻倍
+        pool_size: 连接池中保留的 keep-alive 连接数
+        """
+        self._etap = etap_client
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.retries = retries
+        self.backoff = backoff
+        self._metrics_lock = threading.Lock()
+        self.metrics = {}
+        self.application = _Namespace(self, "application", etap_client.application)
+        self.projectdata = _Namespace(self, "projectdata", etap_client.projectdata)
+        self.studies = _Namespace(self, "studies", etap_client.studies)
+        self.sessions = self._bind_sessions(pool_size)
+
+    def _bind_sessions(self, pool_size):
+        """在 etap.api 客户端的 requests.Session 上挂载连接池适配器，返回已挂载的会话"""
+        sessions = _find_sessions(self._etap)
+        if not sessions:
+            print("DataHub client exposes no requests session, calls use its own transport "
+                  "without connection pooling or timeouts.")
+            return []
+        for session in sessions:
+            adapter = _timeout_adapter(pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        return sessions
+
+    def __getattr__(self, name):
+        return getattr(self._etap, name)
+
+    @staticmethod
+    def _is_idempotent(namespace, method):
+        return namespace in IDEMPOTENT_NAMESPACES or method.lower().startswith(IDEMPOTENT_PREFIXES)
+
+    def _record(self, namespace, method, elapsed, error=False, retry=False):
+        with self._metrics_lock:
+            stats = self.metrics.setdefault(f"{namespace}.{method}", {
+                "calls": 0, "errors": 0, "retries": 0, "total": 0.0, "max": 0.0})
+            if retry:
+                stats["retries"] += 1
+                return
+            stats["calls"] += 1
+            stats["total"] += elapsed
+            stats["max"] = max(stats["max"], elapsed)
+            if error:
+                stats["errors"] += 1
+
+    def _call_once(self, namespace, method, func, args, kwargs):
+        timeout = self.timeouts.get(namespace)
+        start = time.perf_counter()
+        try:
+            with _transport_timeout(timeout):
+                result = func(*args, **kwargs)
+        except Exception as e:
+            self._record(namespace, method, time.perf_counter() - start, error=True)
+            if timeout is not None and _is_timeout(e):
+                raise TimeoutError(f"no response within {timeout}s") from e
+            raise
+        self._record(namespace, method, time.perf_counter() - start)
+        return result
+
+    def call(self, namespace, method, func, *args, **kwargs):
+        """执行一次 DataHub 调用，只读调用失败时按指数退避重试"""
+        attempts = self.retries + 1 if self._is_idempotent(namespace, method) else 1
+        delay = self.backoff
+        for attempt in range(attempts):
+            try:
+                return self._call_once(namespace, method, func, args, kwargs)
+            except Exception as e:
+                if attempt == attempts - 1:
+                    raise
+                print(f"{namespace}.{method} failed ({str(e)}), retrying in {delay:.1f}s...")
+                self._record(namespace, method, 0.0, retry=True)
+                time.sleep(delay)
+                delay *= 2
+
+    def print_metrics(self):
+        """打印各调用的次数与耗时统计"""
+        print(f"{'Call':<36}{'Calls':>7}{'Errors':>8}{'Retries':>9}{'Mean(s)':>10}{'Max(s)':>10}")
+        for name, stats in sorted(self.metrics.items()):
+            mean = stats["total"] / stats["calls"] if stats["calls"] else 0.0
+            print(f"{name:<36}{stats['calls']:>7}{stats['errors']:>8}{stats['retries']:>9}"
+                  f"{mean:>10.3f}{stats['max']:>10.3f}")
+
+
+def _options_key(options):
+    return json.dumps(options, sort_keys=True, default=str)
+
+
+def connect(base_address, **options):
+    """
+    连接 ETAP DataHub，同一地址、同一组参数在进程内复用同一个客户端
+
+    参数:
+    base_address: REST API 地址，例如 configuration.base_address
+    options: 传给 DataHubClient 的参数（timeouts、retries、backoff、pool_size），参数不同时返回不同的客户端，
+             它们共用同一地址的 etap.api 连接
+
+    返回:
+    DataHubClient
+    """
+    key = (base_address, _options_key(options))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            etap_client = _connections.get(base_address)
+            if etap_client is None:
+                import etap.api
+
+                etap_client = etap.api.connect(base_address)
+                _connections[base_address] = etap_client
+            client = DataHubClient(etap_client, **options)
+            _clients[key] = client
+        return client
+
+
+def disconnect(base_address):
+    """
+    丢弃某个地址的全部缓存客户端和 etap.api 连接（例如 DataHub 重启后），下一次 connect() 重新连接
+
+    参数:
+    base_address: REST API 地址
+    """
+    with _clients_lock:
+        for key in [key for key in _clients if key[0] == base_address]:
+            del _clients[key]
+        _connections.pop(base_address, None)
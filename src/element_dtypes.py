@@ -0,0 +1,65 @@
+"""
+   Vectorized type coercion for exported element tables
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.element_schema import get_column_dtypes
+
+BOOL_VALUES = {"true": True, "false": False, "1": True, "0": False}
+
+
+def _coerce_series(raw, dtype):
+    """将字符串列整体转换为目标类型，无法解析的值置为缺失"""
+    if dtype == "bool":
+        return raw.astype("string").str.strip().str.lower().map(BOOL_VALUES).astype("boolean")
+    if dtype == "category":
+        return raw.astype("category")
+    values = pd.to_numeric(raw, errors="coerce")
+    if pd.api.types.is_integer_dtype(pd.api.types.pandas_dtype(dtype)):
+        # 先按浮点数解析，非整数及超出范围的值（例如 NrOfCells="3.5"）置为缺失并计入解析失败，
+        # 避免整列转换失败导致整张表被丢弃
+        values = values.astype("float64")
+        info = np.iinfo(pd.api.types.pandas_dtype(dtype).numpy_dtype)
+        values = values.mask((values % 1 != 0) | (values < info.min) | (values > info.max))
+    return values.astype(dtype)
+
+
+def coerce_frame(df, element_type, column_dtypes=None):
+    """
+    按属性类型定义转换元件DataFrame的列类型
+
+    参数:
+    df: 由导出流程生成的元件DataFrame（各列为原始XML字符串）
+    element_type: ETAP元件类型，用于查找列的数据类型
+    column_dtypes: 额外的 列名 -> 数据类型 定义，优先于注册表
+
+    返回:
+    (pandas.DataFrame, pandas.DataFrame): 转换后的数据表，以及解析失败值的报告
+    （列：Element、Column、IID、Value）
+    """
+    dtypes = {**get_column_dtypes(element_type), **(column_dtypes or {})}
+    typed = df.copy()
+    failures = []
+
+    for column, dtype in dtypes.items():
+        if column not in typed.columns:
+            continue
+        # 空字符串视为缺失值，不计入解析失败
+        raw = typed[column].astype("object")
+        raw = raw.mask(raw == "")
+        converted = _coerce_series(raw, dtype)
+        failed = raw.notna() & converted.isna()
+        if failed.any():
+            failures.append(pd.DataFrame({
+                "Element": element_type,
+                "Column": column,
+                "IID": typed.loc[failed, "IID"] if "IID" in typed.columns else None,
+                "Value": raw[failed],
+            }))
+        typed[column] = converted
+
+    report = pd.concat(failures, ignore_index=True) if failures else pd.DataFrame(
+        columns=["Element", "Column", "IID", "Value"])
+    return typed, report
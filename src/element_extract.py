@@ -0,0 +1,117 @@
+"""
+   Generic single-pass extraction of element attributes into columns
+"""
+
+import pandas as pd
+
+from src.element_schema import OpenSchema, get_schema
+
+MIN_CAPACITY = 64
+
+
+class ColumnarExtractor:
+    """将属性字典逐条写入预分配列数组的提取器
+
+    列数组按 size_hint 预分配，容量不足时成倍扩容；不构建逐行的字典列表。
+    schema 为 OpenSchema 时，列定义之外的属性在首次出现时追加为新列（之前的元素为 None）。
+    """
+
+    def __init__(self, schema, size_hint=0):
+        self.open = isinstance(schema, OpenSchema)
+        self.schema = dict(schema)
+        self.capacity = max(size_hint, MIN_CAPACITY)
+        self.count = 0
+        self.arrays = [[None] * self.capacity for _ in schema]
+        self._columns = list(zip(self.arrays, schema.values()))
+        self._attributes = set(schema.values()) | set(schema)
+
+    def _add_attributes(self, record):
+        """为未见过的属性追加列"""
+        for attribute in record:
+            if attribute not in self._attributes:
+                self._attributes.add(attribute)
+                self.schema[attribute] = attribute
+                array = [None] * self.capacity
+                self.arrays.append(array)
+                self._columns.append((array, attribute))
+
+    def _grow(self):
+        for array in self.arrays:
+            array.extend([None] * self.capacity)
+        self.capacity *= 2
+
+    def add(self, record):
+        """写入一条属性字典"""
+        if self.count == self.capacity:
+            self._grow()
+        if self.open and not self._attributes.issuperset(record):
+            self._add_attributes(record)
+        get = record.get
+        count = self.count
+        for array, attribute in self._columns:
+            array[count] = get(attribute)
+        self.count = count + 1
+
+    def extend(self, records):
+        """单次遍历写入全部属性字典"""
+        columns = self._columns
+        count = self.count
+        for record in records:
+            if count == self.capacity:
+                self._grow()
+            if self.open and not self._attributes.issuperset(record):
+                self._add_attributes(record)
+            get = record.get
+            for array, attribute in columns:
+                array[count] = get(attribute)
+            count += 1
+        self.count = count
+        return self
+
+    def columns(self):
+        """返回 导出列名 -> 列值列表，列长度为实际写入的元素数量"""
+        for array in self.arrays:
+            del array[self.count:]
+        self.capacity = self.count
+        return dict(zip(self.schema.keys(), self.arrays))
+
+
+def extract_columns(records, schema, size_hint=0):
+    """
+    单次遍历属性字典序列，将各属性写入预分配的列数组
+
+    参数:
+    records: 属性字典的可迭代对象（列表或生成器）
+    schema: 导出列名 -> ETAP属性名 的字典
+    size_hint: 预计的元素数量，records 为列表时自动取其长度
+
+    返回:
+    dict: 导出列名 -> 列值列表
+    """
+    if hasattr(records, "__len__"):
+        size_hint = len(records)
+    return ColumnarExtractor(schema, size_hint).extend(records).columns()
+
+
+def frame_from_columns(columns):
+    """由列数组构建元件DataFrame，首列为从1开始的序号 ID"""
+    count = len(next(iter(columns.values()), []))
+    if count == 0:
+        return pd.DataFrame()
+    return pd.DataFrame({"ID": range(1, count + 1), **columns})
+
+
+def build_element_frame(records, element_type, schema=None, size_hint=0):
+    """
+    按列定义构建元件DataFrame
+
+    参数:
+    records: 属性字典的可迭代对象
+    element_type: ETAP元件类型，用于查找列定义
+    schema: 自定义列定义，为空时使用 element_schema 中的注册项
+    size_hint: 预计的元素数量
+
+    返回:
+    pandas.DataFrame: 首列为从1开始的序号 ID，其余列按列定义顺序排列
+    """
+    return frame_from_columns(extract_columns(records, schema or get_schema(element_type), size_hint))
@@ -0,0 +1,302 @@
+"""
+   Declarative attribute -> column mappings for ETAP element types
+"""
+
+# 所有元件类型共有的列：导出列名 -> ETAP属性名
+COMMON_COLUMNS = {
+    "IID": "ID",
+    "InService": "InService",
+    "STATE": "InServiceState",
+}
+
+# 单端元件（挂接在一条母线上）的连接列
+BUS_COLUMNS = {
+    **COMMON_COLUMNS,
+    "BusID": "Bus",
+}
+
+# 支路元件（两端母线）的连接列
+BRANCH_COLUMNS = {
+    **COMMON_COLUMNS,
+    "FromBus": "FromBus",
+    "ToBus": "ToBus",
+}
+
+
+class OpenSchema(dict):
+    """
+    未声明列定义的元件类型使用的列定义
+
+    先提取其中的列（COMMON_COLUMNS），其余属性按首次出现的顺序各成一列，列名即ETAP属性名，
+    不会因为类型没有在 ELEMENT_SCHEMAS 中声明而丢失属性
+    """
+
+
+# 各元件类型的列定义，未列出的类型提取全部属性（见 OpenSchema）
+ELEMENT_SCHEMAS = {
+    # 直流系统元件
+    "INVERTER": {
+        **COMMON_COLUMNS,
+        "Felement": "BusID",
+        "Telement": "CZNetwork",
+        "ACkV": "KV",
+        "DCV": "DcV",
+        "KVA": "KVA",
+        "DCKW": "DckW",
+        "DCEff": "DcPercentEFF",
+        "ACkW": "GenCat0ACkW",
+        "ACkVar": "GenCat0kVar",
+        "Vref": "Vref",
+        "Smax": "KVAMax",
+        "Pmax": "KWMax",
+        "Qmax": "KvarMax",
+    },
+    "DCLUMPLOAD": {
+        **COMMON_COLUMNS,
+        "BUS_I": "Bus",
+        "RatedV": "DCV",
+        "RatedKW": "KW",
+        "Percent_P": "MTLoadPercent",
+        "Percent_Z": "StaticLoadPercent",
+    },
+    "BATTERY": {
+        **COMMON_COLUMNS,
+        "BusID": "Bus",
+        "Cells": "NrOfCells",
+        "Packs": "NoOfPacks",
+        "Strings": "NrOfStrings",
+    },
+    "CABLE": {
+        **BRANCH_COLUMNS,
+        "LENGTH": "LengthValue",
+        "LENGTH_Unit": "ImpedanceUnits",
+        "OhmsPerLengthValue": "OhmsPerLengthValue",
+        "OhmsPerLengthUnit": "OhmsPerLengthUnit",
+        "RPosValue": "RPosValue",
+        "XPosValue": "XPosValue",
+    },
+    "DCBUS": {
+        "IID": "ID",
+        "NominalV": "NominalV",
+        "InService": "InService",
+        "STATE": "InServiceState",
+    },
+    "DCIMPEDANCE": {
+        **BRANCH_COLUMNS,
+        "RValue": "RValue",
+        "LValue": "LValue",
+    },
+    "DCSTLOAD": {
+        **BUS_COLUMNS,
+        "RatedV": "RatedV",
+        "RatedKW": "KW",
+    },
+    "DCMACHINE": {
+        **BUS_COLUMNS,
+        "RatedV": "RatedV",
+        "RatedKW": "KW",
+    },
+    "DCCONVERTER": {
+        **COMMON_COLUMNS,
+        "InputBus": "InputBus",
+        "OutputBus": "OutputBus",
+        "InputV": "InputV",
+        "OutputV": "OutputV",
+        "RatedKW": "KW",
+        "Eff": "PercentEFF",
+    },
+    "CHARGER": {
+        **BUS_COLUMNS,
+        "ACkV": "KV",
+        "KVA": "KVA",
+        "DCV": "DcV",
+        "Eff": "PercentEFF",
+    },
+    "PVArray": {
+        **BUS_COLUMNS,
+        "PanelW": "PVAPower",
+        "Model": "PVAModel",
+        "Vmpp": "Vmpp",
+        "Voc": "Voc",
+    },
+    # 交流系统元件
+    "BUS": {
+        **COMMON_COLUMNS,
+        "NominalkV": "NominalkV",
+        "VMag": "VMag",
+        "VAng": "VAng",
+        "VMinLimit": "VMinLimit",
+        "VMaxLimit": "VMaxLimit",
+    },
+    "UTIL": {
+        **BUS_COLUMNS,
+        "KV": "KV",
+        "VoltageMagnitude": "VoltageMagnitude",
+        "VoltageAngle": "VoltageAngle",
+        "Mode": "PdeStatus",
+        "PosR": "PosR",
+        "PosX": "PosX",
+    },
+    "XFORM2W": {
+        **BRANCH_COLUMNS,
+        "PrimkV": "PrimkV",
+        "SeckV": "SeckV",
+        "MVA": "AnsiMVA",
+        "PosZ": "AnsiPosZ",
+        "PosXR": "AnsiPosXR",
+        "PrimTap": "PrimPercentTap",
+    },
+    "XLINE": {
+        **BRANCH_COLUMNS,
+        "KV": "KV",
+        "Length": "Length",
+        "LengthUnit": "LengthUnit",
+        "RPos": "RPos",
+        "XPos": "XPos",
+        "YPos": "YPos",
+    },
+    "LUMPEDLOAD": {
+        **BUS_COLUMNS,
+        "KV": "KV",
+        "MVA": "MVA",
+        "PF": "PF",
+        "Percent_P": "MTLoadPercent",
+        "Percent_Z": "StaticLoadPercent",
+    },
+    "STLOAD": {
+        **BUS_COLUMNS,
+        "KV": "KV",
+        "KVA": "KVA",
+        "KW": "KW",
+        "Kvar": "Kvar",
+        "PF": "PF",
+    },
+    "WTGEN": {
+        **BUS_COLUMNS,
+        "KV": "KV",
+        "MVA": "MVA",
+        "MW": "MW",
+    },
+    "HVCB": {
+        **COMMON_COLUMNS,
+        "Rated": "Rated",
+        "Status": "Status",
+    },
+}
+
+
+def get_schema(element_type):
+    """
+    获取元件类型的列定义
+
+    参数:
+    element_type: ETAP元件类型，例如 'BUS'
+
+    返回:
+    dict: 导出列名 -> ETAP属性名；未声明的类型返回 OpenSchema，提取全部属性
+    """
+    schema = ELEMENT_SCHEMAS.get(element_type)
+    return schema if schema is not None else OpenSchema(COMMON_COLUMNS)
+
+
+# ETAP属性的数据类型，用于导出表的类型转换；未列出的属性保留原始字符串
+ATTRIBUTE_DTYPES = {
+    # 投运状态
+    "InService": "bool",
+    # 重复出现的标识与单位，使用分类类型
+    "InServiceState": "category",
+    "Bus": "category",
+    "BusID": "category",
+    "CZNetwork": "category",
+    "FromBus": "category",
+    "ToBus": "category",
+    "InputBus": "category",
+    "OutputBus": "category",
+    "PdeStatus": "category",
+    "ImpedanceUnits": "category",
+    "OhmsPerLengthUnit": "category",
+    "LengthUnit": "category",
+    "PVAModel": "category",
+    # 计数
+    "NrOfCells": "Int32",
+    "NoOfPacks": "Int32",
+    "NrOfStrings": "Int32",
+    "Status": "Int32",
+    # 电压、功率、阻抗等额定值
+    "KV": "float64",
+    "NominalkV": "float64",
+    "NominalV": "float64",
+    "PrimkV": "float64",
+    "SeckV": "float64",
+    "DCV": "float64",
+    "DcV": "float64",
+    "RatedV": "float64",
+    "InputV": "float64",
+    "OutputV": "float64",
+    "Rated": "float64",
+    "KVA": "float64",
+    "MVA": "float64",
+    "AnsiMVA": "float64",
+    "KW": "float64",
+    "Kvar": "float64",
+    "MW": "float64",
+    "DckW": "float64",
+    "GenCat0ACkW": "float64",
+    "GenCat0kVar": "float64",
+    "KVAMax": "float64",
+    "KWMax": "float64",
+    "KvarMax": "float64",
+    "PVAPower": "float64",
+    "Vmpp": "float64",
+    "Voc": "float64",
+    "LengthValue": "float64",
+    "Length": "float64",
+    "OhmsPerLengthValue": "float64",
+    "RPosValue": "float64",
+    "XPosValue": "float64",
+    "RValue": "float64",
+    "LValue": "float64",
+    "RPos": "float64",
+    "XPos": "float64",
+    "YPos": "float64",
+    "PosR": "float64",
+    "PosX": "float64",
+    "VMag": "float64",
+    "VAng": "float64",
+    "VoltageMagnitude": "float64",
+    "VoltageAngle": "float64",
+    # 百分比类参数，float32 精度足够
+    "DcPercentEFF": "float32",
+    "PercentEFF": "float32",
+    "MTLoadPercent": "float32",
+    "StaticLoadPercent": "float32",
+    "Vref": "float32",
+    "PF": "float32",
+    "AnsiPosZ": "float32",
+    "AnsiPosXR": "float32",
+    "PrimPercentTap": "float32",
+    "VMinLimit": "float32",
+    "VMaxLimit": "float32",
+}
+
+
+def get_column_dtypes(element_type):
+    """
+    获取元件类型各导出列的数据类型
+
+    参数:
+    element_type: ETAP元件类型
+
+    返回:
+    dict: 导出列名 -> 数据类型，仅包含在 ATTRIBUTE_DTYPES 中声明过的列；
+          未声明列定义的类型中以属性名为列名的列同样按 ATTRIBUTE_DTYPES 转换
+    """
+    schema = get_schema(element_type)
+    columns = dict(schema)
+    if isinstance(schema, OpenSchema):
+        columns.update({attribute: attribute for attribute in ATTRIBUTE_DTYPES if attribute not in columns})
+    return {
+        column: ATTRIBUTE_DTYPES[attribute]
+        for column, attribute in columns.items()
+        if attribute in ATTRIBUTE_DTYPES
+    }
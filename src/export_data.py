@@ -3,46 +3,34 @@
 """
 
 import sqlite3
-import pandas as pd
+from contextlib import closing
 
+from src.result_db import open_result_db
+from src.unbalanced_results import bus_unbalance
 
-def export_report(database_path):
-    try:
-        conn = sqlite3.connect(database_path)
-        cur = conn.cursor()
 
+def export_report(database_path, details=False):
+    """
+    读取不平衡潮流结果中的母线电压
+
+    参数:
+    database_path: 不平衡潮流结果数据库路径
+    details: 为 True 时附加各相最低/最高电压、对称分量及电压不平衡度（VUF）
+
+    返回:
+    pandas.DataFrame: bus_ID、volt_mag（三相平均，标幺值）、volt_ang（三相平均角度）
+    """
+    try:
         # 执行查询
         print("\n执行数据查询...")
-        cur.execute("""
-            SELECT IDBus, NomlkV, VMagA, VMagB, VMagC, VAngA, VAngB, VAngC
-            FROM IBusLF3PH
-            WHERE NomlkV > 0;
-        """)
-        rows = cur.fetchall()
-
-        if not rows:
+        with closing(open_result_db(database_path)) as conn:
+            result_bus = bus_unbalance(conn)
+
+        if result_bus.empty:
             raise Exception("未找到符合条件的数据")
 
-        # 计算平均相电压和平均相角
-        result_bus = {
-            "bus_ID": [],
-            "volt_mag": [],
-            "volt_ang": []
-        }
-
-        for row in rows:
-            bus_id, nominal_kv, vmag_a, vmag_b, vmag_c, vang_a, vang_b, vang_c = row
-            # 计算三相电压的平均值（百分比转换为标幺值）
-            avg_voltage = (vmag_a + vmag_b + vmag_c) / 300 if all(
-                v is not None for v in [vmag_a, vmag_b, vmag_c]) else None
-            # 计算三相角度的平均值
-            avg_angle = (vang_a + vang_b + vang_c) / 300 if all(a is not None for a in [vang_a, vang_b, vang_c]) else None
-
-            result_bus["bus_ID"].append(bus_id)
-            result_bus["volt_mag"].append(avg_voltage)
-            result_bus["volt_ang"].append(avg_angle)
-
-        result_bus = pd.DataFrame(result_bus)
+        if not details:
+            result_bus = result_bus[["bus_ID", "volt_mag", "volt_ang"]]
         print(f"\n成功获取数据，共 {len(result_bus)} 条记录")
         return result_bus
 
@@ -52,10 +40,3 @@ def export_report(database_path):
     except Exception as e:
         print(f"发生错误: {e}")
         raise
-    finally:
-        if 'cur' in locals():
-            cur.close()
-        if 'conn' in locals():
-            conn.close()
-
-
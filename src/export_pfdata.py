@@ -3,30 +3,34 @@
 """
 
 import sqlite3
+from contextlib import closing
+
 import pandas as pd
-def export_pfreport(database_path):
-    conn = sqlite3.connect(database_path)
-    cur = conn.cursor()
-    # Test the connection
-    print("Test SQLite connection...")
-    result = cur.execute('SELECT SQLITE_VERSION()')
-    version = result.fetchone()
-    print("SQLite version:", version)
-    # obtain the bus name information
-    cur.execute(r"SELECT IDFrom FROM LFR WHERE TYPE!=0 AND kV != 0;")
-    bus_ID = cur.fetchall()
-    # obtain the bus voltage magnitude information
-    cur.execute(r"select kV from LFR WHERE TYPE!=0 AND kV != 0;")
-    base_kV = cur.fetchall()
-    cur.execute(r"select VoltMag from LFR WHERE TYPE!=0 AND kV != 0;")
-    volt_mag = cur.fetchall()
-    # obtain the bus voltage angle information
-    cur.execute(r"select VoltAng from LFR WHERE TYPE!=0 AND kV != 0;")
-    volt_ang = cur.fetchall()
-    cur.close()
+
+from src.result_db import open_result_db
+from src.result_reader import read_lf_results
+
+
+def export_pfreport(database_path, fields=None):
+    """
+    读取潮流结果中的母线电压
+
+    参数:
+    database_path: 潮流结果数据库路径
+    fields: 额外读取的 LFR 字段（例如 'kV'），按原字段名附加在结果列之后
+
+    返回:
+    pandas.DataFrame: bus_ID、volt_mag（标幺值）、volt_ang 及额外字段
+    """
+    print("SQLite version:", sqlite3.sqlite_version)
+    # obtain the bus ID, voltage magnitude and angle in one query over a read-only connection
+    extra = [field for field in (fields or []) if field not in ("IDFrom", "VoltMag", "VoltAng")]
+    with closing(open_result_db(database_path)) as conn:
+        columns = read_lf_results(conn, ["IDFrom", "VoltMag", "VoltAng", *extra])
     # combine the voltage information
-    result_bus = {"bus_ID": [item[0] for item in bus_ID],
-                  "volt_mag": [item[0] / 100 for item in volt_mag],
-                  "volt_ang": [item[0] for item in volt_ang]}
+    result_bus = {"bus_ID": columns["IDFrom"],
+                  "volt_mag": columns["VoltMag"] / 100,
+                  "volt_ang": columns["VoltAng"]}
+    result_bus.update({field: columns[field] for field in extra})
     result_bus = pd.DataFrame(result_bus)
-    return result_bus
\ No newline at end of file
+    return result_bus
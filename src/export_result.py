@@ -1,15 +1,38 @@
 import sqlite3
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib.dates import DateFormatter
-import datetime
-import matplotlib.font_manager as fm
-from matplotlib import rcParams
+
+from src.chart_render import DEFAULT_MAX_POINTS, render_figures
+from src.result_db import open_result_db
+from src.td_analytics import load_statistics as compute_load_statistics, parse_times, power_factor, system_statistics
+from src.td_reader import SYSTEM_RESULT_ROWS, critical_buses, fetch_device_series
+
+
+def _series_values(column):
+    """将时间序列矩阵的一列转换为列表，缺失的数据（NaN）为 None"""
+    return [None if np.isnan(value) else float(value) for value in column]
+
+
+def _plot_values(values):
+    """绘图数据：None 转换为 NaN"""
+    return np.asarray(values, dtype=np.float64)
+
+
+def _time_axes(position, title, ylabel, lines, hlines=(), legend=True):
+    """以时间为横轴的子图描述（格式与 chart_render.render_figure 相同）"""
+    return {"position": position, "lines": lines, "hlines": list(hlines), "title": title, "xlabel": "Time",
+            "ylabel": ylabel, "legend": legend, "grid": True, "xrotation": 45, "time_format": "%H:%M"}
+
+
+def _figure(filename, figsize, axes, max_points, downsample):
+    return {"filename": filename, "figsize": figsize, "dpi": 300, "axes": axes,
+            "max_points": max_points, "downsample": downsample}
 
 
 def export_time_series_power_flow(database_path, output_file="time_series_results.txt",
-                                  custom_buses=None,custom_loads=None):
+                                  custom_buses=None,custom_loads=None, snapshot=False,
+                                  max_points=DEFAULT_MAX_POINTS, downsample="lttb", render_workers=None,
+                                  render_cache=".render_cache", load_statistics=False, energy_statistics=False):
     """
     导出时序潮流计算结果并生成可视化图表
 
@@ -18,39 +41,37 @@ def export_time_series_power_flow(database_path, output_file="time_series_result
     output_file: 输出文本文件的路径
     custom_buses: 用户指定的要查看电压和相角的母线ID列表，例如 ['Bus_1', 'Bus_2']
     custom_loads: 用户指定的要查看有功无功和电流的负荷ID列表，例如 ['Load_1', 'Load_2']
+    snapshot: 是否先将数据库复制到内存中再查询
+    max_points: 图中每条曲线最多绘制的点数，超过时降采样；None 表示绘制全部数据点
+    downsample: 降采样方法，'lttb' 或 'minmax'（每个桶保留最小值和最大值）
+    render_workers: 并行绘图的进程数，默认等于需要绘制的图表数
+    render_cache: 渲染缓存目录，数据未变化的图表不重新绘制；None 表示不使用缓存
+    load_statistics: 是否在文本报告末尾附加负荷统计，并在Excel文件中写入 Load_Statistics 工作表
+    energy_statistics: 是否在文本报告末尾附加系统电量统计（峰值负荷、负荷率、负荷电量和损耗电量）
 
     返回:
     pandas.DataFrame: 包含关键结果数据的DataFrame
     """
     try:
-        # 设置中文字体支持
-        plt.rcParams['font.sans-serif'] = ['SimHei', 'DejaVu Sans', 'Arial Unicode MS', 'sans-serif']
-        plt.rcParams['axes.unicode_minus'] = False  # 正确显示负号
-
-        # 连接到数据库
-        conn = sqlite3.connect(database_path)
+        # 本次导出独占的只读连接，返回前关闭，不会在导出结束后继续占用结果文件
+        conn = open_result_db(database_path, snapshot=snapshot)
         cur = conn.cursor()
 
-        # 测试连接
-        result = cur.execute('SELECT SQLITE_VERSION()')
-        version = result.fetchone()
-        print(f"SQLite版本: {version[0]}")
+        version = sqlite3.sqlite_version
+        print(f"SQLite版本: {version}")
 
         # 获取时间点信息
         cur.execute("SELECT ResultID, Time FROM TDTimeID ORDER BY TimeID;")
         time_points = cur.fetchall()
-        time_data = [(rid, datetime.datetime.strptime(t, '%m-%d-%Y %H:%M:%S.%f'))
-                     for rid, t in time_points]
-
-        # 创建时间和结果ID的映射
-        result_ids = [rid for rid, _ in time_data]
-        timestamps = [t for _, t in time_data]
+        # 一次性解析全部时间点（datetime64 数组），后续统计和绘图共用
+        timestamps = parse_times([t for _, t in time_points])
+        series_ids = np.array([rid for rid, _ in time_points], dtype=np.int64)
 
         # 打开输出文件
         with open(output_file, 'w', encoding='utf-8') as f:
             # 写入数据库信息头
             f.write("===== 时序潮流计算结果 =====\n")
-            f.write(f"SQLite版本: {version[0]}\n")
+            f.write(f"SQLite版本: {version}\n")
             f.write(f"数据库路径: {database_path}\n\n")
 
             # 写入时间点信息
@@ -62,10 +83,7 @@ def export_time_series_power_flow(database_path, output_file="time_series_result
             cur.execute("""
                 SELECT t.Time, s.TotalLoadMWPhA + s.TotalLoadMWPhB + s.TotalLoadMWPhC as TotalLoadMW,
                 s.MWLossPhA + s.MWLossPhB + s.MWLossPhC as TotalLossMW
-                FROM TDTimeID t 
-                JOIN TDSysResult s ON t.ResultID = s.ResultID
-                ORDER BY t.TimeID
-            """)
+            """ + SYSTEM_RESULT_ROWS)
             system_load_data = cur.fetchall()
 
             f.write("时间, 总负荷(MW), 总损耗(MW)\n")
@@ -77,10 +95,7 @@ def export_time_series_power_flow(database_path, output_file="time_series_result
             f.write("===== 系统最低电压随时间变化 =====\n")
             cur.execute("""
                 SELECT t.Time, s.MinLNBusVPhA, s.MinLNBusVDeviceID
-                FROM TDTimeID t 
-                JOIN TDSysResult s ON t.ResultID = s.ResultID
-                ORDER BY t.TimeID
-            """)
+            """ + SYSTEM_RESULT_ROWS)
             min_voltage_data = cur.fetchall()
 
             f.write("时间, 最低电压(%), 母线ID\n")
@@ -92,10 +107,7 @@ def export_time_series_power_flow(database_path, output_file="time_series_result
             f.write("===== 系统最大支路负载随时间变化 =====\n")
             cur.execute("""
                 SELECT t.Time, s.MaxBranchLoadingPhA, s.MaxBranchLoadingDeviceID
-                FROM TDTimeID t 
-                JOIN TDSysResult s ON t.ResultID = s.ResultID
-                ORDER BY t.TimeID
-            """)
+            """ + SYSTEM_RESULT_ROWS)
             max_loading_data = cur.fetchall()
 
             f.write("时间, 最大支路负载(%), 设备ID\n")
@@ -110,16 +122,10 @@ def export_time_series_power_flow(database_path, output_file="time_series_result
                 buses_to_process.extend(custom_buses)
             else:
                 # 如果用户没有指定母线，则使用欠压母线
-                cur.execute("""
-                    SELECT DISTINCT DeviceID FROM TDAlert 
-                    WHERE Condition='Under Voltage' AND AlertType='Critical'
-                    LIMIT 5
-                """)
-                critical_buses = cur.fetchall()
-                buses_to_process.extend([bus[0] for bus in critical_buses])
+                buses_to_process.extend(critical_buses(conn))
 
-            # 确保buses_to_process中没有重复项
-            buses_to_process = list(set(buses_to_process))
+            # 确保buses_to_process中没有重复项（保持输入顺序）
+            buses_to_process = list(dict.fromkeys(buses_to_process))
 
             # 存储母线电压和相角数据
             bus_voltages = {}
@@ -129,51 +135,30 @@ def export_time_series_power_flow(database_path, output_file="time_series_result
                 f.write("===== 母线电压和相角随时间变化 =====\n")
                 f.write(f"分析的母线: {', '.join(buses_to_process)}\n\n")
 
-                # 为每个母线获取电压和相角随时间变化
+                # 一次查询解析全部母线的内部ID，一次查询读取全部母线的电压和相角（时间 x 母线 矩阵）
+                series = fetch_device_series(conn, "bus", buses_to_process, ["VPhA", "AngPhA"], series_ids)
+                columns = {bus_id: index for index, bus_id in enumerate(series["names"])}
+
                 for bus_id in buses_to_process:
                     f.write(f"母线 {bus_id} 的电压和相角变化:\n")
                     f.write("时间, 电压(%), 相角(度)\n")
 
-                    # 获取母线的内部ID
-                    cur.execute(f"SELECT BusIID FROM TDBusInfo WHERE BusName=?", (bus_id,))
-                    bus_iid_result = cur.fetchone()
-
-                    if bus_iid_result:
-                        bus_iid = bus_iid_result[0]
-
-                        # 一次性获取所有时间点的数据
-                        cur.execute("""
-                            SELECT t.TimeID, t.ResultID, t.Time, b.VPhA, b.AngPhA 
-                            FROM TDTimeID t
-                            LEFT JOIN TDBusResult b ON t.ResultID = b.ResultID AND b.BusIID = ?
-                            ORDER BY t.TimeID
-                        """, (bus_iid,))
-
-                        all_results = cur.fetchall()
-
-                        # 初始化数据列表
-                        voltages = []
-                        angles = []
+                    if bus_id in columns:
+                        voltages = _series_values(series["data"]["VPhA"][:, columns[bus_id]])
+                        angles = _series_values(series["data"]["AngPhA"][:, columns[bus_id]])
                         valid_data_count = 0
 
-                        # 处理查询结果
-                        for result in all_results:
-                            time_id, result_id, time_str, voltage, angle = result
-
+                        for (_, time_str), voltage, angle in zip(time_points, voltages, angles):
                             if voltage is not None:
-                                voltages.append(voltage)
-                                angles.append(angle)
                                 valid_data_count += 1
                                 f.write(f"{time_str}, {voltage:.4f}, {angle:.4f}\n")
                             else:
-                                voltages.append(None)
-                                angles.append(None)
                                 f.write(f"{time_str}, 数据缺失, 数据缺失\n")
 
                         # 调试信息
-                        print(f"母线 {bus_id}: 有效数据点 {valid_data_count}/{len(all_results)}")
+                        print(f"母线 {bus_id}: 有效数据点 {valid_data_count}/{len(voltages)}")
 
-                        # 存储数据用于绘图 - 确保长度与时间点一致
+                        # 存储数据用于绘图 - 长度与时间点一致
                         bus_voltages[bus_id] = voltages
                         bus_angles[bus_id] = angles
                     else:
@@ -185,69 +170,45 @@ def export_time_series_power_flow(database_path, output_file="time_series_result
             loads_to_process = []
             if custom_loads:
                 loads_to_process.extend(custom_loads)
-                # 确保load_to_process中没有重复项
 
-            loads_to_process = list(set(loads_to_process))
+            # 确保load_to_process中没有重复项（保持输入顺序）
+            loads_to_process = list(dict.fromkeys(loads_to_process))
             #存储负荷的有功无功和
             load_active_power = {}
             load_reactive_power = {}
             load_current = {}
+            load_stats = None
 
             if loads_to_process:
                 f.write("===== 负荷有功无功和电流随时间变化 =====\n")
                 f.write(f"分析的负荷: {', '.join(loads_to_process)}\n\n")
 
-                # 为每个负荷获取有功无功和电流随时间变化
+                series = fetch_device_series(conn, "load", loads_to_process,
+                                             ["TotalMWPhA", "TotalMvarPhA", "AmpPhA"], series_ids)
+                columns = {load_id: index for index, load_id in enumerate(series["names"])}
+
                 for load_id in loads_to_process:
                     f.write(f"负荷 {load_id} 的有功功率、无功功率和电流变化:\n")
                     f.write("时间, 有功功率(MW), 无功功率(Mvar), 电流(A)\n")
 
-                    # 获取负荷的内部ID
-                    cur.execute(f"SELECT DeviceIID FROM TDOneTermDevicesInfo WHERE DeviceName=?", (load_id,))
-                    load_iid_result = cur.fetchall()
-
-                    if load_iid_result:
-                        load_iid = load_iid_result[0]
-
-                        # 确保 load_iid 是整数
-                        load_iid = load_iid[0]  # 根据您之前提到的 DeviceIID
-
-                        # 注意：在 SQLite 中，参数绑定需要使用元组形式，即使只有一个参数
-                        cur.execute("""
-                            SELECT t.TimeID, t.Time, t.ResultID, s.DeviceIID, s.TotalMWPhA, s.TotalMvarPhA, s.AmpPhA 
-                            FROM TDTimeID t
-                            LEFT JOIN TDSourceandLoadResult s ON t.ResultID = s.ResultID
-                            WHERE s.DeviceIID = ?
-                            ORDER BY t.TimeID
-                        """, (load_iid,))  # 注意这里使用元组 (load_iid,)
-
-                        results = cur.fetchall()
-
-                        # 初始化数据列表
-                        active_power_data = []
-                        reactive_power_data = []
-                        current_data = []
+                    if load_id in columns:
+                        active_power_data = _series_values(series["data"]["TotalMWPhA"][:, columns[load_id]])
+                        reactive_power_data = _series_values(series["data"]["TotalMvarPhA"][:, columns[load_id]])
+                        current_data = _series_values(series["data"]["AmpPhA"][:, columns[load_id]])
                         valid_data_count = 0
 
-                        # 处理查询结果
-                        for result in results:
-                            time_id, time_str, result_id, device_iid, activepower, reactivepower, current = result
+                        for (_, time_str), activepower, reactivepower, current in zip(
+                                time_points, active_power_data, reactive_power_data, current_data):
                             if activepower is not None:
-                                active_power_data.append(activepower)
-                                reactive_power_data.append(reactivepower)
-                                current_data.append(current)
                                 valid_data_count += 1
                                 f.write(f"{time_str}, {activepower:.4f}, {reactivepower:.4f}, {current:.4f}\n")
                             else:
-                                active_power_data.append(None)
-                                reactive_power_data.append(None)
-                                current_data.append(None)
                                 f.write(f"{time_str}, 数据缺失, 数据缺失, 数据缺失\n")
 
                         # 调试信息
-                        print(f"负荷 {load_id}: 有效数据点 {valid_data_count}/{len(results)}")
+                        print(f"负荷 {load_id}: 有效数据点 {valid_data_count}/{len(active_power_data)}")
 
-                        # 存储数据用于绘图 - 确保长度与时间点一致
+                        # 存储数据用于绘图 - 长度与时间点一致
                         load_active_power[load_id] = active_power_data
                         load_reactive_power[load_id] = reactive_power_data
                         load_current[load_id] = current_data
@@ -256,6 +217,10 @@ def export_time_series_power_flow(database_path, output_file="time_series_result
 
                     f.write("\n")
 
+                # 全部负荷的统计量一次计算
+                if load_statistics:
+                    load_stats = compute_load_statistics(timestamps, series["data"]["TotalMWPhA"],
+                                                         series["data"]["TotalMvarPhA"], series["names"])
 
             # 6. 获取事件信息
             f.write("===== 系统事件信息 =====\n")
@@ -270,10 +235,32 @@ def export_time_series_power_flow(database_path, output_file="time_series_result
             for time, device_type, device_id, action, action_percent in events_data:
                 f.write(f"{time}, {device_type}, {device_id}, {action}, {action_percent}\n")
 
+            # 7. 电量统计
+            if energy_statistics:
+                f.write("\n===== 系统电量统计 =====\n")
+                system_times = timestamps if len(system_load_data) == len(time_points) else \
+                    parse_times([row[0] for row in system_load_data])
+                system_stats = system_statistics(system_times, [row[1] for row in system_load_data],
+                                                 [row[2] for row in system_load_data])
+                f.write(f"峰值负荷(MW): {system_stats['peak_load_MW']:.4f}, "
+                        f"出现时间: {pd.Timestamp(system_stats['peak_time'])}\n")
+                f.write(f"负荷率: {system_stats['load_factor']:.4f}\n")
+                f.write(f"负荷电量(MWh): {system_stats['energy_MWh']:.4f}\n")
+                f.write(f"损耗电量(MWh): {system_stats['loss_energy_MWh']:.4f}, "
+                        f"损耗率(%): {system_stats['loss_percent']:.4f}\n")
+
+            if load_stats is not None and len(load_stats):
+                f.write("\n===== 负荷统计 =====\n")
+                f.write("负荷, 峰值(MW), 峰值时间, 平均(MW), 负荷率, 电量(MWh), 最大上升(MW/h), 最大下降(MW/h), 平均功率因数\n")
+                for row in load_stats.itertuples(index=False):
+                    f.write(f"{row.Load}, {row.peak_MW:.4f}, {pd.Timestamp(row.peak_time)}, {row.mean_MW:.4f}, "
+                            f"{row.load_factor:.4f}, {row.energy_MWh:.4f}, {row.max_ramp_up:.4f}, "
+                            f"{row.max_ramp_down:.4f}, {row.mean_pf:.4f}\n")
+
         print(f"时序潮流结果已成功导出到 {output_file}")
 
         # 准备绘图数据
-        times = [datetime.datetime.strptime(t[1], '%m-%d-%Y %H:%M:%S.%f') for t in time_points]
+        times = timestamps
 
         # 1. 系统总负荷和损耗图
         total_load = [row[1] for row in system_load_data]
@@ -285,218 +272,83 @@ def export_time_series_power_flow(database_path, output_file="time_series_result
         # 3. 系统最大支路负载图
         max_loadings = [row[1] for row in max_loading_data]
 
-        # 绘图 - 系统总览
-        plt.figure(figsize=(15, 10))
-
-        # 1. 系统总负荷和损耗图
-        plt.subplot(2, 2, 1)
-        plt.plot(times, total_load, 'b-', label='Total Load (MW)')
-        plt.plot(times, total_loss, 'r-', label='Total Loss (MW)')
-        plt.title('System Load and Loss vs Time')
-        plt.xlabel('Time')
-        plt.ylabel('Power (MW)')
-        plt.legend()
-        plt.grid(True)
-        plt.xticks(rotation=45)
-        plt.gca().xaxis.set_major_formatter(DateFormatter('%H:%M'))
-
-        # 2. 系统最低电压图
-        plt.subplot(2, 2, 2)
-        plt.plot(times, min_voltages, 'g-')
-        plt.axhline(y=90, color='r', linestyle='--', label='Lower Limit (90%)')
-        plt.title('Minimum System Voltage vs Time')
-        plt.xlabel('Time')
-        plt.ylabel('Voltage (%)')
-        plt.grid(True)
-        plt.xticks(rotation=45)
-        plt.gca().xaxis.set_major_formatter(DateFormatter('%H:%M'))
-        plt.legend()
-
-        # 3. 系统最大支路负载图
-        plt.subplot(2, 2, 3)
-        plt.plot(times, max_loadings, 'm-')
-        plt.axhline(y=100, color='r', linestyle='--', label='Rated Value (100%)')
-        plt.title('Maximum Branch Loading vs Time')
-        plt.xlabel('Time')
-        plt.ylabel('Loading (%)')
-        plt.grid(True)
-        plt.xticks(rotation=45)
-        plt.gca().xaxis.set_major_formatter(DateFormatter('%H:%M'))
-        plt.legend()
-
-        # 4. 关键母线电压图
-        plt.subplot(2, 2, 4)
+        # 绘图：每张图先整理为图表描述，再由 chart_render 并行绘制（数据未变化的图表直接使用渲染缓存）
+        x = times.astype("datetime64[us]")
+        hline_90 = {"y": 90, "color": "r", "linestyle": "--", "label": "Lower Limit (90%)"}
+
+        def series_lines(series, prefix):
+            # 只使用元件ID的数字部分作为标签
+            return [{"x": x, "y": _plot_values(values),
+                     "label": f"{prefix} {name.split('_')[1] if '_' in name else name}"}
+                    for name, values in series.items()]
+
+        # 系统总览
+        overview = [
+            _time_axes((2, 2, 1), "System Load and Loss vs Time", "Power (MW)",
+                       [{"x": x, "y": _plot_values(total_load), "fmt": "b-", "label": "Total Load (MW)"},
+                        {"x": x, "y": _plot_values(total_loss), "fmt": "r-", "label": "Total Loss (MW)"}]),
+            _time_axes((2, 2, 2), "Minimum System Voltage vs Time", "Voltage (%)",
+                       [{"x": x, "y": _plot_values(min_voltages), "fmt": "g-"}], hlines=[hline_90]),
+            _time_axes((2, 2, 3), "Maximum Branch Loading vs Time", "Loading (%)",
+                       [{"x": x, "y": _plot_values(max_loadings), "fmt": "m-"}],
+                       hlines=[{"y": 100, "color": "r", "linestyle": "--", "label": "Rated Value (100%)"}]),
+        ]
+        # 关键母线电压图
         if bus_voltages:
-            for bus_id, voltages in bus_voltages.items():
-                # 只使用母线ID的数字部分作为标签
-                label = bus_id.split('_')[1] if '_' in bus_id else bus_id
-                plt.plot(times[:len(voltages)], voltages, label=f"Bus {label}")
-            plt.axhline(y=90, color='r', linestyle='--', label='Lower Limit (90%)')
-            plt.title('Bus Voltages vs Time')
-            plt.xlabel('Time')
-            plt.ylabel('Voltage (%)')
-            plt.legend()
-            plt.grid(True)
-            plt.xticks(rotation=45)
-            plt.gca().xaxis.set_major_formatter(DateFormatter('%H:%M'))
-
-        plt.tight_layout()
-        plt.savefig('system_overview.png', dpi=300)
-        print("系统总览图表已保存为 system_overview.png")
-
-        # 绘制母线电压和相角图 (单独的图表)
+            overview.append(_time_axes((2, 2, 4), "Bus Voltages vs Time", "Voltage (%)",
+                                       series_lines(bus_voltages, "Bus"), hlines=[hline_90]))
+        else:
+            overview.append({"position": (2, 2, 4)})
+        figures = [_figure("system_overview.png", (15, 10), overview, max_points, downsample)]
+        messages = ["系统总览图表已保存为 system_overview.png"]
+
+        # 母线电压和相角图 (单独的图表)
         if bus_voltages:
-            plt.figure(figsize=(15, 10))
-
-            # 电压图
-            plt.subplot(2, 1, 1)
-            for bus_id, voltages in bus_voltages.items():
-                label = bus_id.split('_')[1] if '_' in bus_id else bus_id
-                plt.plot(times[:len(voltages)], voltages, label=f"Bus {label}")
-
-            plt.axhline(y=90, color='r', linestyle='--', label='Lower Limit (90%)')
-            plt.title('Bus Voltages vs Time')
-            plt.xlabel('Time')
-            plt.ylabel('Voltage (%)')
-            plt.legend()
-            plt.grid(True)
-            plt.xticks(rotation=45)
-            plt.gca().xaxis.set_major_formatter(DateFormatter('%H:%M'))
-
-            # 相角图
-            plt.subplot(2, 1, 2)
-            for bus_id, angles in bus_angles.items():
-                label = bus_id.split('_')[1] if '_' in bus_id else bus_id
-                plt.plot(times[:len(angles)], angles, label=f"Bus {label}")
-
-            plt.title('Bus Angles vs Time')
-            plt.xlabel('Time')
-            plt.ylabel('Angle (degrees)')
-            plt.legend()
-            plt.grid(True)
-            plt.xticks(rotation=45)
-            plt.gca().xaxis.set_major_formatter(DateFormatter('%H:%M'))
-
-            plt.tight_layout()
-            plt.savefig('bus_voltage_angle.png', dpi=300)
-            print("母线电压和相角图表已保存为 bus_voltage_angle.png")
-
-        # 新增：绘制负荷有功功率、无功功率和电流图表
+            figures.append(_figure("bus_voltage_angle.png", (15, 10), [
+                _time_axes((2, 1, 1), "Bus Voltages vs Time", "Voltage (%)",
+                           series_lines(bus_voltages, "Bus"), hlines=[hline_90]),
+                _time_axes((2, 1, 2), "Bus Angles vs Time", "Angle (degrees)", series_lines(bus_angles, "Bus")),
+            ], max_points, downsample))
+            messages.append("母线电压和相角图表已保存为 bus_voltage_angle.png")
+
+        # 负荷有功功率、无功功率和电流图表
         if load_active_power:
-            # 创建一个新的图表，包含三个子图：有功功率、无功功率和电流
-            plt.figure(figsize=(15, 15))
-
-            # 1. 有功功率图
-            plt.subplot(3, 1, 1)
-            for load_id, active_power in load_active_power.items():
-                # 简化负荷ID作为标签
-                label = load_id.split('_')[1] if '_' in load_id else load_id
-                plt.plot(times[:len(active_power)], active_power, label=f"Load {label}")
-
-            plt.title('Load Active Power vs Time')
-            plt.xlabel('Time')
-            plt.ylabel('Active Power (MW)')
-            plt.legend()
-            plt.grid(True)
-            plt.xticks(rotation=45)
-            plt.gca().xaxis.set_major_formatter(DateFormatter('%H:%M'))
-
-            # 2. 无功功率图
-            plt.subplot(3, 1, 2)
-            for load_id, reactive_power in load_reactive_power.items():
-                label = load_id.split('_')[1] if '_' in load_id else load_id
-                plt.plot(times[:len(reactive_power)], reactive_power, label=f"Load {label}")
-
-            plt.title('Load Reactive Power vs Time')
-            plt.xlabel('Time')
-            plt.ylabel('Reactive Power (Mvar)')
-            plt.legend()
-            plt.grid(True)
-            plt.xticks(rotation=45)
-            plt.gca().xaxis.set_major_formatter(DateFormatter('%H:%M'))
-
-            # 3. 电流图
-            plt.subplot(3, 1, 3)
-            for load_id, current in load_current.items():
-                label = load_id.split('_')[1] if '_' in load_id else load_id
-                plt.plot(times[:len(current)], current, label=f"Load {label}")
-
-            plt.title('Load Current vs Time')
-            plt.xlabel('Time')
-            plt.ylabel('Current (A)')
-            plt.legend()
-            plt.grid(True)
-            plt.xticks(rotation=45)
-            plt.gca().xaxis.set_major_formatter(DateFormatter('%H:%M'))
-
-            plt.tight_layout()
-            plt.savefig('load_characteristics.png', dpi=300)
-            print("负荷特性图表已保存为 load_characteristics.png")
-
-            # 额外创建一个功率因数图表
-            plt.figure(figsize=(15, 8))
-            for load_id in load_active_power.keys():
-                if load_id in load_reactive_power:
-                    active = load_active_power[load_id]
-                    reactive = load_reactive_power[load_id]
-
-                    # 计算视在功率和功率因数
-                    apparent_power = []
-                    power_factor = []
-
-                    for p, q in zip(active, reactive):
-                        if p is not None and q is not None:
-                            s = np.sqrt(p ** 2 + q ** 2)
-                            pf = p / s if s > 0 else 0
-                            apparent_power.append(s)
-                            power_factor.append(pf)
-                        else:
-                            apparent_power.append(None)
-                            power_factor.append(None)
-
-                    # 绘制功率因数
-                    label = load_id.split('_')[1] if '_' in load_id else load_id
-                    plt.plot(times[:len(power_factor)], power_factor, label=f"Load {label}")
-
-            plt.title('Load Power Factor vs Time')
-            plt.xlabel('Time')
-            plt.ylabel('Power Factor')
-            plt.legend()
-            plt.grid(True)
-            plt.xticks(rotation=45)
-            plt.gca().xaxis.set_major_formatter(DateFormatter('%H:%M'))
-            plt.tight_layout()
-            plt.savefig('load_power_factor.png', dpi=300)
-            print("负荷功率因数图表已保存为 load_power_factor.png")
-
-        # 5. 事件标记图
-        plt.figure(figsize=(15, 8))
-        plt.plot(times, total_load, 'b-', label='Total Load (MW)')
-
-        # 添加事件标记
-        event_times = [datetime.datetime.strptime(event[0], '%m-%d-%Y %H:%M:%S.%f') for event in events_data]
-
-        # 在事件发生时添加垂直线，使用简化的事件标签
-        for i, event_time in enumerate(event_times):
-            event = events_data[i]
-            # 简化事件标签，避免中文问题
-            action_label = f"{event[3]} {event[2].split('_')[-1] if '_' in event[2] else event[2]}"
-            plt.axvline(x=event_time, color='r', linestyle='--', alpha=0.5)
-            # 添加事件标签，交替放置在上下位置以避免重叠
-            y_pos = max(total_load) * (0.9 if i % 2 == 0 else 0.8)
-            plt.text(event_time, y_pos, action_label, rotation=90, fontsize=8)
-
-        plt.title('System Load and Events Correlation')
-        plt.xlabel('Time')
-        plt.ylabel('Power (MW)')
-        plt.grid(True)
-        plt.xticks(rotation=45)
-        plt.gca().xaxis.set_major_formatter(DateFormatter('%H:%M'))
-        plt.tight_layout()
-        plt.savefig('load_events_correlation.png', dpi=300)
-        print("负荷与事件关系图已保存为 load_events_correlation.png")
-
-        plt.close('all')
+            figures.append(_figure("load_characteristics.png", (15, 15), [
+                _time_axes((3, 1, 1), "Load Active Power vs Time", "Active Power (MW)",
+                           series_lines(load_active_power, "Load")),
+                _time_axes((3, 1, 2), "Load Reactive Power vs Time", "Reactive Power (Mvar)",
+                           series_lines(load_reactive_power, "Load")),
+                _time_axes((3, 1, 3), "Load Current vs Time", "Current (A)", series_lines(load_current, "Load")),
+            ], max_points, downsample))
+            messages.append("负荷特性图表已保存为 load_characteristics.png")
+
+            # 额外创建一个功率因数图表（P / S，视在功率为 0 时取 0，缺失数据为 NaN）
+            load_power_factor = {load_id: power_factor(_plot_values(active), _plot_values(load_reactive_power[load_id]))
+                                 for load_id, active in load_active_power.items() if load_id in load_reactive_power}
+
+            figures.append(_figure("load_power_factor.png", (15, 8), [
+                _time_axes((1, 1, 1), "Load Power Factor vs Time", "Power Factor",
+                           series_lines(load_power_factor, "Load")),
+            ], max_points, downsample))
+            messages.append("负荷功率因数图表已保存为 load_power_factor.png")
+
+        # 事件标记图：在事件发生时添加垂直线，使用简化的事件标签（避免中文问题），标签交替放置在上下位置以避免重叠
+        event_times = parse_times([event[0] for event in events_data])
+        events = _time_axes((1, 1, 1), "System Load and Events Correlation", "Power (MW)",
+                            [{"x": x, "y": _plot_values(total_load), "fmt": "b-", "label": "Total Load (MW)"}],
+                            legend=False)
+        events["vlines"] = [{"x": event_time, "color": "r", "linestyle": "--", "alpha": 0.5}
+                            for event_time in event_times]
+        events["texts"] = [{"x": event_time, "y": max(total_load) * (0.9 if i % 2 == 0 else 0.8),
+                            "s": f"{event[3]} {event[2].split('_')[-1] if '_' in event[2] else event[2]}",
+                            "rotation": 90, "fontsize": 8}
+                           for i, (event_time, event) in enumerate(zip(event_times, events_data))]
+        figures.append(_figure("load_events_correlation.png", (15, 8), [events], max_points, downsample))
+        messages.append("负荷与事件关系图已保存为 load_events_correlation.png")
+
+        status = render_figures(figures, max_workers=render_workers, cache_dir=render_cache)
+        for figure, message in zip(figures, messages):
+            print(message + ("（渲染缓存）" if status[figure["filename"]] == "cached" else ""))
 
         # 创建一个包含关键结果的DataFrame用于导出到Excel
         result_data = {
@@ -542,7 +394,10 @@ def export_time_series_power_flow(database_path, output_file="time_series_result
 
         # 导出到Excel
         excel_file = "time_series_results.xlsx"
-        result_df.to_excel(excel_file, index=False)
+        with pd.ExcelWriter(excel_file) as writer:
+            result_df.to_excel(writer, index=False)
+            if load_stats is not None:
+                load_stats.to_excel(writer, sheet_name="Load_Statistics", index=False)
         print(f"结果数据已导出到Excel文件: {excel_file}")
 
         # 返回结果DataFrame
@@ -554,7 +409,7 @@ def export_time_series_power_flow(database_path, output_file="time_series_result
         traceback.print_exc()
         return None
     finally:
-        # 关闭数据库连接
+        if 'cur' in locals() and cur:
+            cur.close()
         if 'conn' in locals() and conn:
             conn.close()
-            print("数据库连接已关闭")
@@ -0,0 +1,147 @@
+"""
+   Manifest and merge helpers for incremental (delta) element export
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+# 导出状态表中保存元件标识的列，写出结果时会被去掉
+GUID_COLUMN = "_GUID"
+
+MANIFEST_FILE = "manifest.json"
+
+
+def content_digest(response):
+    """计算整个元件响应的摘要，用于快速判断某类元件是否整体未变"""
+    if isinstance(response, str):
+        response = response.encode("utf-8")
+    return hashlib.blake2b(response, digest_size=16).hexdigest()
+
+
+def element_key(attrs):
+    """元件的稳定标识：优先使用 OtiGUID，缺失时退回元件ID"""
+    return attrs.get("OtiGUID") or attrs.get("ID")
+
+
+def unique_key(key, seen):
+    """
+    使元件标识在一次响应中唯一：重复出现的标识（同一 OtiGUID，或退回使用的重复元件ID）加上出现序号
+
+    参数:
+    key: element_key 返回的标识
+    seen: 标识 -> 已出现次数，由调用方在一次响应内共用
+
+    返回:
+    (唯一标识, 是否为重复标识)，第二次出现时为 'key#2'，依此类推
+    """
+    count = seen.get(key, 0) + 1
+    seen[key] = count
+    if count == 1:
+        return key, False
+    return f"{key}#{count}", True
+
+
+def element_digest(attrs):
+    """计算单个元件全部属性的内容哈希"""
+    content = "\x1f".join(f"{name}={value}" for name, value in sorted(attrs.items()))
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ExportManifest:
+    """增量导出的本地清单
+
+    记录每类元件响应的摘要、每个元件的内容哈希（以及重复的元件标识），并以 pickle 形式保存上一次导出的数据表；
+    removed 记录最近一次导出中删除的输出文件（元件名 -> 文件路径列表）；
+    output 记录最近一次成功写出时的输出设置（output_format、output_path、typed），设置改变时需要重写全部输出。
+    """
+
+    def __init__(self, state_dir):
+        self.state_dir = state_dir
+        self.path = os.path.join(state_dir, MANIFEST_FILE)
+        self.components = {}
+        self.removed = {}
+        self.output = None
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.components = data.get("components", {})
+            self.removed = data.get("removed", {})
+            self.output = data.get("output")
+
+    def _table_path(self, component_name):
+        return os.path.join(self.state_dir, f"{component_name}.pkl")
+
+    def digest(self, component_name):
+        return self.components.get(component_name, {}).get("digest")
+
+    def element_hashes(self, component_name):
+        return self.components.get(component_name, {}).get("elements", {})
+
+    def load_table(self, component_name):
+        """读取上一次导出的数据表（含 GUID 列），不存在时返回 None"""
+        path = self._table_path(component_name)
+        if not os.path.exists(path):
+            return None
+        return pd.read_pickle(path)
+
+    def update(self, component_name, digest, hashes, table, duplicates=None):
+        """记录某类元件的最新状态，duplicates 为响应中重复出现的元件标识"""
+        self.components[component_name] = {"digest": digest, "elements": hashes}
+        if duplicates:
+            self.components[component_name]["duplicates"] = sorted(set(duplicates), key=str)
+        self.save_table(component_name, table)
+
+    def save_table(self, name, table):
+        """保存辅助数据表（例如逆变器PV曲线表）"""
+        os.makedirs(self.state_dir, exist_ok=True)
+        table.to_pickle(self._table_path(name))
+
+    def remove(self, component_name):
+        """删除已不存在的元件类型的状态"""
+        self.components.pop(component_name, None)
+        path = self._table_path(component_name)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def save(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"components": self.components, "removed": self.removed, "output": self.output}, f)
+
+
+def output_settings(output_format, output_path, typed):
+    """写出结果时使用的输出设置，与清单中记录的设置不同时上一次的输出不可复用"""
+    return {"output_format": output_format, "output_path": os.path.abspath(output_path), "typed": bool(typed)}
+
+
+def merge_component(previous, changed, order):
+    """
+    将新增/修改的元件行合并到上一次导出的数据表中
+
+    参数:
+    previous: 上一次导出的数据表（含 GUID 列），可以为 None
+    changed: 新增和修改的元件行（含 GUID 列）
+    order: 当前响应中全部元件的 GUID 顺序，不在其中的元件视为已删除
+
+    返回:
+    pandas.DataFrame: 按当前顺序排列并重新编号 ID 的完整数据表
+    """
+    frames = []
+    if previous is not None and not previous.empty:
+        current = set(order)
+        if not changed.empty:
+            current.difference_update(changed[GUID_COLUMN])
+        frames.append(previous[previous[GUID_COLUMN].isin(current)])
+    if not changed.empty:
+        frames.append(changed)
+    if not frames:
+        return pd.DataFrame()
+
+    merged = pd.concat(frames, ignore_index=True)
+    merged = merged.set_index(GUID_COLUMN).reindex(order).reset_index()
+    if "ID" in merged.columns:
+        merged["ID"] = range(1, len(merged) + 1)
+    return merged
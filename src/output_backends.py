@@ -0,0 +1,177 @@
+"""
+   Output backends for exported element tables
+"""
+
+import os
+
+import pandas as pd
+
+# 各输出格式的默认路径：Excel为单个工作簿，其余格式为每个元件一个文件的目录
+DEFAULT_OUTPUT_PATHS = {
+    "excel": "parameters.xlsx",
+    "parquet": "parameters",
+    "feather": "parameters",
+    "csv.gz": "parameters",
+}
+
+FILE_SUFFIXES = {
+    "parquet": ".parquet",
+    "feather": ".feather",
+    "csv.gz": ".csv.gz",
+}
+
+
+def _write_excel(data_dict, output_path, **options):
+    with pd.ExcelWriter(output_path) as writer:
+        for sheet_name, df in data_dict.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+
+def _read_excel(output_path, components=None, **options):
+    return pd.read_excel(output_path, sheet_name=components)
+
+
+def _write_parquet(df, path, compression="zstd", **options):
+    df.to_parquet(path, index=False, compression=compression)
+
+
+def _read_parquet(path, as_arrow=False, **options):
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path, memory_map=True)
+    return table if as_arrow else table.to_pandas()
+
+
+def _write_feather(df, path, compression="uncompressed", **options):
+    # 未压缩的 Arrow IPC 文件可以直接内存映射读取，无需解码
+    df.to_feather(path, compression=compression)
+
+
+def _read_feather(path, as_arrow=False, **options):
+    import pyarrow.feather as feather
+
+    table = feather.read_table(path, memory_map=True)
+    return table if as_arrow else table.to_pandas()
+
+
+def _write_csv_gz(df, path, **options):
+    df.to_csv(path, index=False, compression="gzip")
+
+
+def _read_csv_gz(path, **options):
+    return pd.read_csv(path, compression="gzip")
+
+
+# 每个元件单独成文件的格式：格式名 -> (写函数, 读函数)
+TABLE_BACKENDS = {
+    "parquet": (_write_parquet, _read_parquet),
+    "feather": (_write_feather, _read_feather),
+    "csv.gz": (_write_csv_gz, _read_csv_gz),
+}
+
+
+def _check_format(fmt):
+    if fmt != "excel" and fmt not in TABLE_BACKENDS:
+        supported = ", ".join(["excel"] + list(TABLE_BACKENDS))
+        raise ValueError(f"Unsupported output format: {fmt} (supported: {supported})")
+
+
+def table_path(component_name, output_path=None, fmt="excel"):
+    """
+    元件数据表的输出文件路径
+
+    参数:
+    component_name: 元件名
+    output_path: Excel工作簿路径或输出目录，为空时使用默认路径
+    fmt: 输出格式
+
+    返回:
+    str: 按元件单独成文件的格式为该元件的文件路径，Excel为工作簿路径
+    """
+    _check_format(fmt)
+    output_path = output_path or DEFAULT_OUTPUT_PATHS[fmt]
+    if fmt == "excel":
+        return output_path
+    return os.path.join(output_path, component_name + FILE_SUFFIXES[fmt])
+
+
+def save_tables(data_dict, output_path=None, fmt="excel", **options):
+    """
+    按指定格式保存元件数据表
+
+    参数:
+    data_dict: 元件名 -> DataFrame
+    output_path: Excel为工作簿路径，其余格式为输出目录，为空时使用默认路径
+    fmt: 'excel'、'parquet'、'feather' 或 'csv.gz'
+    options: 传给具体写函数的参数，例如 parquet 的 compression
+
+    返回:
+    str: 实际写入的路径
+    """
+    _check_format(fmt)
+    output_path = output_path or DEFAULT_OUTPUT_PATHS[fmt]
+
+    if fmt == "excel":
+        _write_excel(data_dict, output_path, **options)
+        return output_path
+
+    write = TABLE_BACKENDS[fmt][0]
+    os.makedirs(output_path, exist_ok=True)
+    for component_name, df in data_dict.items():
+        write(df, table_path(component_name, output_path, fmt), **options)
+    return output_path
+
+
+def remove_tables(component_names, output_path=None, fmt="parquet"):
+    """
+    删除按元件单独成文件的格式中指定元件的文件（元件已全部删除或元件类型不再导出时使用）
+
+    参数:
+    component_names: 元件名列表
+    output_path: 输出目录，为空时使用默认路径
+    fmt: 'parquet'、'feather' 或 'csv.gz'；Excel 工作簿每次整体重写，无需删除
+
+    返回:
+    list: 实际删除的文件路径
+    """
+    _check_format(fmt)
+    if fmt == "excel":
+        return []
+    output_path = output_path or DEFAULT_OUTPUT_PATHS[fmt]
+    removed = []
+    for component_name in component_names:
+        path = table_path(component_name, output_path, fmt)
+        if os.path.exists(path):
+            os.remove(path)
+            removed.append(path)
+    return removed
+
+
+def load_tables(output_path=None, fmt="excel", components=None, **options):
+    """
+    读取 save_tables 写出的元件数据表
+
+    parquet/feather 以内存映射方式读取；as_arrow=True 时直接返回 pyarrow.Table，不转换为 DataFrame。
+
+    参数:
+    output_path: Excel工作簿路径或输出目录，为空时使用默认路径
+    fmt: 写出时使用的格式
+    components: 需要读取的元件名列表，为空时读取全部
+
+    返回:
+    dict: 元件名 -> DataFrame（或 pyarrow.Table）
+    """
+    _check_format(fmt)
+    output_path = output_path or DEFAULT_OUTPUT_PATHS[fmt]
+
+    if fmt == "excel":
+        return _read_excel(output_path, components=components or None, **options)
+
+    read = TABLE_BACKENDS[fmt][1]
+    suffix = FILE_SUFFIXES[fmt]
+    if components is None:
+        components = sorted(name[:-len(suffix)] for name in os.listdir(output_path) if name.endswith(suffix))
+    return {
+        component_name: read(os.path.join(output_path, component_name + suffix), **options)
+        for component_name in components
+    }
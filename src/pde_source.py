@@ -0,0 +1,45 @@
+"""
+   Offline element source reading flat PDE exports (e.g. Feeder.xml)
+"""
+
+from src.element_extract import ColumnarExtractor
+from src.xml_stream import DEFAULT_CHUNK_SIZE, iter_child_attribs
+
+COMPONENTS_TAG = "COMPONENTS"
+
+
+def iter_pde_elements(pde_file, element_types=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    流式读取PDE文件，逐个产出 <COMPONENTS> 下元件的类型和属性字典
+
+    参数:
+    pde_file: PDE文件路径（<PDE Flat="1"> 格式）
+    element_types: 需要读取的元件类型集合，为空时读取全部
+    chunk_size: 每次读取的数据块大小
+
+    返回:
+    生成器，每次产出 (元件类型, 属性字典)
+    """
+    tags = set(element_types) if element_types is not None else None
+    with open(pde_file, "rb") as f:
+        yield from iter_child_attribs(f, COMPONENTS_TAG, tags, chunk_size)
+
+
+def read_pde_columns(pde_file, schemas, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    单次遍历PDE文件，按元件类型将属性直接写入列数组
+
+    只保留列定义中的属性，内存占用与所选列的数据量成正比，与文件大小无关。
+
+    参数:
+    pde_file: PDE文件路径
+    schemas: 元件类型 -> 列定义（导出列名 -> ETAP属性名）
+    chunk_size: 每次读取的数据块大小
+
+    返回:
+    dict: 元件类型 -> (导出列名 -> 列值列表)
+    """
+    extractors = {element_type: ColumnarExtractor(schema) for element_type, schema in schemas.items()}
+    for element_type, attrs in iter_pde_elements(pde_file, extractors, chunk_size):
+        extractors[element_type].add(attrs)
+    return {element_type: extractor.columns() for element_type, extractor in extractors.items()}
@@ -0,0 +1,293 @@
+"""
+   Persistent on-disk cache for ETAP projectdata responses
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+import zlib
+
+INDEX_FILE = "index.json"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# 命中只更新内存中的访问时间，累计这么多次未写入的修改后才写回 index.json
+DEFAULT_FLUSH_EVERY = 64
+
+
+def project_fingerprint(project_file):
+    """项目文件的指纹（大小 + 修改时间），文件变化后缓存自动失效"""
+    if not project_file or not os.path.exists(project_file):
+        return None
+    stat = os.stat(project_file)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def find_project_file(paths):
+    """从 application.filepaths() 的结果中查找 ETAP 项目文件（.oti）"""
+    values = paths.values() if isinstance(paths, dict) else paths
+    for value in values:
+        if isinstance(value, str) and value.lower().endswith(".oti") and os.path.exists(value):
+            return value
+    return None
+
+
+class ResponseCache:
+    """按大小限制进行 LRU 淘汰的磁盘缓存
+
+    值以 zlib 压缩后存为单独的文件，index.json 记录每项的大小、访问时间及元数据。
+    命中时只在内存中更新访问时间，每 flush_every 次修改、写入新项、flush()/close() 或进程退出时写回索引；
+    写回前先读取磁盘上的索引并合并本进程的修改，不会覆盖其他进程同时写入的项。
+    """
+
+    def __init__(self, cache_dir=".etap_cache", max_bytes=DEFAULT_MAX_BYTES, max_age=None,
+                 flush_every=DEFAULT_FLUSH_EVERY):
+        """
+        参数:
+        cache_dir: 缓存目录
+        max_bytes: 缓存总大小上限（压缩后），超出时淘汰最久未访问的项
+        max_age: 缓存项的最长保存时间（秒），为空时不按时间淘汰
+        flush_every: 累计多少次未写回的命中/删除后写回索引
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self._index_path = os.path.join(cache_dir, INDEX_FILE)
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = self._read_index()
+        # 尚未写回索引的修改：键 -> 本进程写入或访问过的项，以及本进程删除的键
+        self._updated = {}
+        self._dropped = set()
+        self._unsaved = 0
+        atexit.register(_flush_at_exit, weakref.ref(self))
+
+    @staticmethod
+    def make_key(*parts):
+        """由任意可 JSON 序列化的组成部分生成缓存键"""
+        content = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".z")
+
+    def _read_index(self):
+        if not os.path.exists(self._index_path):
+            return {}
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Cache index unreadable, starting empty: {str(e)}")
+            return {}
+
+    def _save_index(self):
+        """将本进程的修改合并到磁盘上的索引后写回"""
+        index = self._read_index()
+        for key in self._dropped:
+            index.pop(key, None)
+        for key, entry in self._updated.items():
+            current = index.get(key)
+            if current is not None and current["created"] > entry["created"]:
+                # 其他进程在此之后重新写入了该项
+                current["last_access"] = max(current["last_access"], entry["last_access"])
+            else:
+                index[key] = entry
+        tmp_path = f"{self._index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self._index_path)
+        self._index = index
+        self._updated.clear()
+        self._dropped.clear()
+        self._unsaved = 0
+
+    def _changed(self):
+        """记录一次未写回的修改，累计 flush_every 次后写回索引"""
+        self._unsaved += 1
+        if self._unsaved >= self.flush_every:
+            self._save_index()
+
+    def flush(self):
+        """写回尚未保存的访问时间和删除"""
+        with self._lock:
+            if self._updated or self._dropped:
+                self._save_index()
+
+    def close(self):
+        """写回索引，缓存对象关闭后仍可继续使用"""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _expired(self, entry, now):
+        return self.max_age is not None and now - entry["created"] > self.max_age
+
+    def _drop(self, key):
+        self._index.pop(key, None)
+        self._updated.pop(key, None)
+        self._dropped.add(key)
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def get_bytes(self, key):
+        """读取缓存的原始字节，未命中或已过期时返回 None"""
+        with self._lock:
+            entry = self._index.get(key)
+            now = time.time()
+            if entry is None:
+                return None
+            if self._expired(entry, now) or not os.path.exists(self._path(key)):
+                self._drop(key)
+                self._changed()
+                return None
+            with open(self._path(key), "rb") as f:
+                data = zlib.decompress(f.read())
+            entry["last_access"] = now
+            self._updated[key] = entry
+            self._changed()
+            return data
+
+    def put_bytes(self, key, data, **meta):
+        """写入原始字节，meta 为用于批量失效的元数据（例如元件类型、项目路径）"""
+        compressed = zlib.compress(data, 6)
+        with self._lock:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(compressed)
+            now = time.time()
+            self._index[key] = self._updated[key] = {"size": len(compressed), "created": now, "last_access": now,
+                                                     "meta": meta}
+            self._dropped.discard(key)
+            self._evict(now)
+            self._save_index()
+
+    def get(self, key):
+        """读取缓存的字符串响应"""
+        data = self.get_bytes(key)
+        return None if data is None else data.decode("utf-8")
+
+    def put(self, key, value, **meta):
+        """写入字符串响应"""
+        self.put_bytes(key, value.encode("utf-8"), **meta)
+
+    def _evict(self, now):
+        """淘汰过期项，再按最久未访问的顺序淘汰直到总大小不超过上限"""
+        for key in [key for key, entry in self._index.items() if self._expired(entry, now)]:
+            self._drop(key)
+        total = sum(entry["size"] for entry in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            total -= entry["size"]
+            self._drop(key)
+
+    def invalidate(self, **meta):
+        """删除元数据与给定条件全部匹配的缓存项"""
+        with self._lock:
+            keys = [key for key, entry in self._index.items()
+                    if all(entry.get("meta", {}).get(name) == value for name, value in meta.items())]
+            for key in keys:
+                self._drop(key)
+            if keys:
+                self._save_index()
+            return len(keys)
+
+    def purge_stale(self, project_file, fingerprint):
+        """删除同一项目在旧指纹下的缓存项"""
+        with self._lock:
+            keys = [key for key, entry in self._index.items()
+                    if entry.get("meta", {}).get("project") == project_file
+                    and entry.get("meta", {}).get("fingerprint") != fingerprint]
+            for key in keys:
+                self._drop(key)
+            if keys:
+                self._save_index()
+            return len(keys)
+
+    def clear(self):
+        """清空全部缓存"""
+        with self._lock:
+            for key in list(self._index):
+                self._drop(key)
+            self._save_index()
+
+
+def _flush_at_exit(ref):
+    cache = ref()
+    if cache is not None:
+        cache.flush()
+
+
+class CachedProjectData:
+    """带缓存的 etap.projectdata，getallelementdata 先查缓存，写操作使相关缓存失效，getelementprop 不缓存"""
+
+    def __init__(self, projectdata, cache, context):
+        self._projectdata = projectdata
+        self._cache = cache
+        self._context = context
+
+    def _cached(self, method, element_type, *args):
+        key = self._cache.make_key(method, element_type, *args, *self._context.values())
+        response = self._cache.get(key)
+        if response is None:
+            response = getattr(self._projectdata, method)(element_type, *args)
+            if isinstance(response, str):
+                self._cache.put(key, response, type=element_type, **self._context)
+        return response
+
+    def getallelementdata(self, elementType):
+        return self._cached("getallelementdata", elementType)
+
+    def getelementprop(self, elementType, elementName, fieldName):
+        # 单个属性的读取不缓存：通过原始 projectdata 或其他进程写入、尚未保存的修改不会改变项目指纹，
+        # 缓存的值会过期（ChangeSet 以读取的值作为恢复用的原始值）
+        return self._projectdata.getelementprop(elementType, elementName, fieldName)
+
+    def setelementprop(self, elementType, elementName, fieldName, value):
+        response = self._projectdata.setelementprop(elementType, elementName, fieldName, value)
+        self._cache.invalidate(type=elementType, project=self._context["project"])
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._projectdata, name)
+
+
+class CachedETAPClient:
+    """
+    在 etap.api 客户端前增加磁盘缓存
+
+    缓存键包含元件类型、项目文件路径及指纹、revision_name 和 config_name；项目文件被保存（指纹变化）后，
+    该项目的旧缓存会被清除。通过本客户端调用 setelementprop 时会清除对应元件类型的缓存；
+    在 ETAP 界面中修改但未保存的数据不会被感知，此时需调用 cache.clear()。
+    项目文件无法确定时不启用缓存。
+    """
+
+    def __init__(self, etap, cache, revision_name, config_name, project_file=None):
+        self._etap = etap
+        self.cache = cache
+        if project_file is None:
+            project_file = find_project_file(json.loads(etap.application.filepaths()))
+        fingerprint = project_fingerprint(project_file)
+        if fingerprint is None:
+            print("Project file not found, response cache disabled.")
+            self.projectdata = etap.projectdata
+            return
+        cache.purge_stale(project_file, fingerprint)
+        context = {"project": project_file, "fingerprint": fingerprint,
+                   "revision": revision_name, "config": config_name}
+        self.projectdata = CachedProjectData(etap.projectdata, cache, context)
+
+    def __getattr__(self, name):
+        return getattr(self._etap, name)
@@ -0,0 +1,118 @@
+"""
+   Persistent cache of study results keyed by the full sweep scenario
+"""
+
+import os
+import pickle
+import shutil
+import tempfile
+import weakref
+
+from src.response_cache import DEFAULT_MAX_BYTES, ResponseCache
+from src.result_db import release
+
+
+class StudyResultCache:
+    """
+    按场景缓存计算结果（export_pfreport 的 DataFrame，可选结果数据库）
+
+    场景键包含全部参数修改（元件类型、元件名、属性、值）、计算类型、revision、config、
+    study case 以及项目文件指纹；相同场景再次运行时直接返回缓存的结果，不访问 ETAP。
+    存储与淘汰（总大小上限、最长保存时间、LRU）由 ResponseCache 负责。
+    """
+
+    def __init__(self, cache_dir=".result_cache", max_bytes=DEFAULT_MAX_BYTES, max_age=None, archive_db=False):
+        """
+        参数:
+        cache_dir: 缓存目录
+        max_bytes: 缓存总大小上限（压缩后）
+        max_age: 缓存项的最长保存时间（秒），为空时不按时间淘汰
+        archive_db: 是否同时保存结果数据库，命中时恢复到临时目录中，close() 或进程退出时删除
+        """
+        self.cache = ResponseCache(cache_dir, max_bytes, max_age)
+        self.archive_db = archive_db
+        self.restore_dir = None
+        self._restored = {}
+        self._cleanup = None
+
+    @staticmethod
+    def scenario_key(overrides, study, revision_name, config_name, study_case, fingerprint):
+        """
+        生成场景键
+
+        参数:
+        overrides: (元件类型, 元件名, 属性名) -> 值 的字典，与修改顺序无关
+        study: 计算类型，例如 'runLF'
+        revision_name, config_name, study_case: 计算参数
+        fingerprint: 项目文件指纹
+        """
+        items = sorted([*name, str(value)] for name, value in overrides.items())
+        return ResponseCache.make_key("study", study, items, revision_name, config_name, study_case, fingerprint)
+
+    @staticmethod
+    def _db_key(key):
+        return ResponseCache.make_key("db", key)
+
+    def get(self, key):
+        """
+        读取缓存的结果
+
+        返回:
+        (report, db_path)，未命中时返回 None；未保存或已淘汰结果数据库时 db_path 为 None
+        """
+        data = self.cache.get_bytes(key)
+        if data is None:
+            return None
+        report = pickle.loads(data)
+        db_path = None
+        if self.archive_db:
+            db_path = self._restore_db(key)
+        return report, db_path
+
+    def _restore_db(self, key):
+        db_path = self._restored.get(key)
+        if db_path is not None and os.path.exists(db_path):
+            return db_path
+        data = self.cache.get_bytes(self._db_key(key))
+        if data is None:
+            return None
+        # 恢复的副本不放在缓存目录中（不受 max_bytes/max_age 管理），而是放在本对象独有的临时目录中
+        if self.restore_dir is None:
+            self.restore_dir = tempfile.mkdtemp(prefix="etap_results_")
+            self._cleanup = weakref.finalize(self, _remove_restored, self.restore_dir, self._restored)
+        db_path = os.path.join(self.restore_dir, key + ".sqlite")
+        with open(db_path, "wb") as f:
+            f.write(data)
+        self._restored[key] = db_path
+        return db_path
+
+    def close(self):
+        """写回缓存索引并删除恢复的结果数据库副本"""
+        self.cache.close()
+        if self._cleanup is not None:
+            self._cleanup()
+            self._cleanup = None
+            self.restore_dir = None
+
+    def put(self, key, report, db_path=None, **meta):
+        """
+        保存结果
+
+        参数:
+        key: scenario_key() 生成的场景键
+        report: export_pfreport 返回的 DataFrame
+        db_path: 结果数据库路径，archive_db 为 True 时一并保存
+        meta: 元数据（例如 project、fingerprint），用于 ResponseCache 的批量失效
+        """
+        self.cache.put_bytes(key, pickle.dumps(report, protocol=pickle.HIGHEST_PROTOCOL), **meta)
+        if self.archive_db and db_path and os.path.exists(db_path):
+            with open(db_path, "rb") as f:
+                self.cache.put_bytes(self._db_key(key), f.read(), **meta)
+
+
+def _remove_restored(restore_dir, restored):
+    # 先关闭 result_db 缓存的只读连接，否则 Windows 上无法删除文件
+    for db_path in restored.values():
+        release(db_path)
+    restored.clear()
+    shutil.rmtree(restore_dir, ignore_errors=True)
@@ -0,0 +1,125 @@
+"""
+   Stacked run x bus x quantity cube built from many LF result databases
+"""
+
+import importlib.util
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.result_reader import LFR_BUS_FILTER, read_lf_results
+
+DEFAULT_FIELDS = ("VoltMag", "VoltAng")
+
+
+def _read_run(job):
+    """进程池任务：读取单个结果数据库的 ID 列和数值字段"""
+    path, id_field, fields, where = job
+    if not os.path.exists(path):
+        return path, None, None, "file not found"
+    try:
+        columns = read_lf_results(path, [id_field, *fields], where)
+    except Exception as e:
+        return path, None, None, str(e)
+    values = np.column_stack([columns[field].astype(np.float64) for field in fields])
+    return path, columns[id_field], values, None
+
+
+class ResultCube:
+    """
+    多次计算结果的三维数组：运行 x 元件 x 字段
+
+    data: float64 数组，某次运行中不存在的元件为 NaN
+    runs: 每次运行一行的 DataFrame（结果数据库路径及调用方给出的元数据）
+    ids: 按 ID 对齐后的元件ID
+    fields: 字段名
+    """
+
+    def __init__(self, data, runs, ids, fields):
+        self.data = data
+        self.runs = runs
+        self.ids = np.asarray(ids, dtype=object)
+        self.fields = list(fields)
+
+    def quantity(self, field):
+        """返回某个字段的 运行 x 元件 二维数组"""
+        return self.data[:, :, self.fields.index(field)]
+
+    def to_frame(self):
+        """转换为长表：每个（运行, 元件）一行"""
+        runs, count, _ = self.data.shape
+        frame = pd.DataFrame({"run": np.repeat(np.arange(runs), count), "ID": np.tile(self.ids, runs)})
+        for index, field in enumerate(self.fields):
+            frame[field] = self.data[:, :, index].reshape(-1)
+        return frame
+
+    def save(self, prefix, parquet=True):
+        """
+        保存为 prefix.npy（数组）和 prefix.json（元件ID、字段及运行元数据）；
+        parquet 为 True 且已安装 pyarrow 时另存长表 prefix.parquet
+        """
+        np.save(prefix + ".npy", self.data)
+        meta = {"ids": self.ids.tolist(), "fields": self.fields,
+                "runs": json.loads(self.runs.to_json(orient="records"))}
+        with open(prefix + ".json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        if parquet and importlib.util.find_spec("pyarrow") is not None:
+            self.to_frame().to_parquet(prefix + ".parquet", index=False)
+
+    @classmethod
+    def load(cls, prefix, mmap_mode="r"):
+        """读取 save() 保存的结果，数组默认以内存映射方式打开"""
+        with open(prefix + ".json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        data = np.load(prefix + ".npy", mmap_mode=mmap_mode)
+        return cls(data, pd.DataFrame(meta["runs"]), meta["ids"], meta["fields"])
+
+
+def build_result_cube(db_paths, fields=DEFAULT_FIELDS, id_field="IDFrom", where=LFR_BUS_FILTER,
+                      metadata=None, max_workers=None):
+    """
+    并行读取多个潮流结果数据库，按元件ID对齐后堆叠为三维数组
+
+    参数:
+    db_paths: 结果数据库路径列表，顺序即运行顺序
+    fields: 需要读取的 LFR 数值字段
+    id_field: 用于对齐的元件ID字段
+    where: 筛选条件，默认只取母线记录
+    metadata: 每次运行的元数据（dict 列表，例如扫描参数值），与 db_paths 一一对应
+    max_workers: 进程数，默认等于 CPU 数
+
+    返回:
+    ResultCube，读取失败的运行整行为 NaN，错误信息记录在 runs 的 error 列
+    """
+    db_paths = list(db_paths)
+    fields = list(fields)
+    jobs = [(path, id_field, fields, where) for path in db_paths]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(_read_run, jobs, chunksize=max(1, len(jobs) // 32)))
+
+    # 按首次出现的顺序合并各次运行的元件ID
+    index = {}
+    for _, ids, _, _ in results:
+        if ids is not None:
+            for element_id in ids:
+                index.setdefault(element_id, len(index))
+
+    data = np.full((len(db_paths), len(index), len(fields)), np.nan)
+    errors = []
+    for run, (path, ids, values, error) in enumerate(results):
+        errors.append(error)
+        if error is not None:
+            print(f"Failed to read {path}: {error}")
+            continue
+        positions = np.fromiter((index[element_id] for element_id in ids), dtype=np.intp, count=len(ids))
+        data[run, positions, :] = values
+
+    runs = pd.DataFrame(metadata if metadata is not None else [{} for _ in db_paths])
+    runs.insert(0, "path", [os.path.abspath(path) for path in db_paths])
+    if any(error is not None for error in errors):
+        runs["error"] = errors
+    print(f"Result cube: {len(db_paths)} runs x {len(index)} elements x {len(fields)} fields")
+    return ResultCube(data, runs, list(index), fields)
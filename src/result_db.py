@@ -0,0 +1,198 @@
+"""
+   Shared read-only SQLite access layer for ETAP result databases
+"""
+
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# 结果数据库只读取不写入：大块内存映射、64MB 页缓存、临时表放在内存中
+DEFAULT_PRAGMAS = {
+    "query_only": 1,
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+}
+CACHED_STATEMENTS = 256
+MAX_CONNECTIONS = 8
+
+_connections = OrderedDict()
+_connections_lock = threading.Lock()
+_query_hooks = []
+_stats_lock = threading.Lock()
+query_stats = {}
+
+
+def add_query_hook(hook):
+    """注册查询计时回调 hook(sql, elapsed, rows)，每条查询取完结果后调用"""
+    _query_hooks.append(hook)
+
+
+def remove_query_hook(hook):
+    if hook in _query_hooks:
+        _query_hooks.remove(hook)
+
+
+def _record_query(sql, elapsed, rows):
+    key = " ".join(sql.split())
+    with _stats_lock:
+        stats = query_stats.setdefault(key, {"calls": 0, "rows": 0, "total": 0.0, "max": 0.0})
+        stats["calls"] += 1
+        stats["rows"] += rows
+        stats["total"] += elapsed
+        stats["max"] = max(stats["max"], elapsed)
+    for hook in _query_hooks:
+        hook(sql, elapsed, rows)
+
+
+def print_query_stats(limit=20):
+    """按总耗时从高到低打印查询统计"""
+    print(f"{'Calls':>7}{'Rows':>10}{'Total(s)':>10}{'Max(s)':>9}  Query")
+    items = sorted(query_stats.items(), key=lambda item: item[1]["total"], reverse=True)
+    for sql, stats in items[:limit]:
+        print(f"{stats['calls']:>7}{stats['rows']:>10}{stats['total']:>10.3f}{stats['max']:>9.3f}  {sql[:100]}")
+
+
+class TimedCursor(sqlite3.Cursor):
+    """记录每条查询从 execute 到取完结果所用时间的游标"""
+
+    _sql = None
+    _start = 0.0
+    _rows = 0
+
+    def execute(self, sql, parameters=()):
+        self._sql = sql
+        self._rows = 0
+        self._start = time.perf_counter()
+        return super().execute(sql, parameters)
+
+    def _finish(self):
+        if self._sql is not None:
+            _record_query(self._sql, time.perf_counter() - self._start, self._rows)
+            self._sql = None
+
+    def fetchall(self):
+        rows = super().fetchall()
+        self._rows += len(rows)
+        self._finish()
+        return rows
+
+    def fetchone(self):
+        row = super().fetchone()
+        self._rows += row is not None
+        self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        rows = super().fetchmany(size)
+        self._rows += len(rows)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+
+class ResultConnection(sqlite3.Connection):
+    """cursor()（以及 execute()）返回 TimedCursor 的连接"""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+
+def _uri(path, immutable):
+    uri = pathlib.Path(os.path.abspath(path)).as_uri() + "?mode=ro"
+    if immutable:
+        # immutable=1: 不加锁、不检查文件变化，适用于计算完成后不再修改的结果文件
+        uri += "&immutable=1"
+    return uri
+
+
+def _apply_pragmas(conn, pragmas):
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name}={value}")
+
+
+def open_result_db(path, immutable=True, snapshot=False, pragmas=None, cached_statements=CACHED_STATEMENTS):
+    """
+    以只读方式打开结果数据库
+
+    参数:
+    path: 结果数据库路径
+    immutable: 以 immutable 方式打开（不加锁），结果文件仍可能被写入时设为 False
+    snapshot: 为 True 时通过 backup API 将整个数据库复制到内存中，之后的查询不再读文件
+    pragmas: 覆盖 DEFAULT_PRAGMAS 中的设置
+    cached_statements: 预编译语句缓存的大小
+
+    返回:
+    ResultConnection
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Result database not found: {path}")
+    pragmas = {**DEFAULT_PRAGMAS, **(pragmas or {})}
+    # check_same_thread=False 只为允许连接缓存在其他线程中关闭连接，连接本身只在打开它的线程中使用
+    conn = sqlite3.connect(_uri(path, immutable), uri=True, factory=ResultConnection,
+                           cached_statements=cached_statements, check_same_thread=False)
+    if snapshot:
+        memory = sqlite3.connect(":memory:", factory=ResultConnection, cached_statements=cached_statements,
+                                 check_same_thread=False)
+        conn.backup(memory)
+        conn.close()
+        conn = memory
+        pragmas.pop("mmap_size", None)
+    _apply_pragmas(conn, pragmas)
+    return conn
+
+
+def get_connection(path, snapshot=False, immutable=True):
+    """
+    获取结果数据库的共享连接
+
+    同一线程内同一文件（大小和修改时间不变）复用同一个连接，文件被重新生成后自动重新打开；
+    最多保留 MAX_CONNECTIONS 个连接，超出时关闭最久未使用的连接。
+    返回的连接由本模块管理，调用方不要关闭。
+
+    参数:
+    path: 结果数据库路径
+    snapshot: 是否复制到内存中（同一文件需要大量查询时使用）
+    immutable: 是否以 immutable 方式打开
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    stamp = (stat.st_size, stat.st_mtime_ns)
+    key = (threading.get_ident(), path, snapshot, immutable)
+    with _connections_lock:
+        entry = _connections.get(key)
+        if entry is not None and entry[0] == stamp:
+            _connections.move_to_end(key)
+            return entry[1]
+        if entry is not None:
+            entry[1].close()
+        conn = open_result_db(path, immutable=immutable, snapshot=snapshot)
+        _connections[key] = (stamp, conn)
+        _connections.move_to_end(key)
+        while len(_connections) > MAX_CONNECTIONS:
+            _, (_, oldest) = _connections.popitem(last=False)
+            oldest.close()
+        return conn
+
+
+def release(path):
+    """关闭某个结果文件的全部共享连接（ETAP 重新生成该文件前调用，Windows 下打开的文件无法被替换）"""
+    path = os.path.abspath(path)
+    with _connections_lock:
+        for key in [key for key in _connections if key[1] == path]:
+            _connections.pop(key)[1].close()
+
+
+def close_all():
+    """关闭全部共享连接"""
+    with _connections_lock:
+        for _, conn in _connections.values():
+            conn.close()
+        _connections.clear()
@@ -0,0 +1,94 @@
+"""
+   Single-query columnar reader for ETAP result databases
+"""
+
+import sqlite3
+from contextlib import closing, nullcontext
+
+import numpy as np
+
+from src.result_db import open_result_db
+
+# LFR 表中母线记录的筛选条件及默认读取的字段
+LFR_BUS_FILTER = "TYPE != 0 AND kV != 0"
+LFR_BUS_FIELDS = ("IDFrom", "kV", "VoltMag", "VoltAng")
+
+
+def table_fields(conn, table):
+    """
+    读取结果表的全部字段名
+
+    参数:
+    conn: sqlite3 连接
+    table: 表名，例如 'LFR'
+
+    返回:
+    list: 字段名列表，表不存在时抛出 ValueError
+    """
+    fields = [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")').fetchall()]
+    if not fields:
+        raise ValueError(f"Table {table} not found in result database")
+    return fields
+
+
+def _column_array(values):
+    """将一列查询结果转换为 NumPy 数组：整数列为 int64，数值列为 float64（NULL 为 NaN），其余为 object"""
+    if all(type(value) is int for value in values):
+        return np.array(values, dtype=np.int64)
+    if not any(isinstance(value, (str, bytes)) for value in values):
+        try:
+            return np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            pass
+    return np.array(values, dtype=object)
+
+
+def read_result_table(source, table, fields, where=None, params=()):
+    """
+    单次查询读取结果表的指定字段，按列返回 NumPy 数组
+
+    参数:
+    source: 结果数据库路径（打开只读连接，读取后关闭）或已打开的 sqlite3 连接（不关闭）
+    table: 表名，例如 'LFR'、'IBusLF3PH'
+    fields: 需要读取的字段名序列，按 PRAGMA table_info 校验
+    where: 可选的筛选条件（SQL 表达式），其中的参数用 ? 占位
+    params: where 中占位符对应的参数
+
+    返回:
+    dict: 字段名 -> numpy.ndarray，各数组长度相同
+    """
+    if isinstance(source, sqlite3.Connection):
+        opened = nullcontext(source)
+    else:
+        opened = closing(open_result_db(source))
+    with opened as conn:
+        available = table_fields(conn, table)
+        fields = list(fields)
+        unknown = [field for field in fields if field not in available]
+        if unknown:
+            raise ValueError(f"Unknown fields for table {table}: {', '.join(unknown)}; "
+                             f"available fields: {', '.join(available)}")
+        columns = ", ".join(f'"{field}"' for field in fields)
+        sql = f'SELECT {columns} FROM "{table}"'
+        if where:
+            sql += f" WHERE {where}"
+        rows = conn.execute(sql, params).fetchall()
+
+    if not rows:
+        return {field: np.array([], dtype=object) for field in fields}
+    return {field: _column_array(values) for field, values in zip(fields, zip(*rows))}
+
+
+def read_lf_results(source, fields=LFR_BUS_FIELDS, where=LFR_BUS_FILTER, params=()):
+    """
+    读取潮流结果表 LFR 的任意字段（母线电压、支路潮流、损耗、负载率等）
+
+    参数:
+    source: 结果数据库路径或已打开的 sqlite3 连接
+    fields: LFR 中的字段名序列
+    where: 筛选条件，默认只取母线记录；传入 None 读取全部记录
+
+    返回:
+    dict: 字段名 -> numpy.ndarray
+    """
+    return read_result_table(source, "LFR", fields, where, params)
@@ -0,0 +1,242 @@
+"""
+   Parallel parameter sweep across several ETAP DataHub instances
+"""
+
+import threading
+import time
+from collections import deque
+
+import pandas as pd
+
+ERROR_COLUMN = "error"
+
+
+def _sweep_worker(base_address, session_factory, evaluate, work, results, attempts, outstanding, condition,
+                  max_attempts, max_failures, stats, finalize):
+    """
+    单个实例的工作线程：独占一个连接，从队列中取出扫描点依次计算
+
+    队列为空但仍有其他实例在计算的点（outstanding 不为 0）时等待，
+    这些点失败后放回队列时仍能由本实例重试；全部点都有结果后退出。
+    """
+    try:
+        session = session_factory(base_address)
+    except Exception as e:
+        print(f"[{base_address}] connection failed, worker not started: {str(e)}")
+        stats[base_address] = {"points": 0, "failures": 0, "time": 0.0, "alive": False}
+        return
+
+    done = 0
+    failures = 0
+    consecutive = 0
+    busy = 0.0
+    alive = True
+    while True:
+        with condition:
+            while not work and outstanding[0] > 0:
+                condition.wait()
+            if not work:
+                break
+            index, point = work.popleft()
+        start = time.perf_counter()
+        try:
+            row = evaluate(session, point)
+        except Exception as e:
+            busy += time.perf_counter() - start
+            failures += 1
+            consecutive += 1
+            with condition:
+                attempts[index] += 1
+                retry = attempts[index] < max_attempts
+                if retry:
+                    work.append((index, point))
+                else:
+                    results[index] = {ERROR_COLUMN: f"{base_address}: {str(e)}"}
+                    outstanding[0] -= 1
+                condition.notify_all()
+            print(f"[{base_address}] point {index} failed: {str(e)}"
+                  + (", requeued" if retry else ""))
+            if consecutive >= max_failures:
+                print(f"[{base_address}] {consecutive} consecutive failures, worker stopped")
+                alive = False
+                break
+            continue
+        busy += time.perf_counter() - start
+        consecutive = 0
+        done += 1
+        with condition:
+            results[index] = row
+            outstanding[0] -= 1
+            condition.notify_all()
+
+    if finalize is not None:
+        try:
+            finalize(session)
+        except Exception as e:
+            print(f"[{base_address}] finalize failed: {str(e)}")
+    stats[base_address] = {"points": done, "failures": failures, "time": busy, "alive": alive}
+
+
+def run_sweep(points, base_addresses, session_factory, evaluate, max_attempts=2, max_failures=3, finalize=None):
+    """
+    将扫描点分配到多个 ETAP 实例上并行计算，按原顺序汇总结果
+
+    每个地址启动一个工作线程，线程内通过 session_factory 建立自己的连接；
+    各实例应打开各自的项目副本，否则参数修改和结果数据库会相互覆盖。
+    工作线程从共享队列中取点，计算快的实例自然分到更多的点。
+    某个点失败时放回队列由其他实例重试，连续失败 max_failures 次的实例不再取点；
+    队列已空的实例等到所有点都有结果后才退出，不会漏掉其他实例放回队列的点。
+
+    参数:
+    points: 扫描点列表，元素可以是任意对象（例如参数值或参数字典）
+    base_addresses: ETAP DataHub 的 REST API 地址列表
+    session_factory: 由地址创建会话的函数，例如 Main
+    evaluate: evaluate(session, point) -> dict，返回该点的一行结果
+    max_attempts: 每个点最多尝试的次数
+    max_failures: 实例连续失败多少次后停止
+    finalize: 工作线程结束前对会话调用的函数，例如 Main.restore_parameters
+
+    返回:
+    pandas.DataFrame: 每个扫描点一行，顺序与 points 相同；失败的点只有 error 列有值
+    """
+    points = list(points)
+    work = deque(enumerate(points))
+    results = [None] * len(points)
+    attempts = [0] * len(points)
+    # 尚未得到结果（成功或最终失败）的点数，包括正在计算的点
+    outstanding = [len(points)]
+    condition = threading.Condition()
+    stats = {}
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=_sweep_worker, name=f"sweep-{address}",
+                                args=(address, session_factory, evaluate, work, results, attempts, outstanding,
+                                      condition, max_attempts, max_failures, stats, finalize))
+               for address in base_addresses]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    wall_time = time.perf_counter() - start
+
+    # 所有实例都已停止时，队列中剩余的点记为失败
+    for index, _ in work:
+        results[index] = {ERROR_COLUMN: "no ETAP instance available"}
+
+    _print_sweep_report(stats, len(points), wall_time)
+    return pd.DataFrame([row if row is not None else {} for row in results])
+
+
+def _print_sweep_report(stats, total, wall_time):
+    """打印各实例完成的点数与耗时"""
+    print(f"{'Instance':<32}{'Points':>8}{'Failed':>8}{'Busy(s)':>10}{'s/point':>10}")
+    for address, item in stats.items():
+        per_point = item["time"] / item["points"] if item["points"] else 0.0
+        state = "" if item["alive"] else "  (stopped)"
+        print(f"{address:<32}{item['points']:>8}{item['failures']:>8}{item['time']:>10.2f}"
+              f"{per_point:>10.2f}{state}")
+    done = sum(item["points"] for item in stats.values())
+    print(f"Sweep finished: {done}/{total} points in {wall_time:.2f}s")
+
+
+# 行结果中表示该点直接取自结果缓存（没有运行计算）的键
+CACHED_COLUMN = "cached"
+
+
+def _sign(value):
+    # 指标值可能是 numpy 标量，numpy 布尔值不支持相减
+    return int(value > 0) - int(value < 0)
+
+
+def find_crossing(evaluate, low, high, threshold, tolerance, metric=None, method="secant",
+                  max_expansions=10, max_runs=50):
+    """
+    自适应搜索指标越过阈值的参数值（例如母线电压降到下限时的负荷水平）
+
+    先计算区间两端，若两端在阈值同侧则向指标接近阈值的方向扩展区间（每次扩展的宽度加倍）；
+    找到包含越限点的区间后，用割线法（Illinois 改进的试位法）或二分法缩小区间，
+    直到区间宽度不超过 tolerance。
+
+    参数:
+    evaluate: evaluate(value) 返回指标值，或返回包含 metric 列的一行结果（dict）
+    low, high: 初始搜索区间
+    threshold: 阈值
+    tolerance: 参数值的精度要求
+    metric: evaluate 返回 dict 时指标所在的键
+    method: 'secant' 或 'bisection'
+    max_expansions: 两端在阈值同侧时最多扩展区间的次数，宽度逐次加倍，10 次可覆盖初始区间宽度的 1023 倍
+    max_runs: 计算次数上限
+
+    返回:
+    dict: crossing（区间内线性插值得到的越限点，未找到时为 None）、bracket（最终区间）、
+          evaluations（evaluate 调用次数）、cached（其中结果行的 cached 键为真、取自结果缓存的次数）、
+          runs（实际运行计算的次数）、grid_runs（以 tolerance 为步长扫描初始区间所需的次数）、
+          saved（节省的计算次数，未找到越限点时为 None）、history（按计算顺序排列的全部结果 DataFrame）
+    """
+    rows = []
+
+    def g(value):
+        result = evaluate(value)
+        row = dict(result) if isinstance(result, dict) else {"value": value, "metric": result}
+        rows.append(row)
+        return (row[metric] if metric is not None else row["metric"]) - threshold
+
+    grid_runs = int(round((high - low) / tolerance)) + 1
+    a, b = low, high
+    fa, fb = g(a), g(b)
+    step = b - a
+    for _ in range(max_expansions):
+        if _sign(fa) != _sign(fb) or len(rows) >= max_runs:
+            break
+        if abs(fb) <= abs(fa):
+            a, fa = b, fb
+            b, fb = b + step, g(b + step)
+        else:
+            b, fb = a, fa
+            a, fa = a - step, g(a - step)
+        step *= 2
+
+    crossing = None
+    if _sign(fa) == _sign(fb) and fa != 0:
+        print(f"Threshold {threshold} not crossed in [{a}, {b}], no crossing found")
+    else:
+        # ga、gb 为 Illinois 法中可能被减半的函数值，fa、fb 保留实际值用于最终插值
+        ga, gb = fa, fb
+        side = 0
+        while b - a > tolerance and fa != 0 and fb != 0 and len(rows) < max_runs:
+            x = (a + b) / 2
+            if method == "secant":
+                x = b - gb * (b - a) / (gb - ga)
+                # 防止新点过于靠近区间端点，保证每次计算都能有效缩小区间
+                x = min(max(x, a + tolerance / 2), b - tolerance / 2)
+            fx = g(x)
+            if fx == 0:
+                a = b = x
+                fa = fb = fx
+            elif _sign(fx) == _sign(fa):
+                a, fa, ga = x, fx, fx
+                if side == -1:
+                    gb /= 2
+                side = -1
+            else:
+                b, fb, gb = x, fx, fx
+                if side == 1:
+                    ga /= 2
+                side = 1
+        if fa == 0:
+            crossing = a
+        elif fb == 0:
+            crossing = b
+        else:
+            crossing = a - fa * (b - a) / (fb - fa)
+
+    cached = sum(1 for row in rows if row.get(CACHED_COLUMN))
+    runs = len(rows) - cached
+    saved = grid_runs - runs if crossing is not None else None
+    result = {"crossing": crossing, "bracket": (a, b), "evaluations": len(rows), "cached": cached, "runs": runs,
+              "grid_runs": grid_runs, "saved": saved, "history": pd.DataFrame(rows)}
+    summary = f"{runs} runs ({cached} cached)"
+    if saved is not None:
+        summary += f" vs {grid_runs} on a grid with step {tolerance} ({saved} saved)"
+    print(f"Crossing: {crossing}, bracket [{a:.6g}, {b:.6g}], {summary}")
+    return result
@@ -0,0 +1,166 @@
+"""
+   Vectorized analytics for time domain load flow time series
+"""
+
+import numpy as np
+import pandas as pd
+
+# TDTimeID 中时间字符串的格式
+TIME_FORMAT = "%m-%d-%Y %H:%M:%S.%f"
+
+
+def parse_times(times):
+    """一次性解析时间字符串，返回 datetime64[ns] 数组"""
+    # pandas 3 默认解析为微秒精度，统一转换为纳秒
+    return pd.to_datetime(pd.Series(times, dtype=object), format=TIME_FORMAT).to_numpy().astype("datetime64[ns]")
+
+
+def hours(timestamps):
+    """各时间点相对第一个时间点的小时数（float64）"""
+    timestamps = np.asarray(timestamps, dtype="datetime64[ns]")
+    if len(timestamps) == 0:
+        return np.array([], dtype=np.float64)
+    return (timestamps - timestamps[0]) / np.timedelta64(1, "h")
+
+
+def _as_matrix(values):
+    values = np.asarray(values, dtype=np.float64)
+    return values[:, None] if values.ndim == 1 else values
+
+
+def apparent_power(p, q):
+    """视在功率 S = sqrt(P^2 + Q^2)，缺失数据为 NaN"""
+    return np.hypot(p, q)
+
+
+def power_factor(p, q):
+    """功率因数 P / S，S 为 0 时取 0，缺失数据为 NaN"""
+    p = np.asarray(p, dtype=np.float64)
+    s = apparent_power(p, np.asarray(q, dtype=np.float64))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(s > 0, p / s, np.where(np.isnan(s), np.nan, 0.0))
+
+
+def energy(timestamps, values):
+    """
+    按梯形法对时间积分（功率 MW -> 电量 MWh）
+
+    参数:
+    timestamps: 时间点数组（可以不等间隔）
+    values: 长度为时间点数的一维数组，或 时间 x 元件 矩阵，缺失数据为 NaN
+
+    返回:
+    每个元件的积分值；两端都有数据的时间段才计入，没有这样的时间段时为 NaN
+    """
+    values = _as_matrix(values)
+    if len(values) < 2:
+        return np.full(values.shape[1], np.nan)
+    step = np.diff(hours(timestamps))[:, None]
+    area = (values[1:] + values[:-1]) / 2 * step
+    valid = ~np.isnan(area)
+    return np.where(valid.any(axis=0), np.where(valid, area, 0.0).sum(axis=0), np.nan)
+
+
+def ramp_rates(timestamps, values):
+    """相邻时间点之间的变化率（每小时），返回 (时间点数 - 1) x 元件 矩阵"""
+    values = _as_matrix(values)
+    step = np.diff(hours(timestamps))[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.diff(values, axis=0) / step
+
+
+def peaks(timestamps, values):
+    """
+    每个元件的峰值及出现时间
+
+    返回:
+    (peak, peak_time)：全部缺失的元件峰值为 NaN、时间为 NaT
+    """
+    values = _as_matrix(values)
+    if len(values) == 0:
+        return np.full(values.shape[1], np.nan), np.full(values.shape[1], np.datetime64("NaT", "ns"))
+    valid = ~np.isnan(values).all(axis=0)
+    index = np.argmax(np.where(np.isnan(values), -np.inf, values), axis=0)
+    timestamps = np.asarray(timestamps, dtype="datetime64[ns]")
+    peak = np.where(valid, values[index, np.arange(values.shape[1])], np.nan)
+    peak_time = np.where(valid, timestamps[index], np.datetime64("NaT", "ns"))
+    return peak, peak_time
+
+
+def _column_mean(values):
+    """按列求平均值，忽略 NaN；全部缺失的列为 NaN（不产生警告）"""
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=0)
+    total = np.where(valid, values, 0.0).sum(axis=0)
+    return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+
+def _column_extreme(values, largest):
+    """按列求最大值或最小值，忽略 NaN 和 inf；没有有效数据的列为 NaN"""
+    finite = np.isfinite(values)
+    fill = -np.inf if largest else np.inf
+    filled = np.where(finite, values, fill)
+    extreme = filled.max(axis=0, initial=fill) if largest else filled.min(axis=0, initial=fill)
+    return np.where(finite.any(axis=0), extreme, np.nan)
+
+
+def load_statistics(timestamps, p, q=None, names=None):
+    """
+    一次计算全部负荷的统计量
+
+    参数:
+    timestamps: 时间点数组
+    p: 有功功率（MW），时间 x 负荷 矩阵
+    q: 无功功率（Mvar），时间 x 负荷 矩阵，可选
+    names: 负荷名称
+
+    返回:
+    pandas.DataFrame: 每个负荷一行，peak_MW、peak_time、mean_MW、load_factor（平均/峰值）、
+                      energy_MWh、max_ramp_up、max_ramp_down（MW/h），给出 q 时另有 peak_MVA、mean_pf、min_pf
+    """
+    p = _as_matrix(p)
+    peak, peak_time = peaks(timestamps, p)
+    mean = _column_mean(p)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        load_factor = np.where(peak > 0, mean / peak, np.nan)
+    ramps = ramp_rates(timestamps, p)
+    stats = {
+        "peak_MW": peak,
+        "peak_time": peak_time,
+        "mean_MW": mean,
+        "load_factor": load_factor,
+        "energy_MWh": energy(timestamps, p),
+        "max_ramp_up": _column_extreme(ramps, largest=True),
+        "max_ramp_down": _column_extreme(ramps, largest=False),
+    }
+    if q is not None:
+        q = _as_matrix(q)
+        pf = power_factor(p, q)
+        stats["peak_MVA"] = peaks(timestamps, apparent_power(p, q))[0]
+        stats["mean_pf"] = _column_mean(pf)
+        stats["min_pf"] = _column_extreme(pf, largest=False)
+    frame = pd.DataFrame(stats)
+    frame.insert(0, "Load", list(names) if names is not None else np.arange(p.shape[1]))
+    return frame
+
+
+def system_statistics(timestamps, total_load, total_loss):
+    """
+    系统总负荷和总损耗的统计量
+
+    返回:
+    dict: peak_load_MW、peak_time、load_factor、energy_MWh、loss_energy_MWh、loss_percent（损耗电量/负荷电量）
+    """
+    load = np.asarray(total_load, dtype=np.float64)
+    peak, peak_time = peaks(timestamps, load)
+    load_energy = float(energy(timestamps, load)[0])
+    loss_energy = float(energy(timestamps, total_loss)[0])
+    mean = float(_column_mean(load[:, None])[0])
+    return {
+        "peak_load_MW": float(peak[0]),
+        "peak_time": peak_time[0],
+        "load_factor": mean / float(peak[0]) if peak[0] > 0 else np.nan,
+        "energy_MWh": load_energy,
+        "loss_energy_MWh": loss_energy,
+        "loss_percent": loss_energy / load_energy * 100 if load_energy > 0 else np.nan,
+    }
@@ -0,0 +1,211 @@
+"""
+   Full-network time domain load flow results stored as memory-mapped time x element arrays
+"""
+
+import csv
+import json
+import os
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from src.result_db import open_result_db
+from src.td_analytics import parse_times
+from src.td_reader import index_of, read_time_index, table_spec
+
+# 每次从结果表取出的行数，决定导出时的内存占用
+CHUNK_ROWS = 200000
+
+
+def _write_csv(path, header, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def _read_csv(path):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    return rows[1:]
+
+
+def _export_table(conn, name, spec, fields, result_ids, output_dir, dtype, chunk_rows):
+    """将一个结果表流式写入 output_dir/name/ 下的 field.npy（时间 x 元件），返回该表的元数据"""
+    table_dir = os.path.join(output_dir, name)
+    os.makedirs(table_dir, exist_ok=True)
+
+    # 元件索引：按内部ID排序，列号即在 elements.csv 中的行号
+    elements = dict(conn.execute(
+        f'SELECT "{spec["iid"]}", "{spec["name"]}" FROM "{spec["info"]}" ORDER BY "{spec["iid"]}"').fetchall())
+    iids = np.array(list(elements), dtype=np.int64)
+    _write_csv(os.path.join(table_dir, "elements.csv"), ["IID", "Name"], elements.items())
+
+    shape = (len(result_ids), len(iids))
+    arrays = {}
+    for field in fields:
+        arrays[field] = np.lib.format.open_memmap(os.path.join(table_dir, field + ".npy"), mode="w+",
+                                                  dtype=dtype, shape=shape)
+        arrays[field][:] = np.nan
+
+    columns = ", ".join(f'"{field}"' for field in fields)
+    cur = conn.cursor()
+    cur.execute(f'SELECT ResultID, "{spec["iid"]}", {columns} FROM "{spec["result"]}"')
+    total = skipped = 0
+    while True:
+        rows = cur.fetchmany(chunk_rows)
+        if not rows:
+            break
+        values = list(zip(*rows))
+        row_index = index_of(result_ids, np.array(values[0], dtype=np.int64))
+        col_index = index_of(iids, np.array(values[1], dtype=np.int64))
+        keep = (row_index >= 0) & (col_index >= 0)
+        for field, column in zip(fields, values[2:]):
+            arrays[field][row_index[keep], col_index[keep]] = np.array(column, dtype=np.float64)[keep]
+        total += len(rows)
+        skipped += int(len(rows) - keep.sum())
+    cur.close()
+
+    for array in arrays.values():
+        array.flush()
+    print(f"{name}: {shape[0]} times x {shape[1]} elements x {len(fields)} fields "
+          f"({total} rows, {skipped} without matching time or element)")
+    return {"spec": spec, "fields": list(fields), "shape": list(shape)}
+
+
+def export_td_cube(database_path, output_dir, tables=("bus", "load"), fields=None, dtype=np.float64,
+                   chunk_rows=CHUNK_ROWS):
+    """
+    将时域潮流结果中全部元件、全部时间点的数据导出为磁盘上的 时间 x 元件 数组
+
+    每个结果表按 chunk_rows 行分批读取并写入预先分配、以 NaN 填充的内存映射 .npy 文件，
+    内存占用与网络规模和时间点数量无关。
+
+    参数:
+    database_path: 时域潮流结果数据库路径
+    output_dir: 输出目录
+    tables: 元件类型列表（SERIES_TABLES 中的名称），或 名称 -> 元件类型/表结构dict 的映射，
+            例如 {"bus": "bus", "branch": {"info": ..., "name": ..., "iid": ..., "result": ..., "fields": [...]}}
+    fields: 可选，名称 -> 字段列表，覆盖表结构中的默认字段
+    dtype: 数组的数据类型，全网长时间序列可用 np.float32 减少一半磁盘占用
+    chunk_rows: 每批读取的行数
+
+    输出文件:
+    cube.json: 各表的结构、字段和数组形状
+    times.csv: 行号 -> ResultID、时间
+    <名称>/elements.csv: 列号 -> 元件内部ID、名称
+    <名称>/<字段>.npy: 时间 x 元件 数组，缺失的数据为 NaN
+
+    返回:
+    TDResultCube（以只读内存映射方式打开导出的结果）
+    """
+    if not isinstance(tables, dict):
+        tables = {kind: kind for kind in tables}
+    fields = fields or {}
+    os.makedirs(output_dir, exist_ok=True)
+
+    meta = {"database": os.path.abspath(database_path), "dtype": np.dtype(dtype).name, "tables": {}}
+    with closing(open_result_db(database_path)) as conn:
+        result_ids, times = read_time_index(conn)
+        _write_csv(os.path.join(output_dir, "times.csv"), ["ResultID", "Time"], zip(result_ids.tolist(), times))
+        for name, kind in tables.items():
+            spec = table_spec(kind)
+            meta["tables"][name] = _export_table(conn, name, spec, list(fields.get(name, spec["fields"])),
+                                                 result_ids, output_dir, dtype, chunk_rows)
+
+    with open(os.path.join(output_dir, "cube.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return TDResultCube.load(output_dir)
+
+
+class TDResultCube:
+    """
+    export_td_cube 导出的时域潮流结果
+
+    result_ids、times: 每个时间点（数组的行）的 ResultID 和时间
+    elements: 表名 -> 元件名称列表（数组的列）
+    数组按需以内存映射方式打开，按母线或时间段切片时只读取用到的部分
+    """
+
+    def __init__(self, path, meta, result_ids, times, elements, iids, mmap_mode="r"):
+        self.path = path
+        self.meta = meta
+        self.result_ids = result_ids
+        self.times = pd.Series(parse_times(times))
+        self.elements = elements
+        self.iids = iids
+        self.mmap_mode = mmap_mode
+        self._arrays = {}
+        self._columns = {}
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """读取 export_td_cube 的输出目录"""
+        with open(os.path.join(path, "cube.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        time_rows = _read_csv(os.path.join(path, "times.csv"))
+        result_ids = np.array([int(row[0]) for row in time_rows], dtype=np.int64)
+        elements = {}
+        iids = {}
+        for name in meta["tables"]:
+            rows = _read_csv(os.path.join(path, name, "elements.csv"))
+            iids[name] = np.array([int(row[0]) for row in rows], dtype=np.int64)
+            elements[name] = [row[1] for row in rows]
+        return cls(path, meta, result_ids, [row[1] for row in time_rows], elements, iids, mmap_mode)
+
+    def fields(self, table):
+        return self.meta["tables"][table]["fields"]
+
+    def array(self, table, field):
+        """返回某个表某个字段的 时间 x 元件 数组（内存映射）"""
+        key = (table, field)
+        if key not in self._arrays:
+            if field not in self.fields(table):
+                raise ValueError(f"Field {field} not exported for {table}; available fields: "
+                                 f"{', '.join(self.fields(table))}")
+            self._arrays[key] = np.load(os.path.join(self.path, table, field + ".npy"), mmap_mode=self.mmap_mode)
+        return self._arrays[key]
+
+    def columns(self, table, names):
+        """元件名称 -> 列号，不存在的名称抛出 KeyError"""
+        if table not in self._columns:
+            index = {}
+            for position, name in enumerate(self.elements[table]):
+                index.setdefault(name, position)
+            self._columns[table] = index
+        index = self._columns[table]
+        missing = [name for name in names if name not in index]
+        if missing:
+            raise KeyError(f"Elements not found in {table}: {', '.join(missing)}")
+        return [index[name] for name in names]
+
+    def time_slice(self, start=None, end=None):
+        """返回时间段 [start, end] 对应的行切片，时间点按 TimeID 排序"""
+        times = self.times.to_numpy()
+        first = 0 if start is None else int(np.searchsorted(times, np.datetime64(pd.Timestamp(start)), "left"))
+        last = len(times) if end is None else int(np.searchsorted(times, np.datetime64(pd.Timestamp(end)), "right"))
+        return slice(first, last)
+
+    def frame(self, table, field, names=None, start=None, end=None):
+        """
+        读取部分元件、部分时间段的数据
+
+        参数:
+        table: 表名，例如 'bus'
+        field: 字段名，例如 'VPhA'
+        names: 元件名称列表，为空时读取全部元件
+        start, end: 时间段（含两端），为空时不限
+
+        返回:
+        pandas.DataFrame: 行为时间，列为元件名称
+        """
+        rows = self.time_slice(start, end)
+        data = self.array(table, field)
+        if names is None:
+            names = self.elements[table]
+            values = data[rows]
+        else:
+            names = list(names)
+            values = data[rows][:, self.columns(table, names)]
+        return pd.DataFrame(np.asarray(values), index=self.times.iloc[rows].to_numpy(), columns=names)
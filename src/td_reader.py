@@ -0,0 +1,158 @@
+"""
+   Bulk time-series reader for ETAP time domain load flow result databases
+"""
+
+import numpy as np
+
+# 各类元件的信息表（名称 -> 内部ID）、结果表及默认读取的字段，新增元件类型只需添加一项
+SERIES_TABLES = {
+    "bus": {"info": "TDBusInfo", "name": "BusName", "iid": "BusIID", "result": "TDBusResult",
+            "fields": ("VPhA", "AngPhA")},
+    "load": {"info": "TDOneTermDevicesInfo", "name": "DeviceName", "iid": "DeviceIID",
+             "result": "TDSourceandLoadResult", "fields": ("TotalMWPhA", "TotalMvarPhA", "AmpPhA")},
+}
+
+# 系统结果查询的 FROM 部分：只包含 TDSysResult 中有结果的时间点，按 TimeID 排序。
+# export_time_series_power_flow 与流式导出共用，保证两者输出的时间点相同
+SYSTEM_RESULT_ROWS = """
+    FROM TDTimeID t
+    JOIN TDSysResult s ON t.ResultID = s.ResultID
+    ORDER BY t.TimeID
+"""
+
+# 单条语句中 IN 列表的参数个数上限（旧版 SQLite 的 SQLITE_MAX_VARIABLE_NUMBER 为 999）
+MAX_VARIABLES = 900
+
+
+def _chunks(values, size=MAX_VARIABLES):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _placeholders(count):
+    return ", ".join("?" * count)
+
+
+def read_time_index(conn):
+    """
+    读取时间点表 TDTimeID
+
+    返回:
+    (result_ids, times)：按 TimeID 排序的 ResultID（int64 数组）和时间字符串列表
+    """
+    rows = conn.execute("SELECT ResultID, Time FROM TDTimeID ORDER BY TimeID").fetchall()
+    result_ids = np.array([row[0] for row in rows], dtype=np.int64)
+    return result_ids, [row[1] for row in rows]
+
+
+def critical_buses(conn, limit=5):
+    """返回告警表中严重欠压的母线（未指定母线时的默认分析对象）"""
+    rows = conn.execute("""
+        SELECT DISTINCT DeviceID FROM TDAlert
+        WHERE Condition='Under Voltage' AND AlertType='Critical'
+        LIMIT ?
+    """, (limit,)).fetchall()
+    return [row[0] for row in rows]
+
+
+def resolve_iids(conn, kind, names):
+    """
+    一次查询将元件名称解析为内部ID
+
+    参数:
+    conn: 结果数据库连接
+    kind: SERIES_TABLES 中的元件类型（例如 'bus'）或同样结构的 dict
+    names: 元件名称列表
+
+    返回:
+    dict: 名称 -> 内部ID，未找到的名称不在其中；同名元件取第一条记录
+    """
+    spec = table_spec(kind)
+    names = list(dict.fromkeys(names))
+    iids = {}
+    for chunk in _chunks(names):
+        rows = conn.execute(
+            f'SELECT "{spec["name"]}", "{spec["iid"]}" FROM "{spec["info"]}" '
+            f'WHERE "{spec["name"]}" IN ({_placeholders(len(chunk))}) ORDER BY rowid', chunk).fetchall()
+        for name, iid in rows:
+            iids.setdefault(name, iid)
+    return iids
+
+
+def table_spec(kind):
+    """返回元件类型的表结构：kind 为 SERIES_TABLES 中的名称，或调用方给出的同样结构的 dict"""
+    return kind if isinstance(kind, dict) else SERIES_TABLES[kind]
+
+
+def index_of(keys, values):
+    """返回 values 中每个值在 keys 中的位置，不存在的为 -1"""
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    index = np.searchsorted(sorted_keys, values)
+    index = np.minimum(index, len(sorted_keys) - 1)
+    found = sorted_keys[index] == values
+    return np.where(found, order[index], -1)
+
+
+def fetch_series(conn, kind, iids, fields, result_ids):
+    """
+    单次查询读取多个元件的时间序列，并转换为 时间 x 元件 矩阵
+
+    参数:
+    conn: 结果数据库连接
+    kind: SERIES_TABLES 中的元件类型或同样结构的 dict
+    iids: 内部ID列表，决定矩阵的列顺序
+    fields: 结果表中的数值字段，例如 ['VPhA', 'AngPhA']
+    result_ids: read_time_index 返回的 ResultID，决定矩阵的行顺序
+
+    返回:
+    dict: 字段名 -> float64 矩阵（len(result_ids) x len(iids)），缺失的数据为 NaN
+    """
+    spec = table_spec(kind)
+    iids = list(iids)
+    data = {field: np.full((len(result_ids), len(iids)), np.nan) for field in fields}
+    if not iids or len(result_ids) == 0:
+        return data
+    columns = ", ".join(f'"{field}"' for field in fields)
+    iid_keys = np.array(iids, dtype=np.int64)
+    for chunk in _chunks(iids):
+        rows = conn.execute(
+            f'SELECT ResultID, "{spec["iid"]}", {columns} FROM "{spec["result"]}" '
+            f'WHERE "{spec["iid"]}" IN ({_placeholders(len(chunk))})', chunk).fetchall()
+        if not rows:
+            continue
+        values = list(zip(*rows))
+        row_index = index_of(result_ids, np.array(values[0], dtype=np.int64))
+        col_index = index_of(iid_keys, np.array(values[1], dtype=np.int64))
+        keep = (row_index >= 0) & (col_index >= 0)
+        for field, column in zip(fields, values[2:]):
+            data[field][row_index[keep], col_index[keep]] = np.array(column, dtype=np.float64)[keep]
+    return data
+
+
+def fetch_device_series(conn, kind, names, fields, result_ids=None):
+    """
+    按元件名称批量读取时间序列：一次查询解析全部名称，一次查询读取全部数据
+
+    参数:
+    conn: 结果数据库连接
+    kind: SERIES_TABLES 中的元件类型，例如 'bus'、'load'
+    names: 元件名称列表
+    fields: 结果表中的数值字段
+    result_ids: 时间点的 ResultID，为空时读取 TDTimeID
+
+    返回:
+    dict: names（找到的元件名称，即矩阵的列）、missing（未找到的名称）、
+          result_ids（矩阵的行）、data（字段名 -> 时间 x 元件 矩阵）
+    """
+    if result_ids is None:
+        result_ids, _ = read_time_index(conn)
+    names = list(dict.fromkeys(names))
+    iids = resolve_iids(conn, kind, names)
+    found = [name for name in names if name in iids]
+    return {
+        "names": found,
+        "missing": [name for name in names if name not in iids],
+        "result_ids": result_ids,
+        "data": fetch_series(conn, kind, [iids[name] for name in found], fields, result_ids),
+    }
@@ -0,0 +1,223 @@
+"""
+   Constant-memory streaming export of time domain load flow results
+"""
+
+import os
+from bisect import bisect_right
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from src.result_db import open_result_db
+from src.td_reader import SYSTEM_RESULT_ROWS, critical_buses, index_of, resolve_iids, table_spec
+
+# 每批处理的时间点数量，峰值内存约为 CHUNK_TIMES x（元件数 x 字段数）
+CHUNK_TIMES = 2000
+
+# 与 export_time_series_power_flow 的系统结果列相同（字段表达式和时间点范围也相同，保证数值一致）
+SYSTEM_SQL = """
+    SELECT t.TimeID, t.Time,
+    s.TotalLoadMWPhA + s.TotalLoadMWPhB + s.TotalLoadMWPhC,
+    s.MWLossPhA + s.MWLossPhB + s.MWLossPhC,
+    s.MinLNBusVPhA, s.MaxBranchLoadingPhA
+""" + SYSTEM_RESULT_ROWS
+SYSTEM_COLUMNS = ("Total_Load_MW", "Total_Loss_MW", "Min_Voltage_Percent", "Max_Branch_Loading_Percent")
+
+# 元件类型 -> [(结果字段, 输出列名格式)]，与 export_time_series_power_flow 的列名一致
+DEVICE_COLUMNS = {
+    "bus": [("VPhA", "Bus_{}_Voltage"), ("AngPhA", "Bus_{}_Angle")],
+    "load": [("TotalMWPhA", "Load_{}_MW"), ("TotalMvarPhA", "Load_{}_Mvar"), ("AmpPhA", "Load_{}_A")],
+}
+
+
+class _OrderedRows:
+    """按 TimeID 排序的查询结果，按时间段分批取出"""
+
+    def __init__(self, cursor, size):
+        self.cursor = cursor
+        self.size = size
+        self.buffer = []
+        self.done = False
+
+    def take_until(self, time_id):
+        """取出 TimeID 不大于 time_id 的全部行"""
+        rows = []
+        while True:
+            if not self.buffer:
+                if self.done:
+                    return rows
+                self.buffer = self.cursor.fetchmany(self.size)
+                if not self.buffer:
+                    self.done = True
+                    return rows
+            split = bisect_right([row[0] for row in self.buffer], time_id)
+            rows.extend(self.buffer[:split])
+            self.buffer = self.buffer[split:]
+            if self.buffer:
+                return rows
+
+
+def _device_query(conn, kind, iids, fields, size):
+    """单次查询按时间顺序读取一组元件的结果"""
+    spec = table_spec(kind)
+    columns = ", ".join(f'r."{field}"' for field in fields)
+    # 内部ID来自数据库本身的整数，直接写入语句以避免参数个数上限
+    iid_list = ", ".join(str(int(iid)) for iid in iids)
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT t.TimeID, r."{spec["iid"]}", {columns}
+        FROM TDTimeID t
+        JOIN "{spec["result"]}" r ON t.ResultID = r.ResultID
+        WHERE r."{spec["iid"]}" IN ({iid_list})
+        ORDER BY t.TimeID
+    """)
+    return _OrderedRows(cur, size)
+
+
+def iter_time_series(database_path, custom_buses=None, custom_loads=None, chunk_times=CHUNK_TIMES):
+    """
+    按时间段分批生成 export_time_series_power_flow 返回的结果表
+
+    系统结果和每类元件结果各只执行一次按时间排序的查询，用 fetchmany 分批读取，
+    每批在 NumPy 中转换为 时间 x 元件 矩阵后生成一个 DataFrame，
+    内存占用只与 chunk_times 有关，与计算时长无关。
+
+    参数:
+    database_path: 时域潮流结果数据库路径
+    custom_buses: 母线名称列表，为空时使用严重欠压告警中的母线（与 export_time_series_power_flow 相同）
+    custom_loads: 负荷名称列表
+    chunk_times: 每批的时间点数量
+
+    返回:
+    生成器，每次生成一个 DataFrame，列与 export_time_series_power_flow 的返回值相同
+    """
+    # 排序和临时索引放在临时文件中，避免长时间序列占用内存
+    with closing(open_result_db(database_path, pragmas={"temp_store": "FILE"})) as conn:
+        buses = list(dict.fromkeys(custom_buses if custom_buses else critical_buses(conn)))
+        loads = list(dict.fromkeys(custom_loads or []))
+
+        groups = []
+        for kind, names in (("bus", buses), ("load", loads)):
+            iids = resolve_iids(conn, kind, names)
+            found = [name for name in names if name in iids]
+            if not found:
+                continue
+            fields = [field for field, _ in DEVICE_COLUMNS[kind]]
+            keys = np.array([iids[name] for name in found], dtype=np.int64)
+            groups.append((kind, found, keys, _device_query(conn, kind, keys.tolist(), fields,
+                                                             chunk_times * len(found))))
+
+        system = conn.cursor()
+        system.execute(SYSTEM_SQL)
+        while True:
+            rows = system.fetchmany(chunk_times)
+            if not rows:
+                break
+            time_ids = np.array([row[0] for row in rows], dtype=np.int64)
+            chunk = {"Time": [row[1] for row in rows]}
+            for index, column in enumerate(SYSTEM_COLUMNS):
+                chunk[column] = np.array([row[index + 2] for row in rows], dtype=np.float64)
+
+            for kind, names, keys, stream in groups:
+                device_rows = stream.take_until(int(time_ids[-1]))
+                matrices = {field: np.full((len(rows), len(names)), np.nan) for field, _ in DEVICE_COLUMNS[kind]}
+                if device_rows:
+                    values = list(zip(*device_rows))
+                    row_index = index_of(time_ids, np.array(values[0], dtype=np.int64))
+                    col_index = index_of(keys, np.array(values[1], dtype=np.int64))
+                    keep = (row_index >= 0) & (col_index >= 0)
+                    for (field, _), column in zip(DEVICE_COLUMNS[kind], values[2:]):
+                        matrices[field][row_index[keep], col_index[keep]] = np.array(column, dtype=np.float64)[keep]
+                # 列顺序与 export_time_series_power_flow 相同：每个元件的各字段相邻
+                for position, name in enumerate(names):
+                    for field, label in DEVICE_COLUMNS[kind]:
+                        chunk[label.format(name)] = matrices[field][:, position]
+
+            yield pd.DataFrame(chunk)
+        system.close()
+        for _, _, _, stream in groups:
+            stream.cursor.close()
+
+
+class _CsvWriter:
+    def __init__(self, path, **options):
+        self.path = path
+        self.options = options
+        self.header = True
+
+    def write(self, df):
+        df.to_csv(self.path, mode="w" if self.header else "a", header=self.header, index=False,
+                  encoding="utf-8", **self.options)
+        self.header = False
+
+    def close(self):
+        pass
+
+
+class _ParquetWriter:
+    def __init__(self, path, compression="zstd", **options):
+        import pyarrow.parquet as pq
+
+        self.pq = pq
+        self.path = path
+        self.compression = compression
+        self.writer = None
+        self.schema = None
+
+    def write(self, df):
+        import pyarrow as pa
+
+        # 每批写为一个 row group，读取时可按 row group 分段读取
+        table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+        if self.writer is None:
+            self.schema = table.schema
+            self.writer = self.pq.ParquetWriter(self.path, self.schema, compression=self.compression)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+# 流式输出格式：格式名 -> 写入类（write(df) 追加一批，close() 结束）
+STREAM_WRITERS = {
+    "csv": _CsvWriter,
+    "parquet": _ParquetWriter,
+}
+
+
+def stream_time_series(database_path, output_path, custom_buses=None, custom_loads=None, fmt=None,
+                       chunk_times=CHUNK_TIMES, **options):
+    """
+    以固定内存将时序潮流结果表导出为 CSV 或 Parquet
+
+    输出的列和数值与 export_time_series_power_flow 返回的 DataFrame 相同，
+    适用于全年、分钟级等结果过大而无法一次读入内存的时域计算；文本报告和图表仍由
+    export_time_series_power_flow 生成。
+
+    参数:
+    database_path: 时域潮流结果数据库路径
+    output_path: 输出文件路径
+    custom_buses, custom_loads: 同 export_time_series_power_flow
+    fmt: 'csv' 或 'parquet'，为空时按 output_path 的扩展名确定
+    chunk_times: 每批的时间点数量（Parquet 中每批为一个 row group）
+    options: 传给写入类的参数，例如 parquet 的 compression
+
+    返回:
+    int: 导出的时间点数量
+    """
+    fmt = fmt or os.path.splitext(output_path)[1].lstrip(".").lower()
+    if fmt not in STREAM_WRITERS:
+        raise ValueError(f"Unsupported output format: {fmt} (supported: {', '.join(STREAM_WRITERS)})")
+
+    writer = STREAM_WRITERS[fmt](output_path, **options)
+    count = 0
+    try:
+        for chunk in iter_time_series(database_path, custom_buses, custom_loads, chunk_times):
+            writer.write(chunk)
+            count += len(chunk)
+    finally:
+        writer.close()
+    print(f"时序潮流结果已流式导出到 {output_path}（{count} 个时间点）")
+    return count
@@ -0,0 +1,144 @@
+"""
+   Vectorized analytics for unbalanced (three-phase) load flow results
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.result_reader import read_result_table
+
+PHASES = ("A", "B", "C")
+# 正序旋转因子 a = 1∠120°
+ROTATOR = np.exp(2j * np.pi / 3)
+# 将 B、C 相角度折算到 A 相参考方向的偏移量（度）
+PHASE_SHIFT = np.array([[0.0], [120.0], [-120.0]])
+
+BUS_TABLE = "IBusLF3PH"
+BUS_FILTER = "NomlkV > 0"
+
+
+def load_phase_table(source, table, id_field, mag_prefix, ang_prefix, extra_fields=(), where=None, params=()):
+    """
+    单次查询读取三相结果表，返回各相幅值、角度矩阵
+
+    参数:
+    source: 结果数据库路径或已打开的 sqlite3 连接
+    table: 表名，例如 'IBusLF3PH' 或支路三相结果表
+    id_field: 元件ID字段，例如 'IDBus'
+    mag_prefix, ang_prefix: 幅值、角度字段前缀，字段名为前缀加相别，例如 'VMag' -> VMagA/VMagB/VMagC
+    extra_fields: 需要一并读取的其他字段
+    where, params: 筛选条件及其参数
+
+    返回:
+    (ids, mag, ang, extra)：mag、ang 为 3 x n 的 float64 数组（NULL 为 NaN），extra 为 字段名 -> 数组
+    """
+    mag_fields = [mag_prefix + phase for phase in PHASES]
+    ang_fields = [ang_prefix + phase for phase in PHASES]
+    extra_fields = list(extra_fields)
+    columns = read_result_table(source, table, [id_field, *extra_fields, *mag_fields, *ang_fields], where, params)
+    mag = np.vstack([columns[field].astype(np.float64) for field in mag_fields])
+    ang = np.vstack([columns[field].astype(np.float64) for field in ang_fields])
+    return columns[id_field], mag, ang, {field: columns[field] for field in extra_fields}
+
+
+def sequence_components(mag, ang):
+    """
+    计算对称分量
+
+    参数:
+    mag, ang: 3 x n 的幅值、角度（度）数组，行依次为 A、B、C 相
+
+    返回:
+    (零序, 正序, 负序) 复数数组
+    """
+    va, vb, vc = mag * np.exp(1j * np.deg2rad(ang))
+    zero = (va + vb + vc) / 3
+    positive = (va + ROTATOR * vb + ROTATOR ** 2 * vc) / 3
+    negative = (va + ROTATOR ** 2 * vb + ROTATOR * vc) / 3
+    return zero, positive, negative
+
+
+def mean_angle(ang):
+    """
+    三相角度的平均值（以 A 相为参考）
+
+    B、C 相先折算到 A 相方向（+120°、-120°）再取圆周平均，
+    平衡时等于 (VAngA + VAngB + VAngC) / 3，且不受 ±180° 折返的影响。
+    """
+    return np.rad2deg(np.angle(np.exp(1j * np.deg2rad(ang + PHASE_SHIFT)).sum(axis=0)))
+
+
+def phase_summary(mag, ang, scale=1.0):
+    """
+    对全部元件同时计算三相统计量
+
+    参数:
+    mag, ang: 3 x n 的幅值、角度（度）数组
+    scale: 幅值换算系数，例如百分数转换为标幺值时取 0.01
+
+    返回:
+    dict: mag_avg、mag_min、mag_max、ang_avg、seq0、seq1、seq2（幅值）及 unbalance（负序/正序，%）
+    """
+    mag = mag * scale
+    zero, positive, negative = sequence_components(mag, ang)
+    seq1 = np.abs(positive)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        unbalance = np.where(seq1 > 0, np.abs(negative) / seq1 * 100, np.nan)
+    return {
+        "mag_avg": mag.mean(axis=0),
+        "mag_min": mag.min(axis=0),
+        "mag_max": mag.max(axis=0),
+        "ang_avg": mean_angle(ang),
+        "seq0": np.abs(zero),
+        "seq1": seq1,
+        "seq2": np.abs(negative),
+        "unbalance": unbalance,
+    }
+
+
+def bus_unbalance(source, where=BUS_FILTER, params=()):
+    """
+    计算全部母线的三相电压统计量
+
+    参数:
+    source: 不平衡潮流结果数据库路径或已打开的 sqlite3 连接
+    where: 母线筛选条件，默认只取额定电压大于0的母线
+
+    返回:
+    pandas.DataFrame: bus_ID、NomlkV、volt_mag、volt_ang（三相平均）、volt_min、volt_max（各相最低/最高），
+                      V0、V1、V2（对称分量幅值）、VUF（电压不平衡度，%），电压均为标幺值
+    """
+    ids, mag, ang, extra = load_phase_table(source, BUS_TABLE, "IDBus", "VMag", "VAng", ["NomlkV"], where, params)
+    summary = phase_summary(mag, ang, scale=0.01)
+    return pd.DataFrame({
+        "bus_ID": ids,
+        "NomlkV": extra["NomlkV"],
+        "volt_mag": summary["mag_avg"],
+        "volt_ang": summary["ang_avg"],
+        "volt_min": summary["mag_min"],
+        "volt_max": summary["mag_max"],
+        "V0": summary["seq0"],
+        "V1": summary["seq1"],
+        "V2": summary["seq2"],
+        "VUF": summary["unbalance"],
+    })
+
+
+def branch_unbalance(source, table, id_field, mag_prefix, ang_prefix, extra_fields=(), where=None, params=()):
+    """
+    计算支路三相结果（电流、功率等）的统计量
+
+    支路三相结果表的名称和字段因 ETAP 版本而异，由调用方给出，字段按 PRAGMA table_info 校验。
+
+    参数:
+    source: 不平衡潮流结果数据库路径或已打开的 sqlite3 连接
+    table: 支路三相结果表名
+    id_field: 支路ID字段
+    mag_prefix, ang_prefix: 幅值、角度字段前缀（字段名为前缀加 A/B/C）
+    extra_fields: 一并输出的其他字段
+
+    返回:
+    pandas.DataFrame: ID、extra_fields 以及 phase_summary 中的各列，unbalance 为负序与正序幅值之比（%）
+    """
+    ids, mag, ang, extra = load_phase_table(source, table, id_field, mag_prefix, ang_prefix, extra_fields, where, params)
+    return pd.DataFrame({"ID": ids, **extra, **phase_summary(mag, ang)})
@@ -0,0 +1,32 @@
+"""
+   Shared secret for the warm ETAP worker and its clients (standard library only)
+"""
+
+import os
+
+from configuration.configuration import worker_authkey_env, worker_authkey_file
+
+# 认证密钥的最小长度（字节）
+MIN_KEY_BYTES = 16
+
+
+def load_authkey(env=worker_authkey_env, path=worker_authkey_file):
+    """
+    读取 etap_worker.py 与 etap_job.py 共用的认证密钥
+
+    优先读取环境变量 env，其次读取文件 path（不纳入版本管理）。工作进程会反序列化收到的任务，
+    没有密钥或密钥过短时拒绝启动，避免本机其他用户提交任意对象。
+
+    返回:
+    bytes: 密钥；未配置密钥或密钥过短时抛出 RuntimeError
+    """
+    key = os.environ.get(env, "").strip()
+    if not key and os.path.isfile(path):
+        with open(path, "r", encoding="utf-8") as f:
+            key = f.read().strip()
+    if not key:
+        raise RuntimeError(f"No worker key configured: set {env} or write a random key to {path}, e.g. "
+                           f"python -c \"import secrets; print(secrets.token_hex(32))\" > {path}")
+    if len(key.encode("utf-8")) < MIN_KEY_BYTES:
+        raise RuntimeError(f"Worker key too short, use at least {MIN_KEY_BYTES} characters")
+    return key.encode("utf-8")
@@ -0,0 +1,113 @@
+"""
+   Incremental parsing helpers for large ETAP XML responses
+"""
+
+import xml.etree.ElementTree as ET
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def _iter_chunks(source, chunk_size):
+    """将XML字符串或文件对象切分为固定大小的数据块"""
+    if isinstance(source, (str, bytes)):
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start + chunk_size]
+    else:
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def iter_element_attribs(source, tag, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    增量解析XML，逐个产出指定标签元素的属性字典
+
+    已处理完的节点会立即从其父节点上移除，因此内存占用只与单个元素的大小有关，
+    而与整个响应的大小无关。
+
+    参数:
+    source: XML字符串/bytes，或以 read() 方式读取的文件对象
+    tag: 需要提取的元素标签，例如 'INVERTER'
+    chunk_size: 每次送入解析器的数据块大小
+
+    返回:
+    生成器，每次产出一个元素的属性字典
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack = []
+    open_targets = 0
+
+    def _drain():
+        nonlocal open_targets
+        for event, elem in parser.read_events():
+            if event == "start":
+                stack.append(elem)
+                if elem.tag == tag:
+                    open_targets += 1
+                continue
+
+            stack.pop()
+            if elem.tag == tag:
+                open_targets -= 1
+                yield elem.attrib
+            # 目标元素之外的节点处理完即丢弃，目标元素的子节点随目标元素一起释放
+            if stack and open_targets == 0:
+                stack[-1].remove(elem)
+
+    for chunk in _iter_chunks(source, chunk_size):
+        parser.feed(chunk)
+        yield from _drain()
+    parser.close()
+    yield from _drain()
+
+
+def iter_child_attribs(source, parent_tag, tags=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    增量解析XML，逐个产出指定父节点下直接子元素的标签和属性字典
+
+    用于单次遍历 PDE 文件中 <COMPONENTS> 下的全部元件；子元素处理完即从树中移除，
+    与父节点无关的其他节点（如 <CONNECTIONS>）也会在解析完成后立即丢弃。
+
+    参数:
+    source: XML字符串/bytes，或以 read() 方式读取的文件对象
+    parent_tag: 父节点标签，例如 'COMPONENTS'
+    tags: 需要产出的子元素标签集合，为空时产出全部子元素
+    chunk_size: 每次送入解析器的数据块大小
+
+    返回:
+    生成器，每次产出 (标签, 属性字典)
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack = []
+    open_parents = 0
+
+    def _drain():
+        nonlocal open_parents
+        for event, elem in parser.read_events():
+            if event == "start":
+                stack.append(elem)
+                if elem.tag == parent_tag:
+                    open_parents += 1
+                continue
+
+            stack.pop()
+            if elem.tag == parent_tag:
+                open_parents -= 1
+            if not stack:
+                continue
+            parent = stack[-1]
+            if parent.tag == parent_tag:
+                if tags is None or elem.tag in tags:
+                    yield elem.tag, elem.attrib
+                parent.remove(elem)
+            elif open_parents == 0:
+                # 父节点之外的节点解析完即丢弃；子元素内部的节点随子元素一起释放
+                parent.remove(elem)
+
+    for chunk in _iter_chunks(source, chunk_size):
+        parser.feed(chunk)
+        yield from _drain()
+    parser.close()
+    yield from _drain()
@@ -0,0 +1,170 @@
+import json
+import sqlite3
+
+import pytest
+
+import dc_element_output
+import model_validate
+import runtdpf
+from src import export_result
+
+
+class FakeProjectData:
+    """etap.projectdata 的替身：elements 为 元件类型 -> getallelementdata 的 XML，props 为属性值"""
+
+    def __init__(self):
+        self.elements = {}
+        self.props = {}
+        self.writes = []
+
+    def getallelementdata(self, elementType):
+        return self.elements.get(elementType, "")
+
+    def getelementprop(self, elementType, elementName, fieldName):
+        return self.props.get((elementType, elementName, fieldName), "")
+
+    def setelementprop(self, elementType, elementName, fieldName, value):
+        self.props[(elementType, elementName, fieldName)] = value
+        self.writes.append((elementType, elementName, fieldName, value))
+
+
+class FakeApplication:
+    """etap.application 的替身，alive 为 False 时 ping() 失败（DataHub 无响应）"""
+
+    def __init__(self, project_file):
+        self.project_file = project_file
+        self.alive = True
+
+    def filepaths(self):
+        return json.dumps({"ProjectFile": self.project_file})
+
+    def pid(self):
+        return "1234"
+
+    def ping(self):
+        if not self.alive:
+            raise ConnectionError("DataHub not responding")
+        return "pong"
+
+
+class FakeStudies:
+    """etap.studies 的替身：记录每次计算的参数，返回 reports 中对应的结果路径"""
+
+    def __init__(self):
+        self.calls = []
+        self.reports = {"runLF": "lf.sl", "runULF": "ulf.sl", "runSC": "sc.sl", "runTDLF": "tdlf.tdl"}
+
+    def _run(self, study, args):
+        self.calls.append((study, args))
+        return json.dumps({"ReportPath": self.reports[study]})
+
+    def runLF(self, *args):
+        return self._run("runLF", args)
+
+    def runULF(self, *args):
+        return self._run("runULF", args)
+
+    def runSC(self, *args):
+        return self._run("runSC", args)
+
+    def runTDLF(self, *args):
+        return self._run("runTDLF", args)
+
+
+class FakeDataHub:
+    """src.datahub_client.connect() 返回的客户端的替身"""
+
+    def __init__(self, project_file):
+        self.application = FakeApplication(project_file)
+        self.projectdata = FakeProjectData()
+        self.studies = FakeStudies()
+
+
+@pytest.fixture
+def datahub(tmp_path, monkeypatch):
+    """
+    替换各脚本的 connect()，返回共用的 FakeDataHub
+
+    项目文件 tmp_path/project.OTI 真实存在，结果缓存可以计算项目指纹。
+    """
+    project_file = tmp_path / "project.OTI"
+    project_file.write_bytes(b"project")
+    hub = FakeDataHub(str(project_file))
+    for module in (dc_element_output, model_validate, runtdpf):
+        monkeypatch.setattr(module, "connect", lambda base_address, **options: hub)
+    return hub
+
+
+def make_tdlf_db(path, times=6, buses=("Bus1", "Bus2", "Bus3"), loads=("Load1", "Load2"), missing=()):
+    """
+    创建结构与 ETAP 时域潮流结果数据库相同的小型数据库
+
+    参数:
+    path: 数据库路径
+    times: 时间点数量，间隔 15 分钟
+    buses, loads: 母线和负荷名称
+    missing: 不写入结果的 (元件名称, 时间点序号)
+
+    返回:
+    str: 数据库路径
+    """
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE TDTimeID (TimeID INTEGER, ResultID INTEGER, Time TEXT);
+        CREATE TABLE TDSysResult (ResultID INTEGER, TotalLoadMWPhA REAL, TotalLoadMWPhB REAL,
+            TotalLoadMWPhC REAL, MWLossPhA REAL, MWLossPhB REAL, MWLossPhC REAL, MinLNBusVPhA REAL,
+            MinLNBusVDeviceID TEXT, MaxBranchLoadingPhA REAL, MaxBranchLoadingDeviceID TEXT);
+        CREATE TABLE TDBusInfo (BusName TEXT, BusIID INTEGER);
+        CREATE TABLE TDBusResult (ResultID INTEGER, BusIID INTEGER, VPhA REAL, AngPhA REAL);
+        CREATE TABLE TDOneTermDevicesInfo (DeviceName TEXT, DeviceIID INTEGER);
+        CREATE TABLE TDSourceandLoadResult (ResultID INTEGER, DeviceIID INTEGER, TotalMWPhA REAL,
+            TotalMvarPhA REAL, AmpPhA REAL);
+        CREATE TABLE TDAlert (DeviceID TEXT, Condition TEXT, AlertType TEXT);
+        CREATE TABLE TDActions (Time TEXT, DeviceType TEXT, DeviceID TEXT, Action TEXT, ActionPercent REAL);
+    """)
+    # ResultID 与 TimeID 顺序不同，检查按 ResultID 对齐
+    for index in range(times):
+        result_id = 100 + times - index
+        minutes = index * 15
+        conn.execute("INSERT INTO TDTimeID VALUES (?, ?, ?)",
+                     (index + 1, result_id, f"01-01-2024 {minutes // 60:02d}:{minutes % 60:02d}:00.000"))
+        conn.execute("INSERT INTO TDSysResult VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                     (result_id, 1.0 + index, 1.0, 1.0, 0.1, 0.1, 0.1 * index, 95.0 - index, buses[0],
+                      80.0 + index, "Line1"))
+        for position, name in enumerate(buses):
+            if (name, index) not in missing:
+                conn.execute("INSERT INTO TDBusResult VALUES (?, ?, ?, ?)",
+                             (result_id, 10 + position, 100.0 - position - index * 0.5, -position - index * 0.1))
+        for position, name in enumerate(loads):
+            if (name, index) not in missing:
+                conn.execute("INSERT INTO TDSourceandLoadResult VALUES (?, ?, ?, ?, ?)",
+                             (result_id, 20 + position, 0.5 * (position + 1) + 0.1 * index,
+                              0.2 * (position + 1), 10.0 + index))
+    conn.executemany("INSERT INTO TDBusInfo VALUES (?, ?)", [(name, 10 + i) for i, name in enumerate(buses)])
+    conn.executemany("INSERT INTO TDOneTermDevicesInfo VALUES (?, ?)",
+                     [(name, 20 + i) for i, name in enumerate(loads)])
+    conn.executemany("INSERT INTO TDAlert VALUES (?, 'Under Voltage', 'Critical')", [(name,) for name in buses[:2]])
+    conn.execute("INSERT INTO TDActions VALUES ('01-01-2024 00:30:00.000', 'Load', 'Load_1', 'Switch', 100)")
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+@pytest.fixture
+def tdlf_db(tmp_path):
+    """带一个缺失母线结果的时域潮流结果数据库"""
+    return make_tdlf_db(tmp_path / "tdlf.tdl", missing=[("Bus2", 3)])
+
+
+@pytest.fixture
+def export_tdlf(tdlf_db, tmp_path, monkeypatch):
+    """在 tmp_path 中运行 export_time_series_power_flow（不绘图），返回结果表；报告为 tmp_path/report.txt"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(export_result, "render_figures",
+                        lambda specs, **options: {spec["filename"]: "rendered" for spec in specs})
+
+    def run(**options):
+        return export_result.export_time_series_power_flow(tdlf_db, str(tmp_path / "report.txt"),
+                                                           render_cache=None, **options)
+
+    return run
@@ -2,17 +2,17 @@
     Create the single line diagram using command lines
 """
 
-import etap.api
 import json
-import etap
 
 
-from configuration.configuration import base_address
+from configuration.configuration import base_address, revision_name, config_name
+from src.datahub_client import connect
+from src.response_cache import CachedETAPClient, ResponseCache
 
 
 ## Step 0: Test the connection
 print("Connecting...")
-e = etap.api.connect(base_address)
+e = connect(base_address)
 response = e.application.filepaths()
 print(response)
 
@@ -23,6 +23,8 @@ print("Pinging...")
 ping_result = e.application.ping()
 print(str(ping_result))
 
+# repeated reads are served from the local response cache
+e = CachedETAPClient(e, ResponseCache(), revision_name, config_name)
 response = e.projectdata.setelementprop("UTIL","U10","Bus","B10")
 response = e.projectdata.getelementprop("UTIL","U10","Bus")
 print(response)
\ No newline at end of file
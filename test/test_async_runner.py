@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import model_validate
+import runtdpf
+from src.async_runner import AsyncStudyRunner
+from src.result_cache import StudyResultCache
+
+
+class _Session:
+    """假的 DataHub 会话：run_power_flow 耗时 delay 秒，记录同时运行的计算数"""
+
+    def __init__(self, name, delay=0.1):
+        self.name = name
+        self.delay = delay
+        self.runs = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def run_power_flow(self, *args):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        self.path_result = f"{self.name}-{len(self.runs)}.sl"
+        self.runs.append(args)
+        with self.lock:
+            self.active -= 1
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_schedules_across_hubs():
+    sessions = [_Session("a"), _Session("b")]
+
+    async def main():
+        async with AsyncStudyRunner(sessions) as runner:
+            start = time.perf_counter()
+            results = await asyncio.gather(*[runner.run_power_flow(case, 0, 0, 0, 0, 0, postprocess=str.upper)
+                                             for case in range(4)])
+            return results, time.perf_counter() - start
+
+    results, elapsed = _run(main())
+    assert [len(session.runs) for session in sessions] == [2, 2]
+    assert all(session.max_active == 1 for session in sessions)
+    assert elapsed < 0.35
+    assert all(result == path.upper() for path, result in results)
+
+
+def test_timeout_keeps_session_busy():
+    session = _Session("a", delay=0.3)
+
+    async def main():
+        async with AsyncStudyRunner([session]) as runner:
+            with pytest.raises(asyncio.TimeoutError):
+                await runner.run_power_flow(1, 0, 0, 0, 0, 0, timeout=0.05)
+            # 超时的计算仍在进行，下一个计算要等它结束后才开始
+            start = time.perf_counter()
+            await runner.run_power_flow(2, 0, 0, 0, 0, 0)
+            return time.perf_counter() - start
+
+    elapsed = _run(main())
+    assert elapsed >= 0.5
+    assert session.max_active == 1
+    assert [args[0] for args in session.runs] == [1, 2]
+
+
+def test_cancel():
+    session = _Session("a", delay=0.2)
+
+    async def main():
+        async with AsyncStudyRunner([session]) as runner:
+            task = asyncio.ensure_future(runner.run_power_flow(1, 0, 0, 0, 0, 0))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return await runner.run_power_flow(2, 0, 0, 0, 0, 0)
+
+    path, _ = _run(main())
+    assert path == "a-1.sl"
+    assert session.max_active == 1
+
+
+def test_routes_through_main(datahub, monkeypatch):
+    released = []
+    monkeypatch.setattr(runtdpf, "release", released.append)
+    main = runtdpf.Main("http://datahub")
+    main.path_result = "old.tdl"
+    main.change_parameters("LUMPEDLOAD", "Lump1", "MVA", "40")
+
+    async def run():
+        async with AsyncStudyRunner([main]) as runner:
+            return await runner.run_time_domain_load_flow(0, 0, 0, 0, 0, 0, 0, 0)
+
+    path, _ = _run(run())
+    assert path == "tdlf.tdl"
+    assert released == ["old.tdl"]
+    assert datahub.projectdata.writes == [("LUMPEDLOAD", "Lump1", "MVA", "40")]
+
+
+def test_cache_hit_skips_postprocess(datahub, tmp_path):
+    cache = StudyResultCache(str(tmp_path / "cache"))
+    main = model_validate.Main("http://datahub", result_cache=cache)
+    main.change_parameters("LUMPEDLOAD", "Lump1", "MVA", "40")
+    report = pd.DataFrame({"bus_ID": ["Bus1"], "volt_mag": [0.98]})
+    key = cache.scenario_key(main.overrides, "runLF", "Base", "Normal", "LF", main.fingerprint)
+    cache.put(key, report, None)
+    calls = []
+
+    async def run():
+        async with AsyncStudyRunner([main]) as runner:
+            return await runner.run_power_flow("Base", "Normal", "LF", 0, 0, 0, postprocess=calls.append)
+
+    path, result = _run(run())
+    # 命中缓存：不运行计算、不调用后处理，返回缓存的结果表副本
+    assert path is None
+    assert calls == []
+    assert datahub.studies.calls == []
+    assert result.equals(report)
+    assert result is not main.cached_report
+    cache.close()
@@ -0,0 +1,51 @@
+import pytest
+
+from src.change_set import ChangeSet
+
+
+class _ProjectData:
+    """记录写入的 projectdata 替身，fail 中的属性写入时抛出异常"""
+
+    def __init__(self, fail=()):
+        self.props = {}
+        self.fail = set(fail)
+        self.writes = []
+
+    def getelementprop(self, elementType, elementName, fieldName):
+        return self.props.get((elementType, elementName, fieldName), "0")
+
+    def setelementprop(self, elementType, elementName, fieldName, value):
+        key = (elementType, elementName, fieldName)
+        if key in self.fail:
+            raise ConnectionError("DataHub unavailable")
+        self.writes.append(key)
+        self.props[key] = value
+
+
+def test_commit_skips_unchanged():
+    projectdata = _ProjectData()
+    changes = ChangeSet(projectdata)
+    changes.stage("LUMPEDLOAD", "Lump1", "MVA", "40")
+    changes.stage("LUMPEDLOAD", "Lump1", "MVA", "50")
+    changes.stage("XLINE", "Line2", "Length", "0")
+    assert changes.commit() == 1
+    assert projectdata.props == {("LUMPEDLOAD", "Lump1", "MVA"): "50"}
+    assert changes.pending == {}
+
+
+def test_failed_write_keeps_pending():
+    projectdata = _ProjectData(fail=[("XLINE", "Line2", "Length")])
+    changes = ChangeSet(projectdata)
+    changes.stage("LUMPEDLOAD", "Lump1", "MVA", "40")
+    changes.stage("XLINE", "Line2", "Length", "1.5")
+    changes.stage("STLOAD", "Load4", "KVA", "30")
+    with pytest.raises(RuntimeError, match="XLINE.Line2.Length"):
+        changes.commit()
+    assert list(changes.pending) == [("XLINE", "Line2", "Length"), ("STLOAD", "Load4", "KVA")]
+    assert changes.stats["written"] == 1
+
+    projectdata.fail.clear()
+    assert changes.commit() == 2
+    assert changes.pending == {}
+    assert changes.restore() == 3
+    assert set(projectdata.props.values()) == {"0"}
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.chart_render import downsample, lttb, minmax, render_figures
+
+
+@pytest.mark.parametrize("select", [lttb, minmax])
+def test_downsamplers_keep_endpoints(select):
+    x = np.arange(1000, dtype=np.float64)
+    y = np.sin(x / 20)
+    y[500] = 10.0
+    index = select(x, y, 100)
+    assert index[0] == 0 and index[-1] == 999
+    assert len(index) <= 100
+    assert np.all(np.diff(index) > 0)
+    # 尖峰所在的点被保留
+    assert 500 in index
+
+
+def test_downsample_keeps_nan_gaps():
+    x = np.arange("2024-01-01T00:00", 3000, dtype="datetime64[m]")
+    y = np.linspace(0.0, 1.0, 3000)
+    y[1000:1200] = np.nan
+    xs, ys = downsample(x, y, max_points=300)
+
+    assert len(ys) <= 305
+    assert xs[0] == x[0] and ys[0] == y[0]
+    assert xs[-1] == x[-1] and ys[-1] == y[-1]
+    # 两个有效数据段之间只保留一个 NaN 断点，两段各自的端点都在
+    assert np.isnan(ys).sum() == 1
+    gap = int(np.flatnonzero(np.isnan(ys))[0])
+    assert xs[gap - 1] == x[999] and xs[gap] == x[1000] and xs[gap + 1] == x[1200]
+
+
+def test_downsample_short_series_unchanged():
+    x = np.arange(10)
+    y = np.arange(10, dtype=np.float64)
+    xs, ys = downsample(x, y, max_points=100)
+    assert xs is x
+    np.testing.assert_array_equal(ys, y)
+
+
+def _spec(path, offset=0.0):
+    return {"filename": str(path), "figsize": (2, 1), "dpi": 30,
+            "axes": [{"lines": [{"x": np.arange(50), "y": np.arange(50) + offset, "label": "V"}], "title": "T"}]}
+
+
+def test_render_cache_hit(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    first = tmp_path / "a.png"
+    assert render_figures([_spec(first)], max_workers=1, cache_dir=cache_dir) == {str(first): "rendered"}
+    png = first.read_bytes()
+    assert png.startswith(b"\x89PNG")
+
+    os.remove(first)
+    second = tmp_path / "b.png"
+    status = render_figures([_spec(first), _spec(second, offset=1.0)], max_workers=1, cache_dir=cache_dir)
+    assert status == {str(first): "cached", str(second): "rendered"}
+    assert first.read_bytes() == png
+
+    # 不使用缓存时总是重新绘制
+    assert render_figures([_spec(first)], max_workers=1, cache_dir=None) == {str(first): "rendered"}
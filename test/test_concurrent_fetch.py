@@ -0,0 +1,73 @@
+import os
+import threading
+import time
+
+import pandas as pd
+
+from dc_element_output import ETAPExporter
+from test.conftest import FakeProjectData
+
+RESPONSES = {
+    "BUS": '<ELEMENTS><BUS ID="Bus1" NominalkV="11"/><BUS ID="Bus2" NominalkV="0.4"/></ELEMENTS>',
+    "CAPACITOR": '<ELEMENTS><CAPACITOR ID="Cap1" KV="11"/></ELEMENTS>',
+    "SYNGEN": '<ELEMENTS><SYNGEN ID="Gen1" KV="11"/></ELEMENTS>',
+    "INDMOTOR": '<ELEMENTS><INDMOTOR ID="Mtr1" KV="0.4"/></ELEMENTS>',
+}
+
+
+class SlowProjectData(FakeProjectData):
+    """每次请求耗时 delay 秒，记录同时进行的最大请求数；failing 中的元件类型请求失败"""
+
+    def __init__(self, delay=0.05, failing=()):
+        super().__init__()
+        self.elements = dict(RESPONSES)
+        self.delay = delay
+        self.failing = set(failing)
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def getallelementdata(self, elementType):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if elementType in self.failing:
+                raise ConnectionError("DataHub request failed")
+            return super().getallelementdata(elementType)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def _export(datahub, output_path, **options):
+    exporter = ETAPExporter("http://datahub", output_format="csv.gz", output_path=output_path)
+    exporter.export_all_elements(list(RESPONSES), **options)
+    tables = {name[:-len(".csv.gz")]: pd.read_csv(os.path.join(output_path, name))
+              for name in sorted(os.listdir(output_path))}
+    return exporter, tables
+
+
+def test_concurrent_matches_serial(datahub, tmp_path):
+    datahub.projectdata = SlowProjectData()
+    _, serial = _export(datahub, str(tmp_path / "serial"))
+    assert datahub.projectdata.peak == 1
+
+    exporter, concurrent = _export(datahub, str(tmp_path / "concurrent"), concurrent=True, max_workers=2)
+    assert datahub.projectdata.peak == 2
+    assert list(concurrent) == list(serial)
+    for name in serial:
+        pd.testing.assert_frame_equal(concurrent[name], serial[name])
+    assert sorted(exporter.timings) == sorted(RESPONSES)
+    assert all(timing["fetch"] >= 0.05 for timing in exporter.timings.values())
+
+
+def test_concurrent_request_failure_skipped(datahub, tmp_path, capsys):
+    datahub.projectdata = SlowProjectData(delay=0.0, failing={"CAPACITOR"})
+    exporter, tables = _export(datahub, str(tmp_path / "out"), concurrent=True, max_workers=4)
+    assert sorted(tables) == ["BUS", "INDMOTOR", "SYNGEN"]
+    assert tables["BUS"]["IID"].tolist() == ["Bus1", "Bus2"]
+    out = capsys.readouterr().out
+    assert "Error getting CAPACITOR data" in out
+    assert "No data found for CAPACITOR" in out
@@ -0,0 +1,152 @@
+import http.client
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from src import datahub_client
+from src.datahub_client import DataHubClient, connect
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """DataHub 的替身：/ping 立即返回，/slow 延迟 1 秒，/flaky 第一次返回 500；记录每个请求使用的客户端端口"""
+
+    protocol_version = "HTTP/1.1"
+    hits = {}
+    ports = []
+
+    def do_GET(self):
+        self.hits[self.path] = self.hits.get(self.path, 0) + 1
+        self.ports.append(self.client_address[1])
+        if self.path == "/slow":
+            time.sleep(1)
+        if self.path == "/flaky" and self.hits[self.path] == 1:
+            self.send_error(500)
+            return
+        body = b"pong"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Namespace:
+    def __init__(self, session, base_address):
+        self._session = session
+        self._base_address = base_address
+
+    def __getattr__(self, name):
+        def call():
+            response = self._session.get(f"{self._base_address}/{name}")
+            response.raise_for_status()
+            return response.text
+
+        return call
+
+
+class _EtapClient:
+    """与 etap.api 客户端相同的结构，各命名空间共用一个 requests.Session 发往本地 HTTP 服务（不指定超时）"""
+
+    def __init__(self, base_address):
+        self.session = requests.Session()
+        self.application = _Namespace(self.session, base_address)
+        self.projectdata = _Namespace(self.session, base_address)
+        self.studies = _Namespace(self.session, base_address)
+
+
+@pytest.fixture
+def server():
+    _Handler.hits = {}
+    _Handler.ports = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def fake_etap(monkeypatch):
+    api = types.ModuleType("etap.api")
+    api.connect = _EtapClient
+    package = types.ModuleType("etap")
+    package.api = api
+    monkeypatch.setitem(sys.modules, "etap", package)
+    monkeypatch.setitem(sys.modules, "etap.api", api)
+    monkeypatch.setattr(datahub_client, "_clients", {})
+    monkeypatch.setattr(datahub_client, "_connections", {})
+
+
+def _client_threads():
+    # 本地服务为每个请求启动的处理线程不计入
+    return [thread for thread in threading.enumerate() if "process_request" not in thread.name]
+
+
+def test_call(server):
+    client = DataHubClient(_EtapClient(server))
+    assert client.application.ping() == "pong"
+    assert client.metrics["application.ping"]["calls"] == 1
+
+
+def test_keep_alive_pool(server):
+    client = DataHubClient(_EtapClient(server))
+    for _ in range(5):
+        client.projectdata.ping()
+    # 五次调用复用同一个连接
+    assert len(set(_Handler.ports)) == 1
+    assert client.sessions == [client._etap.session]
+
+
+def test_transport_not_patched_globally(server):
+    connect_method = http.client.HTTPConnection.connect
+    send = requests.adapters.HTTPAdapter.send
+    DataHubClient(_EtapClient(server), timeouts={"application": 0.2})
+    assert http.client.HTTPConnection.connect is connect_method
+    assert requests.adapters.HTTPAdapter.send is send
+    # 其他会话发出的请求不受 DataHub 超时影响
+    with datahub_client._transport_timeout(0.2):
+        assert requests.Session().get(f"{server}/slow").text == "pong"
+
+
+def test_timeout_without_threads(server):
+    client = DataHubClient(_EtapClient(server), timeouts={"application": 0.2}, retries=0)
+    threads = _client_threads()
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        client.application.slow()
+    assert time.perf_counter() - start < 0.9
+    assert _client_threads() == threads
+    # 超时只作用于 DataHub 调用，不限时的命名空间等待响应
+    assert client.studies.slow() == "pong"
+
+
+def test_retry_idempotent(server):
+    client = DataHubClient(_EtapClient(server), backoff=0.01)
+    assert client.application.flaky() == "pong"
+    assert client.metrics["application.flaky"]["retries"] == 1
+
+
+def test_no_retry_for_writes(server):
+    client = DataHubClient(_EtapClient(server), backoff=0.01)
+    with pytest.raises(Exception):
+        client.projectdata.flaky()
+    assert _Handler.hits["/flaky"] == 1
+
+
+def test_connect_keys_on_options(server, fake_etap):
+    default = connect(server)
+    assert connect(server) is default
+    fast = connect(server, timeouts={"application": 0.2}, retries=0)
+    assert fast is not default
+    assert fast.timeouts["application"] == 0.2
+    assert connect(server, retries=0, timeouts={"application": 0.2}) is fast
+    assert fast._etap is default._etap
@@ -0,0 +1,21 @@
+import pandas as pd
+
+from src.element_dtypes import coerce_frame
+
+
+def test_non_integral_values_reported():
+    df = pd.DataFrame({"IID": ["B1", "B2", "B3", "B4"], "Cells": ["3", "3.5", "", "abc"],
+                       "Strings": ["1", "2", "3", "4"]})
+    typed, report = coerce_frame(df, "BATTERY", {"Cells": "Int32", "Strings": "Int32"})
+    assert str(typed["Cells"].dtype) == "Int32"
+    assert typed["Cells"].tolist() == [3, pd.NA, pd.NA, pd.NA]
+    assert typed["Strings"].tolist() == [1, 2, 3, 4]
+    assert report["IID"].tolist() == ["B2", "B4"]
+    assert report["Value"].tolist() == ["3.5", "abc"]
+
+
+def test_out_of_range_integer_reported():
+    df = pd.DataFrame({"IID": ["B1", "B2"], "Cells": ["1e12", "2.0"]})
+    typed, report = coerce_frame(df, "BATTERY", {"Cells": "Int32"})
+    assert typed["Cells"].tolist() == [pd.NA, 2]
+    assert report["Value"].tolist() == ["1e12"]
@@ -0,0 +1,42 @@
+import pandas as pd
+
+from src.element_dtypes import coerce_frame
+from src.element_extract import build_element_frame
+from src.element_schema import ELEMENT_SCHEMAS, get_schema
+from src.pde_source import read_pde_columns
+
+
+def test_undeclared_type_extracts_all_attributes():
+    assert "SYNGEN" not in ELEMENT_SCHEMAS
+    records = [
+        {"ID": "Gen1", "InService": "true", "InServiceState": "0", "KV": "13.8", "MW": "10"},
+        {"ID": "Gen2", "InService": "false", "InServiceState": "0", "KV": "13.8", "PF": "0.85"},
+    ]
+    df = build_element_frame(records, "SYNGEN")
+    assert list(df.columns) == ["ID", "IID", "InService", "STATE", "KV", "MW", "PF"]
+    assert df["MW"].iloc[0] == "10" and pd.isna(df["MW"].iloc[1])
+    assert pd.isna(df["PF"].iloc[0]) and df["PF"].iloc[1] == "0.85"
+
+    typed, report = coerce_frame(df, "SYNGEN")
+    assert str(typed["KV"].dtype) == "float64"
+    assert str(typed["InService"].dtype) == "boolean"
+    assert report.empty
+
+
+def test_declared_type_keeps_schema():
+    records = [{"ID": "Bus1", "InService": "true", "InServiceState": "0", "NominalkV": "11", "Extra": "x"}]
+    df = build_element_frame(records, "BUS")
+    assert list(df.columns) == ["ID"] + list(get_schema("BUS"))
+
+
+def test_undeclared_type_from_pde(tmp_path):
+    pde = tmp_path / "project.xml"
+    pde.write_text('<PDE Flat="1"><COMPONENTS>'
+                   '<CAPACITOR ID="Cap1" InService="true" KV="11" Kvar="500"/>'
+                   '<BUS ID="Bus1" NominalkV="11"/>'
+                   '<CAPACITOR ID="Cap2" InService="true" KV="11" Bus="Bus1"/>'
+                   '</COMPONENTS></PDE>', encoding="utf-8")
+    columns = read_pde_columns(str(pde), {"CAPACITOR": get_schema("CAPACITOR")})
+    assert columns["CAPACITOR"]["IID"] == ["Cap1", "Cap2"]
+    assert columns["CAPACITOR"]["Kvar"] == ["500", None]
+    assert columns["CAPACITOR"]["Bus"] == [None, "Bus1"]
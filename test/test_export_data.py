@@ -0,0 +1,55 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from src.export_data import export_report
+
+
+def _ulf_db(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE IBusLF3PH (IDBus TEXT, NomlkV REAL, VMagA REAL, VMagB REAL, VMagC REAL, "
+                 "VAngA REAL, VAngB REAL, VAngC REAL)")
+    conn.executemany("INSERT INTO IBusLF3PH VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+ROWS = [
+    ("Bus1", 11.0, 100.0, 100.0, 100.0, 0.0, -120.0, 120.0),
+    ("Bus2", 0.4, 98.0, 96.0, 97.0, -2.0, -123.0, 118.0),
+    ("Bus3", 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0),
+]
+
+
+def test_export_report_default_columns(tmp_path):
+    result = export_report(_ulf_db(tmp_path / "ulf.sl", ROWS))
+    assert list(result.columns) == ["bus_ID", "volt_mag", "volt_ang"]
+    # 额定电压为 0 的母线被排除
+    assert result["bus_ID"].tolist() == ["Bus1", "Bus2"]
+    np.testing.assert_allclose(result["volt_mag"], [1.0, 0.97])
+    np.testing.assert_allclose(result["volt_ang"], [0.0, -7.0 / 3], atol=1e-3)
+
+
+def test_export_report_details(tmp_path):
+    result = export_report(_ulf_db(tmp_path / "ulf.sl", ROWS), details=True)
+    assert list(result.columns) == ["bus_ID", "NomlkV", "volt_mag", "volt_ang", "volt_min", "volt_max",
+                                    "V0", "V1", "V2", "VUF"]
+    balanced, unbalanced = result.iloc[0], result.iloc[1]
+    assert balanced["V1"] == pytest.approx(1.0)
+    assert balanced["V0"] == pytest.approx(0.0, abs=1e-12)
+    assert balanced["VUF"] == pytest.approx(0.0, abs=1e-10)
+    assert (unbalanced["volt_min"], unbalanced["volt_max"]) == pytest.approx((0.96, 0.98))
+
+    a = np.exp(2j * np.pi / 3)
+    va, vb, vc = np.array([0.98, 0.96, 0.97]) * np.exp(1j * np.deg2rad([-2.0, -123.0, 118.0]))
+    v1 = abs(va + a * vb + a ** 2 * vc) / 3
+    v2 = abs(va + a ** 2 * vb + a * vc) / 3
+    assert unbalanced["V1"] == pytest.approx(v1)
+    assert unbalanced["VUF"] == pytest.approx(v2 / v1 * 100)
+
+
+def test_export_report_no_buses(tmp_path):
+    with pytest.raises(Exception, match="未找到符合条件的数据"):
+        export_report(_ulf_db(tmp_path / "ulf.sl", ROWS[2:]))
@@ -0,0 +1,33 @@
+import pandas as pd
+
+
+def _report(tmp_path):
+    with open(tmp_path / "report.txt", "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_load_statistics_opt_in(export_tdlf, tmp_path):
+    result = export_tdlf(custom_loads=["Load1", "Load2"])
+    assert len(result) == 6
+    assert list(pd.read_excel(tmp_path / "time_series_results.xlsx", sheet_name=None)) == ["Sheet1"]
+    assert "负荷统计" not in _report(tmp_path)
+
+    export_tdlf(custom_loads=["Load1", "Load2"], load_statistics=True)
+    sheets = pd.read_excel(tmp_path / "time_series_results.xlsx", sheet_name=None)
+    assert list(sheets) == ["Sheet1", "Load_Statistics"]
+    assert sheets["Load_Statistics"]["Load"].tolist() == ["Load1", "Load2"]
+    assert "===== 负荷统计 =====" in _report(tmp_path)
+
+
+def test_energy_statistics_opt_in(export_tdlf, tmp_path):
+    export_tdlf(custom_buses=["Bus1"])
+    report = _report(tmp_path)
+    assert "系统电量统计" not in report
+    # 默认报告以事件信息结束
+    assert report.endswith("01-01-2024 00:30:00.000, Load, Load_1, Switch, 100.0\n")
+
+    export_tdlf(custom_buses=["Bus1"], energy_statistics=True)
+    report = _report(tmp_path)
+    assert "===== 系统电量统计 =====" in report
+    # 总负荷 3, 4, ..., 8 MW，每 15 分钟一个点：(3 + 8) / 2 * 1.25 h
+    assert "负荷电量(MWh): 6.8750" in report
@@ -0,0 +1,105 @@
+import json
+import os
+
+import pandas as pd
+
+from dc_element_output import ETAPExporter
+
+
+def _exporter(datahub, responses, output_path, output_format="csv.gz", **options):
+    datahub.projectdata.elements = responses
+    return ETAPExporter("http://datahub", output_format=output_format, output_path=output_path, **options)
+
+
+def _elements(tag, *attrs):
+    items = "".join(f'<{tag} {" ".join(f"{k}={chr(34)}{v}{chr(34)}" for k, v in item.items())}/>' for item in attrs)
+    return f"<ELEMENTS>{items}</ELEMENTS>"
+
+
+def _manifest(state_dir):
+    with open(os.path.join(state_dir, "manifest.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_stale_outputs_removed(datahub, tmp_path):
+    output_path = str(tmp_path / "out")
+    state_dir = str(tmp_path / "state")
+    responses = {
+        "BUS": _elements("BUS", {"ID": "Bus1", "OtiGUID": "g1", "NominalkV": "11"}),
+        "CAPACITOR": _elements("CAPACITOR", {"ID": "Cap1", "OtiGUID": "g2", "KV": "11"}),
+        "SYNGEN": _elements("SYNGEN", {"ID": "Gen1", "OtiGUID": "g3", "KV": "11"}),
+    }
+    _exporter(datahub, responses, output_path).export_incremental(state_dir, ["BUS", "CAPACITOR", "SYNGEN"])
+    assert sorted(os.listdir(output_path)) == ["BUS.csv.gz", "CAPACITOR.csv.gz", "SYNGEN.csv.gz"]
+
+    # 电容器全部删除
+    responses["CAPACITOR"] = "<ELEMENTS />"
+    _exporter(datahub, responses, output_path).export_incremental(state_dir, ["BUS", "CAPACITOR", "SYNGEN"])
+    assert sorted(os.listdir(output_path)) == ["BUS.csv.gz", "SYNGEN.csv.gz"]
+    assert list(_manifest(state_dir)["removed"]) == ["CAPACITOR"]
+
+    # 发电机类型不再导出
+    _exporter(datahub, responses, output_path).export_incremental(state_dir, ["BUS", "CAPACITOR"])
+    assert os.listdir(output_path) == ["BUS.csv.gz"]
+    manifest = _manifest(state_dir)
+    assert list(manifest["removed"]) == ["SYNGEN"]
+    assert "SYNGEN" not in manifest["components"]
+
+
+def test_duplicate_keys_reported(datahub, tmp_path):
+    output_path = str(tmp_path / "out")
+    state_dir = str(tmp_path / "state")
+    responses = {"BUS": _elements("BUS", {"ID": "Bus1", "OtiGUID": "g1", "NominalkV": "11"},
+                                  {"ID": "Bus2", "OtiGUID": "g1", "NominalkV": "0.4"},
+                                  {"ID": "Bus3", "NominalkV": "0.4"},
+                                  {"ID": "Bus3", "NominalkV": "0.69"})}
+    _exporter(datahub, responses, output_path).export_incremental(state_dir, ["BUS"])
+    manifest = _manifest(state_dir)
+    assert manifest["components"]["BUS"]["duplicates"] == ["Bus3", "g1"]
+    assert sorted(manifest["components"]["BUS"]["elements"]) == ["Bus3", "Bus3#2", "g1", "g1#2"]
+
+    bus = pd.read_csv(os.path.join(output_path, "BUS.csv.gz"))
+    assert bus["IID"].tolist() == ["Bus1", "Bus2", "Bus3", "Bus3"]
+    assert bus["NominalkV"].tolist() == [11, 0.4, 0.4, 0.69]
+
+
+def test_output_settings_change_rewrites_all(datahub, tmp_path):
+    output_path = str(tmp_path / "out")
+    state_dir = str(tmp_path / "state")
+    responses = {"BUS": _elements("BUS", {"ID": "Bus1", "OtiGUID": "g1", "NominalkV": "11"}),
+                 "CAPACITOR": _elements("CAPACITOR", {"ID": "Cap1", "OtiGUID": "g2", "KV": "11"})}
+    exporter = _exporter(datahub, responses, output_path, output_format="parquet")
+    exporter.export_incremental(state_dir, ["BUS", "CAPACITOR"])
+    assert sorted(os.listdir(output_path)) == ["BUS.parquet", "CAPACITOR.parquet"]
+
+    # 状态未变，只改变输出格式
+    exporter = _exporter(datahub, responses, output_path, output_format="feather")
+    exporter.export_incremental(state_dir, ["BUS", "CAPACITOR"])
+    assert sorted(os.listdir(output_path)) == ["BUS.feather", "BUS.parquet", "CAPACITOR.feather",
+                                               "CAPACITOR.parquet"]
+    assert _manifest(state_dir)["output"]["output_format"] == "feather"
+
+    # 只改变 typed
+    exporter = _exporter(datahub, responses, output_path, output_format="feather", typed=True)
+    exporter.export_incremental(state_dir, ["BUS", "CAPACITOR"])
+    assert str(pd.read_feather(os.path.join(output_path, "BUS.feather"))["NominalkV"].dtype).startswith("float")
+    assert _manifest(state_dir)["output"]["typed"] is True
+
+
+def test_missing_output_rewritten(datahub, tmp_path, capsys):
+    output_path = str(tmp_path / "out")
+    state_dir = str(tmp_path / "state")
+    responses = {"BUS": _elements("BUS", {"ID": "Bus1", "OtiGUID": "g1", "NominalkV": "11"}),
+                 "CAPACITOR": _elements("CAPACITOR", {"ID": "Cap1", "OtiGUID": "g2", "KV": "11"})}
+    _exporter(datahub, responses, output_path).export_incremental(state_dir, ["BUS", "CAPACITOR"])
+    capacitor_mtime = os.path.getmtime(os.path.join(output_path, "CAPACITOR.csv.gz"))
+
+    os.remove(os.path.join(output_path, "BUS.csv.gz"))
+    _exporter(datahub, responses, output_path).export_incremental(state_dir, ["BUS", "CAPACITOR"])
+    assert sorted(os.listdir(output_path)) == ["BUS.csv.gz", "CAPACITOR.csv.gz"]
+    # 内容未变的元件不重写
+    assert os.path.getmtime(os.path.join(output_path, "CAPACITOR.csv.gz")) == capacitor_mtime
+
+    capsys.readouterr()
+    _exporter(datahub, responses, output_path).export_incremental(state_dir, ["BUS", "CAPACITOR"])
+    assert "No changes since the last export" in capsys.readouterr().out
@@ -0,0 +1,49 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from src.output_backends import load_tables, remove_tables, save_tables, table_path
+
+TABLES = {
+    "BUS": pd.DataFrame({"ID": [1, 2], "IID": ["Bus1", "Bus2"], "NominalkV": [11.0, 0.4]}),
+    "CAPACITOR": pd.DataFrame({"ID": [1], "IID": ["Cap1"], "KV": [11.0]}),
+}
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "feather", "csv.gz"])
+def test_round_trip(tmp_path, fmt):
+    output_path = str(tmp_path / "out")
+    assert save_tables(TABLES, output_path, fmt) == output_path
+    assert os.path.exists(table_path("BUS", output_path, fmt))
+
+    loaded = load_tables(output_path, fmt)
+    assert list(loaded) == ["BUS", "CAPACITOR"]
+    for name, df in TABLES.items():
+        pd.testing.assert_frame_equal(loaded[name], df)
+
+    assert list(load_tables(output_path, fmt, components=["CAPACITOR"])) == ["CAPACITOR"]
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "feather"])
+def test_load_as_arrow(tmp_path, fmt):
+    save_tables(TABLES, str(tmp_path), fmt)
+    table = load_tables(str(tmp_path), fmt, components=["BUS"], as_arrow=True)["BUS"]
+    assert isinstance(table, pa.Table)
+    assert table.column("IID").to_pylist() == ["Bus1", "Bus2"]
+
+
+def test_remove_tables(tmp_path):
+    save_tables(TABLES, str(tmp_path), "parquet")
+    assert remove_tables(["CAPACITOR", "SYNGEN"], str(tmp_path), "parquet") == [
+        table_path("CAPACITOR", str(tmp_path), "parquet")]
+    assert list(load_tables(str(tmp_path), "parquet")) == ["BUS"]
+    assert remove_tables(["BUS"], str(tmp_path / "parameters.xlsx"), "excel") == []
+
+
+def test_unsupported_format(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported output format: hdf5"):
+        save_tables(TABLES, str(tmp_path), "hdf5")
+    with pytest.raises(ValueError):
+        load_tables(str(tmp_path), "json")
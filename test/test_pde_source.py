@@ -0,0 +1,56 @@
+import os
+
+import pandas as pd
+
+from dc_element_output import ETAPExporter
+from src.pde_source import iter_pde_elements, read_pde_columns
+
+PDE = """<?xml version="1.0" encoding="utf-8"?>
+<PDE Flat="1">
+  <COMPONENTS>
+    <BUS ID="Bus1" NominalkV="11" />
+    <CAPACITOR ID="Cap1" KV="11"><RATING KV="0.4" /></CAPACITOR>
+    <BUS ID="Bus2" NominalkV="0.4" />
+    <BUS ID="Bus3" />
+  </COMPONENTS>
+  <CONNECTIONS>
+    <BUS ID="Conn1" NominalkV="99" />
+  </CONNECTIONS>
+</PDE>
+"""
+
+
+def _pde_file(tmp_path):
+    path = tmp_path / "Feeder.xml"
+    path.write_text(PDE, encoding="utf-8")
+    return str(path)
+
+
+def test_iter_pde_elements(tmp_path):
+    pde_file = _pde_file(tmp_path)
+    elements = [(tag, attrs["ID"]) for tag, attrs in iter_pde_elements(pde_file, chunk_size=16)]
+    # 只读取 COMPONENTS 的直接子元素
+    assert elements == [("BUS", "Bus1"), ("CAPACITOR", "Cap1"), ("BUS", "Bus2"), ("BUS", "Bus3")]
+    assert [attrs["ID"] for _, attrs in iter_pde_elements(pde_file, {"CAPACITOR"})] == ["Cap1"]
+
+
+def test_read_pde_columns(tmp_path):
+    columns = read_pde_columns(_pde_file(tmp_path), {"BUS": {"IID": "ID", "NominalkV": "NominalkV"},
+                                                     "SYNGEN": {"IID": "ID"}}, chunk_size=16)
+    assert columns["BUS"] == {"IID": ["Bus1", "Bus2", "Bus3"], "NominalkV": ["11", "0.4", None]}
+    assert columns["SYNGEN"] == {"IID": []}
+
+
+def test_offline_export_matches_datahub(datahub, tmp_path):
+    datahub.projectdata.elements = {
+        "BUS": '<ELEMENTS><BUS ID="Bus1" NominalkV="11"/><BUS ID="Bus2" NominalkV="0.4"/><BUS ID="Bus3"/></ELEMENTS>',
+        "CAPACITOR": '<ELEMENTS><CAPACITOR ID="Cap1" KV="11"/></ELEMENTS>',
+    }
+    ETAPExporter("http://datahub", output_format="csv.gz",
+                 output_path=str(tmp_path / "online")).export_all_elements(["BUS", "CAPACITOR"])
+    ETAPExporter(pde_file=_pde_file(tmp_path), output_format="csv.gz",
+                 output_path=str(tmp_path / "offline")).export_all_elements(["BUS", "CAPACITOR"])
+
+    assert sorted(os.listdir(tmp_path / "offline")) == ["BUS.csv.gz", "CAPACITOR.csv.gz"]
+    for name in ("BUS.csv.gz", "CAPACITOR.csv.gz"):
+        pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "offline" / name), pd.read_csv(tmp_path / "online" / name))
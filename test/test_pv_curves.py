@@ -0,0 +1,51 @@
+import os
+from xml.sax.saxutils import quoteattr
+
+import pandas as pd
+
+from dc_element_output import ETAPExporter
+
+
+def _curve(*points):
+    items = "".join(f'<UserDefPVPoint percentVGenerating="{vg}" percentPGenerating="{pg}" '
+                    f'percentVCharging="{vc}" percentPCharging="{pc}"/>' for vg, pg, vc, pc in points)
+    return f"<UserDefPVPoints>{items}</UserDefPVPoints>"
+
+
+def _inverters(*curves):
+    items = "".join(f'<INVERTER ID="Inv{i}" UserDefPoints={quoteattr(curve)}/>' for i, curve in enumerate(curves, 1))
+    return f"<ELEMENTS>{items}</ELEMENTS>"
+
+
+CURVE_A = _curve((90, 100, 90, 100), (110, 0, 110, 0))
+CURVE_B = _curve((95, 100, 95, 100))
+
+
+def test_identical_curves_share_curve_id(datahub, tmp_path):
+    datahub.projectdata.elements = {"INVERTER": _inverters(CURVE_A, CURVE_B, CURVE_A, CURVE_A, "")}
+    exporter = ETAPExporter("http://datahub", output_format="csv.gz", output_path=str(tmp_path))
+    exporter.export_all_elements(["INVERTER"])
+
+    inverters = pd.read_csv(os.path.join(tmp_path, "INVERTER.csv.gz"))
+    curve_ids = inverters["CurveID"].tolist()
+    assert curve_ids[0] == curve_ids[2] == curve_ids[3]
+    assert curve_ids[0] != curve_ids[1]
+    assert pd.isna(curve_ids[4])
+    # 每条不同的曲线只解析一次
+    assert len(exporter._pv_curve_points) == 2
+
+    curves = pd.read_csv(os.path.join(tmp_path, "INVERTER_PV_CURVES.csv.gz"))
+    assert curves.groupby("CurveID").size().to_dict() == {curve_ids[0]: 2, curve_ids[1]: 1}
+    first = curves[curves["CurveID"] == curve_ids[0]]
+    assert first["PointIdx"].tolist() == [1, 2]
+    assert first["generate_V"].tolist() == [90, 110]
+    assert first["charge_P"].tolist() == [100, 0]
+
+
+def test_curve_id_stable_across_exports(datahub):
+    datahub.projectdata.elements = {"INVERTER": _inverters(CURVE_B, CURVE_A)}
+    first = ETAPExporter("http://datahub")._process_inverters()
+    datahub.projectdata.elements = {"INVERTER": _inverters(CURVE_A)}
+    second = ETAPExporter("http://datahub")._process_inverters()
+    # CurveID 由曲线内容决定，与出现顺序和导出批次无关
+    assert second["CurveID"].iloc[0] == first["CurveID"].iloc[1]
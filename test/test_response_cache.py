@@ -0,0 +1,82 @@
+import json
+import os
+
+from src.change_set import ChangeSet
+from src.response_cache import CachedProjectData, ResponseCache
+
+
+def _index(cache_dir):
+    with open(os.path.join(cache_dir, "index.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_hits_batched(tmp_path):
+    cache = ResponseCache(str(tmp_path), flush_every=3)
+    cache.put("a" * 64, "value")
+    written = _index(tmp_path)["a" * 64]["last_access"]
+    mtime = os.stat(tmp_path / "index.json").st_mtime_ns
+
+    assert cache.get("a" * 64) == "value"
+    assert cache.get("a" * 64) == "value"
+    assert os.stat(tmp_path / "index.json").st_mtime_ns == mtime
+    assert cache.get("a" * 64) == "value"
+    assert _index(tmp_path)["a" * 64]["last_access"] > written
+
+    cache.get("a" * 64)
+    cache.close()
+    assert _index(tmp_path)["a" * 64]["last_access"] == cache._index["a" * 64]["last_access"]
+
+
+def test_processes_do_not_clobber_entries(tmp_path):
+    first = ResponseCache(str(tmp_path))
+    second = ResponseCache(str(tmp_path))
+    first.put("a" * 64, "first")
+    second.put("b" * 64, "second")
+    first.get("a" * 64)
+    first.close()
+    assert set(_index(tmp_path)) == {"a" * 64, "b" * 64}
+
+    second.invalidate()
+    assert _index(tmp_path) == {}
+    assert ResponseCache(str(tmp_path)).get("a" * 64) is None
+
+
+def test_lru_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=100, flush_every=1)
+    cache.put_bytes("a" * 64, os.urandom(30))
+    cache.put_bytes("b" * 64, os.urandom(30))
+    cache.get_bytes("a" * 64)
+    cache.put_bytes("c" * 64, os.urandom(30))
+    assert set(_index(tmp_path)) == {"a" * 64, "c" * 64}
+
+
+class _ProjectData:
+    def __init__(self):
+        self.props = {("LUMPEDLOAD", "Lump1", "MVA"): "40"}
+        self.reads = 0
+
+    def getallelementdata(self, element_type):
+        self.reads += 1
+        return f"<ELEMENTS>{self.reads}</ELEMENTS>"
+
+    def getelementprop(self, *key):
+        return self.props[key]
+
+    def setelementprop(self, *args):
+        self.props[args[:3]] = args[3]
+
+
+def test_getelementprop_not_cached(tmp_path):
+    projectdata = _ProjectData()
+    context = {"project": "a.OTI", "fingerprint": "f", "revision": "Base", "config": "Normal"}
+    cached = CachedProjectData(projectdata, ResponseCache(str(tmp_path)), context)
+    assert cached.getallelementdata("BUS") == cached.getallelementdata("BUS") == "<ELEMENTS>1</ELEMENTS>"
+
+    assert cached.getelementprop("LUMPEDLOAD", "Lump1", "MVA") == "40"
+    # 绕过缓存包装的写入（例如工作进程）之后读取到当前值，ChangeSet 不会以过期值作为原始值
+    projectdata.setelementprop("LUMPEDLOAD", "Lump1", "MVA", "50")
+    assert cached.getelementprop("LUMPEDLOAD", "Lump1", "MVA") == "50"
+    changes = ChangeSet(cached)
+    changes.stage("LUMPEDLOAD", "Lump1", "MVA", "60")
+    changes.commit()
+    assert changes.baseline == {("LUMPEDLOAD", "Lump1", "MVA"): "50"}
@@ -0,0 +1,51 @@
+import os
+import sqlite3
+
+import pandas as pd
+
+import model_validate
+from src.result_cache import StudyResultCache
+
+
+def _make_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE LFR (IDFrom, VoltMag)")
+    conn.execute("INSERT INTO LFR VALUES ('B1', 99.5)")
+    conn.commit()
+    conn.close()
+
+
+def test_restored_db_outside_cache_dir(tmp_path):
+    cache_dir = tmp_path / "cache"
+    db_path = str(tmp_path / "result.sl")
+    _make_db(db_path)
+    cache = StudyResultCache(str(cache_dir), archive_db=True)
+    key = cache.scenario_key({("LUMPEDLOAD", "Lump1", "MVA"): "40"}, "runLF", "Base", "Normal", "LF", "fp")
+    report = pd.DataFrame({"bus_ID": ["B1"], "volt_mag": [99.5]})
+    cache.put(key, report, db_path)
+
+    cached_report, restored = cache.get(key)
+    assert cached_report.equals(report)
+    assert not restored.startswith(str(cache_dir))
+    conn = sqlite3.connect(restored)
+    assert conn.execute("SELECT VoltMag FROM LFR").fetchone() == (99.5,)
+    conn.close()
+    assert cache.get(key)[1] == restored
+
+    cache.close()
+    assert not os.path.exists(restored)
+    assert not (cache_dir / "restored").exists()
+
+
+def test_run_sc_cal_resets_cached_report(datahub):
+    main = model_validate.Main("http://datahub")
+    main.cached_report = pd.DataFrame({"bus_ID": ["B1"]})
+    main._result_key = "key"
+    main.change_parameters("LUMPEDLOAD", "Lump1", "MVA", "40")
+    main.run_sc_cal("Base", "Normal", "LF", "PS", "Report", False)
+    assert main.cached_report is None
+    assert main._result_key is None
+    assert main.path_result == "sc.sl"
+    # 运行计算前写入暂存的参数修改
+    assert datahub.projectdata.writes == [("LUMPEDLOAD", "Lump1", "MVA", "40")]
+    assert datahub.studies.calls[0][0] == "runSC"
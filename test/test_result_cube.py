@@ -0,0 +1,55 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from src.result_cube import ResultCube, build_result_cube
+
+
+def _lf_db(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE LFR (IDFrom, TYPE, kV, VoltMag, VoltAng)")
+    conn.executemany("INSERT INTO LFR VALUES (?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def _runs(tmp_path):
+    first = _lf_db(tmp_path / "run1.sl", [("B1", 1, 11.0, 99.5, -1.0), ("B2", 1, 0.4, 98.0, -2.5),
+                                          ("L1", 0, 0.0, 0.0, 0.0)])
+    # 第二次运行中母线顺序不同，且多一条母线
+    second = _lf_db(tmp_path / "run2.sl", [("B3", 1, 0.4, 97.0, -3.0), ("B2", 1, 0.4, 98.5, -2.0),
+                                           ("B1", 1, 11.0, 99.0, -1.5)])
+    return [first, second, str(tmp_path / "missing.sl")]
+
+
+def test_build_result_cube_aligns_ids(tmp_path):
+    cube = build_result_cube(_runs(tmp_path), metadata=[{"load": 1.0}, {"load": 1.1}, {"load": 1.2}], max_workers=2)
+    assert cube.data.shape == (3, 3, 2)
+    assert cube.ids.tolist() == ["B1", "B2", "B3"]
+    np.testing.assert_array_equal(cube.quantity("VoltMag")[:2], [[99.5, 98.0, np.nan], [99.0, 98.5, 97.0]])
+    np.testing.assert_array_equal(cube.quantity("VoltAng")[1], [-1.5, -2.0, -3.0])
+
+    # 读取失败的运行整行为 NaN，错误记录在 runs 中
+    assert np.isnan(cube.data[2]).all()
+    assert cube.runs["load"].tolist() == [1.0, 1.1, 1.2]
+    assert cube.runs["error"].isna().tolist() == [True, True, False]
+    assert cube.runs["error"].iloc[2] == "file not found"
+
+
+def test_result_cube_save_load(tmp_path):
+    cube = build_result_cube(_runs(tmp_path)[:2], max_workers=1)
+    prefix = str(tmp_path / "cube")
+    cube.save(prefix)
+
+    loaded = ResultCube.load(prefix)
+    assert isinstance(loaded.data, np.memmap)
+    np.testing.assert_array_equal(loaded.data, cube.data)
+    assert loaded.ids.tolist() == cube.ids.tolist()
+    assert loaded.fields == ["VoltMag", "VoltAng"]
+    assert loaded.runs["path"].tolist() == cube.runs["path"].tolist()
+
+    frame = pd.read_parquet(prefix + ".parquet")
+    pd.testing.assert_frame_equal(frame, cube.to_frame())
+    assert frame[(frame["run"] == 0) & (frame["ID"] == "B3")]["VoltMag"].isna().all()
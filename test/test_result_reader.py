@@ -0,0 +1,45 @@
+import sqlite3
+
+from src import result_db
+from src.result_reader import read_lf_results, table_fields
+
+
+def _make_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE LFR (IDFrom, TYPE, kV, VoltMag, VoltAng)")
+    conn.executemany("INSERT INTO LFR VALUES (?, ?, ?, ?, ?)",
+                     [("B1", 1, 11.0, 99.5, -1.0), ("B2", 1, 0.4, 98.0, -2.5), ("L1", 0, 0.0, 0.0, 0.0)])
+    conn.commit()
+    conn.close()
+
+
+def test_read_by_path_closes_connection(tmp_path, monkeypatch):
+    path = str(tmp_path / "result.sl")
+    _make_db(path)
+    opened = []
+    open_result_db = result_db.open_result_db
+
+    def tracked(*args, **kwargs):
+        conn = open_result_db(*args, **kwargs)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr("src.result_reader.open_result_db", tracked)
+    columns = read_lf_results(path, ["IDFrom", "VoltMag"])
+    assert columns["IDFrom"].tolist() == ["B1", "B2"]
+    assert len(opened) == 1
+    try:
+        opened[0].execute("SELECT 1")
+        closed = False
+    except sqlite3.ProgrammingError:
+        closed = True
+    assert closed
+
+
+def test_table_fields_recorded():
+    conn = sqlite3.connect(":memory:", factory=result_db.ResultConnection)
+    conn.execute("CREATE TABLE LFR (IDFrom, VoltMag)")
+    result_db.query_stats.clear()
+    assert table_fields(conn, "LFR") == ["IDFrom", "VoltMag"]
+    assert any("PRAGMA table_info" in sql for sql in result_db.query_stats)
+    conn.close()
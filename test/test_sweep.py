@@ -0,0 +1,67 @@
+import time
+
+import numpy as np
+
+from src.sweep import CACHED_COLUMN, ERROR_COLUMN, find_crossing, run_sweep
+
+
+def _voltage(load):
+    # 电压随负荷线性下降，返回 numpy 标量（与 export_pfreport 的结果一致）
+    return np.float64(1.05 - 0.001 * load)
+
+
+def test_find_crossing_numpy_metric():
+    search = find_crossing(lambda value: {"load": value, "volt": _voltage(value)}, 40, 130,
+                           threshold=0.95, tolerance=1, metric="volt")
+    assert abs(search["crossing"] - 100) < 1
+    assert search["runs"] == search["evaluations"]
+    assert search["saved"] == search["grid_runs"] - search["runs"]
+
+
+def test_find_crossing_far_outside_range():
+    search = find_crossing(_voltage, 0, 10, threshold=0.95, tolerance=1)
+    assert abs(search["crossing"] - 100) < 1
+
+
+def test_find_crossing_not_found():
+    search = find_crossing(_voltage, 0, 10, threshold=0.95, tolerance=1, max_expansions=2)
+    assert search["crossing"] is None
+    assert search["saved"] is None
+
+
+def test_find_crossing_cached_rows_not_counted():
+    cached = {40, 130}
+
+    def evaluate(value):
+        return {"volt": _voltage(value), CACHED_COLUMN: value in cached}
+
+    search = find_crossing(evaluate, 40, 130, threshold=0.95, tolerance=1, metric="volt")
+    assert search["cached"] == 2
+    assert search["runs"] == search["evaluations"] - 2
+
+
+def test_run_sweep_requeue_after_queue_drained():
+    # b 的第一个点在 a 取完队列后才失败并放回队列，随后 b 停止；a 必须等待并重试该点
+    def evaluate(session, point):
+        if session == "b":
+            time.sleep(0.2)
+            raise RuntimeError("DataHub stalled")
+        time.sleep(0.01)
+        return {"point": point, "address": session}
+
+    finalized = []
+    df = run_sweep(range(4), ["b", "a"], lambda address: address, evaluate, max_attempts=2, max_failures=1,
+                   finalize=finalized.append)
+    assert df["point"].tolist() == [0, 1, 2, 3]
+    assert df["address"].tolist() == ["a"] * 4
+    assert ERROR_COLUMN not in df.columns
+    assert sorted(finalized) == ["a", "b"]
+
+
+def test_run_sweep_all_instances_stopped():
+    def evaluate(session, point):
+        raise RuntimeError("down")
+
+    df = run_sweep(range(3), ["a"], lambda address: address, evaluate, max_attempts=3, max_failures=2)
+    # 第一个点失败两次后实例停止，其余点没有实例可用
+    assert df[ERROR_COLUMN].tolist() == ["no ETAP instance available"] * 3
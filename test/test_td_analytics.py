@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from src.td_analytics import energy, load_statistics, parse_times, peaks, power_factor, ramp_rates, \
+    system_statistics
+
+
+@pytest.fixture
+def times():
+    # 不等间隔：0、0.5、1.5、2 小时
+    return parse_times(["01-01-2024 00:00:00.000", "01-01-2024 00:30:00.000", "01-01-2024 01:30:00.000",
+                        "01-01-2024 02:00:00.000"])
+
+
+def test_parse_times(times):
+    assert times.dtype == np.dtype("datetime64[ns]")
+    assert str(times[2]) == "2024-01-01T01:30:00.000000000"
+
+
+def test_power_factor():
+    pf = power_factor([3.0, 0.0, np.nan, -3.0], [4.0, 0.0, 1.0, 4.0])
+    np.testing.assert_allclose(pf, [0.6, 0.0, np.nan, -0.6])
+
+
+def test_energy(times):
+    values = np.array([[1.0, 2.0], [3.0, np.nan], [3.0, 2.0], [1.0, 2.0]])
+    # 第一列：(1+3)/2*0.5 + 3*1 + (3+1)/2*0.5；第二列只有两端都有数据的最后一段计入
+    np.testing.assert_allclose(energy(times, values), [5.0, 1.0])
+    assert np.isnan(energy(times, [np.nan, 1.0, np.nan, np.nan])[0])
+    assert np.isnan(energy(times[:1], [1.0])[0])
+
+
+def test_ramp_rates(times):
+    ramps = ramp_rates(times, [1.0, 2.0, 4.0, 3.0])
+    assert ramps.shape == (3, 1)
+    np.testing.assert_allclose(ramps[:, 0], [2.0, 2.0, -2.0])
+
+
+def test_peaks(times):
+    peak, peak_time = peaks(times, np.array([[1.0, np.nan], [5.0, np.nan], [np.nan, np.nan], [2.0, np.nan]]))
+    np.testing.assert_allclose(peak, [5.0, np.nan])
+    assert peak_time[0] == times[1]
+    assert np.isnat(peak_time[1])
+
+
+def test_load_statistics(times):
+    p = np.array([[1.0, 0.0], [3.0, 0.0], [3.0, 0.0], [1.0, 0.0]])
+    q = np.array([[0.0, 0.0], [4.0, 0.0], [4.0, 0.0], [0.0, 0.0]])
+    stats = load_statistics(times, p, q, ["Load1", "Load2"])
+    assert stats["Load"].tolist() == ["Load1", "Load2"]
+    first = stats.iloc[0]
+    assert first["peak_MW"] == 3.0
+    assert first["peak_time"] == times[1]
+    assert first["mean_MW"] == 2.0
+    assert first["load_factor"] == pytest.approx(2.0 / 3.0)
+    assert first["energy_MWh"] == pytest.approx(5.0)
+    assert first["max_ramp_up"] == pytest.approx(4.0)
+    assert first["max_ramp_down"] == pytest.approx(-4.0)
+    assert first["peak_MVA"] == 5.0
+    assert first["min_pf"] == pytest.approx(0.6)
+    # 功率为 0 的负荷：负荷率无定义，功率因数取 0
+    second = stats.iloc[1]
+    assert np.isnan(second["load_factor"])
+    assert second["mean_pf"] == 0.0
+
+
+def test_system_statistics(times):
+    stats = system_statistics(times, [1.0, 3.0, 3.0, 1.0], [0.1, 0.3, 0.3, 0.1])
+    assert stats["peak_load_MW"] == 3.0
+    assert stats["energy_MWh"] == pytest.approx(5.0)
+    assert stats["loss_energy_MWh"] == pytest.approx(0.5)
+    assert stats["loss_percent"] == pytest.approx(10.0)
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.td_cube import TDResultCube, export_td_cube
+
+
+def test_export_td_cube(tdlf_db, tmp_path):
+    # 每批 4 行，结果表需要分多批写入
+    cube = export_td_cube(tdlf_db, str(tmp_path / "cube"), chunk_rows=4)
+    assert cube.result_ids.tolist() == [106, 105, 104, 103, 102, 101]
+    assert cube.elements == {"bus": ["Bus1", "Bus2", "Bus3"], "load": ["Load1", "Load2"]}
+    assert cube.fields("load") == ["TotalMWPhA", "TotalMvarPhA", "AmpPhA"]
+
+    voltage = cube.array("bus", "VPhA")
+    assert voltage.shape == (6, 3)
+    expected = 100.0 - np.arange(3)[None, :] - np.arange(6)[:, None] * 0.5
+    expected[3, 1] = np.nan
+    np.testing.assert_allclose(voltage, expected)
+    np.testing.assert_allclose(cube.array("load", "AmpPhA")[:, 1], 10.0 + np.arange(6))
+
+    with pytest.raises(ValueError, match="Field VPhB not exported"):
+        cube.array("bus", "VPhB")
+
+
+def test_td_cube_load_and_slice(tdlf_db, tmp_path):
+    output_dir = str(tmp_path / "cube")
+    export_td_cube(tdlf_db, output_dir, tables=("bus",), fields={"bus": ["VPhA"]}, dtype=np.float32)
+    cube = TDResultCube.load(output_dir)
+    assert list(cube.meta["tables"]) == ["bus"]
+    assert cube.array("bus", "VPhA").dtype == np.float32
+    assert isinstance(cube.array("bus", "VPhA"), np.memmap)
+
+    assert cube.columns("bus", ["Bus3", "Bus1"]) == [2, 0]
+    with pytest.raises(KeyError, match="Bus9"):
+        cube.columns("bus", ["Bus1", "Bus9"])
+
+    assert cube.time_slice("2024-01-01 00:15", "2024-01-01 00:45") == slice(1, 4)
+    frame = cube.frame("bus", "VPhA", names=["Bus2"], start="2024-01-01 00:30")
+    assert list(frame.columns) == ["Bus2"]
+    assert frame.index.tolist() == list(pd.date_range("2024-01-01 00:30", periods=4, freq="15min"))
+    assert np.isnan(frame["Bus2"].iloc[1])
+    np.testing.assert_allclose(frame["Bus2"].dropna(), [98.0, 97.0, 96.5])
+
+    full = cube.frame("bus", "VPhA")
+    assert full.shape == (6, 3)
+    assert list(full.columns) == ["Bus1", "Bus2", "Bus3"]
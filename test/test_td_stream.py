@@ -0,0 +1,42 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.td_stream import iter_time_series, stream_time_series
+from test.conftest import make_tdlf_db
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_stream_matches_export(tdlf_db, export_tdlf, tmp_path, fmt):
+    expected = export_tdlf(custom_loads=["Load1", "Load2"])
+    output_path = str(tmp_path / f"stream.{fmt}")
+    count = stream_time_series(tdlf_db, output_path, custom_loads=["Load1", "Load2"], chunk_times=4)
+    streamed = pd.read_csv(output_path) if fmt == "csv" else pd.read_parquet(output_path)
+
+    assert count == len(expected) == 6
+    assert list(streamed.columns) == list(expected.columns)
+    # 默认分析告警中的欠压母线，Bus2 缺失的结果为 NaN
+    assert "Bus_Bus2_Voltage" in streamed.columns
+    assert streamed["Bus_Bus2_Voltage"].isna().sum() == 1
+    pd.testing.assert_frame_equal(streamed, expected.astype({column: "float64" for column in expected.columns[1:]}),
+                                  check_dtype=False)
+
+
+def test_stream_chunks(tdlf_db):
+    chunks = list(iter_time_series(tdlf_db, custom_buses=["Bus3", "Missing"], chunk_times=4))
+    assert [len(chunk) for chunk in chunks] == [4, 2]
+    assert list(chunks[0].columns[-2:]) == ["Bus_Bus3_Voltage", "Bus_Bus3_Angle"]
+    assert pd.concat(chunks)["Bus_Bus3_Voltage"].tolist() == [98.0, 97.5, 97.0, 96.5, 96.0, 95.5]
+
+
+def test_time_without_system_result_skipped(tmp_path):
+    path = make_tdlf_db(tmp_path / "partial.tdl")
+    conn = sqlite3.connect(path)
+    conn.execute("DELETE FROM TDSysResult WHERE ResultID = (SELECT ResultID FROM TDTimeID WHERE TimeID = 2)")
+    conn.commit()
+    conn.close()
+    # 与 export_time_series_power_flow 的系统结果查询相同，没有系统结果的时间点不输出
+    frame = pd.concat(iter_time_series(path, custom_buses=["Bus1"]))
+    assert len(frame) == 5
+    assert "01-01-2024 00:15:00.000" not in frame["Time"].tolist()
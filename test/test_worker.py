@@ -0,0 +1,62 @@
+import socket
+import threading
+
+import pytest
+
+import etap_worker
+from etap_job import submit
+from src import datahub_client
+from src.worker_auth import load_authkey
+
+AUTHKEY = b"0123456789abcdef0123"
+
+
+def _free_address():
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return "localhost", sock.getsockname()[1]
+
+
+def test_invalid_job_rejected(datahub):
+    address = _free_address()
+    worker = etap_worker.Worker("http://localhost:60000")
+    thread = threading.Thread(target=worker.serve, args=(address, AUTHKEY), daemon=True)
+    thread.start()
+    for _ in range(100):
+        try:
+            reply = submit(["not", "a", "job"], address, AUTHKEY)
+            break
+        except ConnectionRefusedError:
+            thread.join(0.05)
+    assert reply["ok"] is False
+    assert submit({"job": "ping"}, address, AUTHKEY)["ok"] is True
+    assert submit({"job": "shutdown"}, address, AUTHKEY)["ok"] is True
+    thread.join(5)
+    assert not thread.is_alive()
+
+
+def test_check_session_evicts_cached_client(datahub, monkeypatch):
+    address = "http://localhost:60000"
+    monkeypatch.setattr(datahub_client, "_clients", {(address, "{}"): object(), ("other", "{}"): object()})
+    monkeypatch.setattr(datahub_client, "_connections", {address: object()})
+    worker = etap_worker.Worker(address)
+    worker.session()
+    datahub.application.alive = False
+    worker.check_session()
+    assert worker.main is None
+    assert list(datahub_client._clients) == [("other", "{}")]
+    assert datahub_client._connections == {}
+
+
+def test_load_authkey(monkeypatch, tmp_path):
+    path = tmp_path / "key"
+    monkeypatch.delenv("ETAP_WORKER_AUTHKEY", raising=False)
+    with pytest.raises(RuntimeError):
+        load_authkey(path=str(path))
+    path.write_text("short\n")
+    with pytest.raises(RuntimeError):
+        load_authkey(path=str(path))
+    path.write_text(AUTHKEY.decode() + "\n")
+    assert load_authkey(path=str(path)) == AUTHKEY
+    monkeypatch.setenv("ETAP_WORKER_AUTHKEY", "f" * 32)
+    assert load_authkey(path=str(path)) == b"f" * 32
@@ -0,0 +1,39 @@
+import io
+import xml.etree.ElementTree as ET
+
+import pandas as pd
+import pytest
+
+from dc_element_output import ETAPExporter
+from src.xml_stream import iter_child_attribs, iter_element_attribs
+
+RESPONSE = ('<ELEMENTS><INVERTER ID="Inv1" KW="10"><POINT X="1"/></INVERTER>'
+            '<BUS ID="Bus1"/><INVERTER ID="Inv2" KW="20.5"/>'
+            '<GROUP><INVERTER ID="Inv3" KW="30"/></GROUP></ELEMENTS>')
+
+PDE = ('<PDE Flat="1"><COMPONENTS><BUS ID="Bus1" NominalkV="11"/><CAPACITOR ID="Cap1"><RATING KV="11"/></CAPACITOR>'
+       '<BUS ID="Bus2" NominalkV="0.4"/></COMPONENTS><CONNECTIONS><BUS ID="NotAComponent"/></CONNECTIONS></PDE>')
+
+
+@pytest.mark.parametrize("source", [RESPONSE, RESPONSE.encode("utf-8"), io.StringIO(RESPONSE)])
+def test_iter_element_attribs_matches_findall(source):
+    # 数据块很小，元素会被切分到多个块中
+    attribs = list(iter_element_attribs(source, "INVERTER", chunk_size=7))
+    expected = [element.attrib for element in ET.fromstring(RESPONSE).iter("INVERTER")]
+    assert attribs == expected
+    assert [item["ID"] for item in attribs] == ["Inv1", "Inv2", "Inv3"]
+
+
+def test_iter_child_attribs():
+    items = list(iter_child_attribs(PDE, "COMPONENTS", chunk_size=5))
+    assert [(tag, attrs["ID"]) for tag, attrs in items] == [("BUS", "Bus1"), ("CAPACITOR", "Cap1"), ("BUS", "Bus2")]
+    # CONNECTIONS 下的同名元素不是元件
+    assert [attrs["ID"] for _, attrs in iter_child_attribs(PDE, "COMPONENTS", tags={"BUS"})] == ["Bus1", "Bus2"]
+
+
+def test_streaming_export_matches_dom(datahub):
+    datahub.projectdata.elements = {"BUS": '<ELEMENTS><BUS ID="Bus1" NominalkV="11"/><BUS ID="Bus2"/></ELEMENTS>'}
+    dom = ETAPExporter("http://datahub")._process_schema_elements("BUS")
+    streamed = ETAPExporter("http://datahub", streaming=True)._process_schema_elements("BUS")
+    pd.testing.assert_frame_equal(streamed, dom)
+    assert streamed["IID"].tolist() == ["Bus1", "Bus2"]